@@ -0,0 +1,257 @@
+import json
+import re
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from lxml import html as lxml_html
+import requests
+from temp import (
+    extract_authors, extract_rating,
+    extract_genres, extract_publication_date, extract_reading_stats, extract_edition_details,
+    extract_other_editions_links, extract_more_information, extract_suggested_books,
+)
+
+BOOK_FIELDS = [
+    'title', 'authors', 'rating', 'description', 'num_pages', 'isbn', 'genres', 'publication_date',
+    'reading_stats', 'edition_details', 'other_editions_links', 'more_information', 'suggested_books',
+]
+
+# Playwright extractors for the fields that are only rendered client-side
+BROWSER_EXTRACTORS = {
+    'genres': extract_genres,
+    'publication_date': extract_publication_date,
+    'reading_stats': extract_reading_stats,
+    'edition_details': extract_edition_details,
+    'other_editions_links': extract_other_editions_links,
+    'more_information': extract_more_information,
+    'suggested_books': extract_suggested_books,
+}
+
+# What those extractors return when a field is absent or unreadable; stored as None, like the static pass
+BROWSER_PLACEHOLDERS = {
+    'genres': (['Genres not found'], ['No genres found']),
+    'publication_date': ('Publication date not found', 'Date not found'),
+    'reading_stats': ({'currently_reading': 'N/A', 'want_to_read': 'N/A'},),
+    'edition_details': ('Edition details not found',),
+    'other_editions_links': (['Other editions not found'], ['No other editions found']),
+    'more_information': ('More information not found', 'No additional info found'),
+    'suggested_books': (['Suggested books not found'], ['No suggested books found']),
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+def _first(tree, xpath):
+    found = tree.xpath(xpath)
+    return found[0] if found else None
+
+def _json_script(tree, xpath):
+    text = _first(tree, xpath)
+    if not text:
+        return {}
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {}
+
+def _apollo_ref(apollo, ref):
+    return apollo.get((ref or {}).get('__ref'), {})
+
+def _apollo_book(apollo):
+    """The page's book: the one ROOT_QUERY's getBookByLegacyId query points at, not any other Book: entry."""
+    for key, value in apollo.get('ROOT_QUERY', {}).items():
+        if key.startswith('getBookByLegacyId'):
+            return _apollo_ref(apollo, value)
+    return {}
+
+def _format_date(millis):
+    if not millis:
+        return None
+    date = datetime.fromtimestamp(millis / 1000, tz=timezone.utc)
+    return f"{date.strftime('%B')} {date.day}, {date.year}"
+
+def _edition_details(details):
+    """Compose the 'This edition' block from the embedded Apollo book details."""
+    if not details:
+        return None
+    lines = []
+    fmt = ", ".join(str(x) for x in (f"{details['numPages']} pages" if details.get('numPages') else None,
+                                      details.get('format')) if x)
+    if fmt:
+        lines.append(f"Format\n{fmt}")
+    published = _format_date(details.get('publicationTime'))
+    if published:
+        lines.append(f"Published\n{published}" + (f" by {details['publisher']}" if details.get('publisher') else ""))
+    if details.get('isbn13'):
+        lines.append(f"ISBN\n{details['isbn13']}" + (f" (ISBN10: {details['isbn']})" if details.get('isbn') else ""))
+    if details.get('asin'):
+        lines.append(f"ASIN\n{details['asin']}")
+    if (details.get('language') or {}).get('name'):
+        lines.append(f"Language\n{details['language']['name']}")
+    return "\n".join(lines) or None
+
+def _more_information(work_details):
+    """Compose the 'More information' block from the embedded Apollo work details."""
+    if not work_details:
+        return None
+    lines = []
+    if work_details.get('originalTitle'):
+        lines.append(f"Original title\n{work_details['originalTitle']}")
+    for label, key in (("Setting", 'places'), ("Characters", 'characters'), ("Literary awards", 'awardsWon')):
+        names = [item.get('name') for item in work_details.get(key) or [] if item.get('name')]
+        if names:
+            lines.append(f"{label}\n" + ", ".join(names))
+    return "\n".join(lines) or None
+
+def parse_book_html(page_html):
+    """
+    Fills the whole book_info dict from a Goodreads book page in a single lxml parse, using the
+    Schema.org block, the __NEXT_DATA__ Apollo state and server-rendered markup.
+    Returns (book_info, missing) where missing lists the fields the static HTML could not provide.
+    """
+    tree = lxml_html.fromstring(page_html)
+    schema_data = _json_script(tree, "//script[@type='application/ld+json']/text()")
+    next_data = _json_script(tree, "//script[@id='__NEXT_DATA__']/text()")
+    apollo = next_data.get('props', {}).get('pageProps', {}).get('apolloState', {})
+    book = _apollo_book(apollo)
+    work = _apollo_ref(apollo, book.get('work'))
+    details = book.get('details') or {}
+
+    description = " ".join(tree.xpath("//div[@data-testid='description']//span[@class='Formatted']//text()")).strip()
+    if not description:
+        description = book.get('description({"stripped":true})') or None
+
+    genres = [g.strip() for g in tree.xpath("//div[@data-testid='genresList']//a//text()") if g.strip()]
+    if not genres:
+        genres = [edge['genre']['name'] for edge in book.get('bookGenres') or [] if edge.get('genre')]
+
+    publication_date = None
+    publication_info = " ".join(tree.xpath("//p[@data-testid='publicationInfo']//text()"))
+    match = re.search(r'\b(\w+ \d+, \d{4})\b', publication_info)
+    if match:
+        publication_date = match.group(1)
+
+    reading_stats = None
+    currently = " ".join(tree.xpath("//div[@data-testid='currentlyReadingSignal']//text()"))
+    to_read = " ".join(tree.xpath("//div[@data-testid='toReadSignal']//text()"))
+    currently_match = re.search(r'([\d,]+) people are currently reading', currently)
+    to_read_match = re.search(r'([\d,]+) people want to read', to_read)
+    if currently_match and to_read_match:
+        reading_stats = {
+            'currently_reading': int(currently_match.group(1).replace(',', '')),
+            'want_to_read': int(to_read_match.group(1).replace(',', '')),
+        }
+
+    isbn = (schema_data.get('workExample') or {}).get('isbn') or schema_data.get('isbn') or details.get('isbn13')
+
+    book_info = {
+        'title': schema_data.get('name'),
+        'authors': extract_authors(schema_data) or None,
+        'rating': extract_rating(schema_data) if schema_data.get('aggregateRating') else None,
+        'description': description or None,
+        'num_pages': schema_data.get('numberOfPages') or details.get('numPages'),
+        'isbn': isbn,
+        'genres': genres or None,
+        'publication_date': publication_date,
+        'reading_stats': reading_stats,
+        'edition_details': _edition_details(details),
+        # Edition links and recommendations are only rendered client-side
+        'other_editions_links': None,
+        'more_information': _more_information(work.get('details')),
+        'suggested_books': None,
+    }
+    missing = [field for field in BOOK_FIELDS if book_info[field] is None]
+    return book_info, missing
+
+def fill_missing_with_browser(url, book_info, missing, timeout=15000, browser=None):
+    """
+    Runs the Playwright extractors only for the fields the static pass could not fill. Fields the
+    browser cannot find either stay None. Pass an open sync Playwright `browser` to reuse it;
+    otherwise one is launched and closed for this page.
+    """
+    browser_fields = [field for field in missing if field in BROWSER_EXTRACTORS]
+    if not browser_fields:
+        return book_info
+    if browser is None:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            try:
+                return fill_missing_with_browser(url, book_info, browser_fields, timeout, browser)
+            finally:
+                browser.close()
+    page = browser.new_page()
+    try:
+        # Don't let a locator that never appears hold the page for the default 30s
+        page.set_default_timeout(timeout)
+        page.goto(url)
+        page.wait_for_selector("div.BookPage__mainContent", timeout=timeout)
+        for field in browser_fields:
+            value = BROWSER_EXTRACTORS[field](page)
+            book_info[field] = None if value in BROWSER_PLACEHOLDERS[field] else value
+    finally:
+        page.close()
+    return book_info
+
+def _static_pass(http, url, browser_fields):
+    """book_info from the page's raw HTML, and the `browser_fields` it is missing."""
+    response = http.get(url, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    book_info, missing = parse_book_html(response.text)
+    return book_info, [field for field in missing if field in browser_fields]
+
+def scrape_goodreads_page_static(url, session=None, browser_fields=(), browser=None):
+    """
+    Scrapes a Goodreads page from its raw HTML. Fields the static page lacks stay None, except
+    those listed in `browser_fields`, which are filled with a browser (`browser` if given).
+    """
+    book_info, wanted = _static_pass(session or requests, url, browser_fields)
+    if wanted:
+        fill_missing_with_browser(url, book_info, wanted, browser=browser)
+    return book_info
+
+def scrape_goodreads_pages_static(urls, session=None, browser_fields=()):
+    """
+    scrape_goodreads_page_static for many URLs over one requests.Session. A single browser is
+    launched, on the first page missing one of `browser_fields`, and shared by the rest.
+    """
+    session = session or requests.Session()
+    with ExitStack() as stack:
+        browser = None
+        results = []
+        for url in urls:
+            book_info, wanted = _static_pass(session, url, browser_fields)
+            if wanted:
+                if browser is None:
+                    from playwright.sync_api import sync_playwright
+                    browser = stack.enter_context(sync_playwright()).chromium.launch()
+                    stack.callback(browser.close)
+                fill_missing_with_browser(url, book_info, wanted, browser=browser)
+            results.append(book_info)
+        return results
+
+def benchmark(paths, repeats=20):
+    """Per-page cost of the single-pass static extraction over saved page fixtures."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            page_html = f.read()
+        if not page_html.strip():
+            print(f"{path}: empty fixture, skipped")
+            continue
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            book_info, missing = parse_book_html(page_html)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{path}: {len(page_html) / 1024:.0f} KiB, median {timings[len(timings) // 2] * 1000:.1f} ms/page, "
+              f"{len(BOOK_FIELDS) - len(missing)}/{len(BOOK_FIELDS)} fields static, browser needed for: {missing or 'nothing'}")
+
+if __name__ == "__main__":
+    fixtures = sys.argv[1:] or ["page_content.html"]
+    benchmark(fixtures)
+    book_info, _ = parse_book_html(open(fixtures[0], encoding="utf-8").read())
+    print(json.dumps(book_info, indent=2, ensure_ascii=False))
@@ -1,6 +1,12 @@
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+import asyncio
 import json
 import re
+import time
+
+# Resource types that are not needed to read book data; blocking them saves most of the page weight
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
 
 # Function to extract Schema.org data from the page
 def extract_schema_data(page):
@@ -50,6 +56,15 @@ def extract_isbn(schema_data):
     work_example = schema_data.get('workExample', {})
     return work_example.get('isbn', 'ISBN not found')
 
+# Parsing shared by the sync and async page extractors
+def _publication_date(publication_info):
+    match = re.search(r'\b(\w+ \d+, \d{4})\b', publication_info)
+    return match.group(1) if match else 'Date not found'
+
+def _count(text):
+    # Counts are rendered with thousands separators ("1,234 people ...")
+    return int(re.search(r'\d[\d,]*', text).group().replace(',', ''))
+
 # Extract genres from the page content
 def extract_genres(page):
     """Extracts genres from the Genres section."""
@@ -66,8 +81,7 @@ def extract_publication_date(page):
     """Extracts the publication date from publication info."""
     try:
         publication_info = page.locator("p[data-testid='publicationInfo']").inner_text()
-        match = re.search(r'\b(\w+ \d+, \d{4})\b', publication_info)
-        return match.group(1) if match else 'Date not found'
+        return _publication_date(publication_info)
     except Exception:
         return 'Publication date not found'
 
@@ -75,15 +89,11 @@ def extract_publication_date(page):
 def extract_reading_stats(page):
     """Extracts counts of people currently reading and wanting to read."""
     try:
-        currently_reading_text = page.locator("text=/\d+ people are currently reading/").inner_text()
-        want_to_read_text = page.locator("text=/\d+ people want to read/").inner_text()
-        
-        currently_reading = re.search(r'\d+', currently_reading_text).group()
-        want_to_read = re.search(r'\d+', want_to_read_text).group()
-        
+        currently_reading_text = page.locator("text=/\\d+ people are currently reading/").inner_text()
+        want_to_read_text = page.locator("text=/\\d+ people want to read/").inner_text()
         return {
-            'currently_reading': int(currently_reading),
-            'want_to_read': int(want_to_read)
+            'currently_reading': _count(currently_reading_text),
+            'want_to_read': _count(want_to_read_text)
         }
     except Exception:
         return {
@@ -173,9 +183,196 @@ def scrape_goodreads_page(url):
         return book_info
 
 
-url = "https://www.goodreads.com/book/show/61273823-take-command?ref=rae_1"
-try:
-    data = scrape_goodreads_page(url)
-    print(json.dumps(data, indent=2, ensure_ascii=False))
-except Exception as e:
-    print(f"An error occurred: {e}")
\ No newline at end of file
+# Async counterparts of the page extractors, used by the batch scraper
+async def extract_schema_data_async(page):
+    """Extracts structured Schema.org data from the script tag."""
+    try:
+        schema_script = await page.locator("script[type='application/ld+json']").first.inner_html()
+        return json.loads(schema_script)
+    except Exception as e:
+        print(f"Error extracting schema data: {e}")
+        return {}
+
+def _section_container(page, header_selector):
+    # Building locators is synchronous in the async API too
+    header = page.locator(header_selector).first
+    return header.locator("xpath=..").locator("following-sibling::*[1]")
+
+async def extract_genres_async(page):
+    """Extracts genres from the Genres section."""
+    try:
+        container = _section_container(page, "h3:has-text('Genres')")
+        genres = [(await genre.inner_text()).strip() for genre in await container.locator("a").all()]
+        return genres if genres else ['No genres found']
+    except Exception:
+        return ['Genres not found']
+
+async def extract_publication_date_async(page):
+    """Extracts the publication date from publication info."""
+    try:
+        publication_info = await page.locator("p[data-testid='publicationInfo']").inner_text()
+        return _publication_date(publication_info)
+    except Exception:
+        return 'Publication date not found'
+
+async def extract_reading_stats_async(page):
+    """Extracts counts of people currently reading and wanting to read."""
+    try:
+        currently_reading_text = await page.locator("text=/\\d+ people are currently reading/").inner_text()
+        want_to_read_text = await page.locator("text=/\\d+ people want to read/").inner_text()
+        return {
+            'currently_reading': _count(currently_reading_text),
+            'want_to_read': _count(want_to_read_text)
+        }
+    except Exception:
+        return {
+            'currently_reading': 'N/A',
+            'want_to_read': 'N/A'
+        }
+
+async def extract_suggested_books_async(page):
+    """Extracts titles of suggested books under 'Readers also enjoyed'."""
+    try:
+        container = _section_container(page, "h3:has-text('Readers also enjoyed')")
+        suggested_books = [(await book.inner_text()).strip() for book in await container.locator("a").all()]
+        return suggested_books if suggested_books else ['No suggested books found']
+    except Exception:
+        return ['Suggested books not found']
+
+async def extract_edition_details_async(page):
+    """Extracts details about the current edition."""
+    try:
+        container = _section_container(page, "h4:has-text('This edition')")
+        details = (await container.inner_text()).strip()
+        return details if details else 'Edition details not found'
+    except Exception:
+        return 'Edition details not found'
+
+async def extract_other_editions_links_async(page):
+    """Extracts URLs to other editions."""
+    try:
+        container = _section_container(page, "h4:has-text('More editions')")
+        links = [await link.get_attribute("href") for link in await container.locator("a").all()]
+        return links if links else ['No other editions found']
+    except Exception:
+        return ['Other editions not found']
+
+async def extract_more_information_async(page):
+    """Extracts additional information under 'More information'."""
+    try:
+        container = _section_container(page, "h4:has-text('More information')")
+        info_text = (await container.inner_text()).strip()
+        return info_text if info_text else 'No additional info found'
+    except Exception:
+        return 'More information not found'
+
+async def _block_resources(route):
+    """Abort requests for images, fonts, stylesheets and media; let everything else through."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _new_context(browser, block_resources):
+    context = await browser.new_context()
+    if block_resources:
+        await context.route("**/*", _block_resources)
+    return context
+
+async def scrape_book_page_async(context, url, timeout=40000):
+    """Scrapes one book page in an existing browser context."""
+    page = await context.new_page()
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        await page.wait_for_selector("div.BookPage__mainContent", timeout=timeout)
+        schema_data = await extract_schema_data_async(page)
+        return {
+            'title': extract_title(schema_data),
+            'authors': extract_authors(schema_data),
+            'rating': extract_rating(schema_data),
+            'description': extract_description(schema_data),
+            'num_pages': extract_num_pages(schema_data),
+            'isbn': extract_isbn(schema_data),
+            'genres': await extract_genres_async(page),
+            'publication_date': await extract_publication_date_async(page),
+            'reading_stats': await extract_reading_stats_async(page),
+            'edition_details': await extract_edition_details_async(page),
+            'other_editions_links': await extract_other_editions_links_async(page),
+            'more_information': await extract_more_information_async(page),
+            'suggested_books': await extract_suggested_books_async(page)
+        }
+    finally:
+        await page.close()
+
+async def scrape_goodreads_pages_async(urls, concurrency=4, block_resources=True, pages_per_context=50, timeout=40000):
+    """
+    Scrapes many Goodreads pages with one browser and a pool of `concurrency` contexts.
+    Contexts are recycled after `pages_per_context` pages to keep memory bounded.
+    Returns one {'url', 'book_info', 'elapsed', 'error'} dict per URL, in input order.
+    """
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        # Slots are [context, pages done]; a None context is opened by the next page that gets the slot
+        contexts = asyncio.Queue()
+        for _ in range(concurrency):
+            contexts.put_nowait([None, 0])
+
+        async def scrape(url):
+            slot = await contexts.get()
+            start = time.perf_counter()
+            try:
+                if slot[0] is None:
+                    slot[0], slot[1] = await _new_context(browser, block_resources), 0
+                book_info = await scrape_book_page_async(slot[0], url, timeout=timeout)
+                return {'url': url, 'book_info': book_info, 'elapsed': time.perf_counter() - start, 'error': None}
+            except Exception as e:
+                return {'url': url, 'book_info': None, 'elapsed': time.perf_counter() - start, 'error': str(e)}
+            finally:
+                slot[1] += 1
+                if slot[0] is not None and slot[1] >= pages_per_context:
+                    context, slot[0] = slot[0], None
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"Error closing browser context: {e}")
+                # Always hand the slot back, or the remaining pages would wait for it forever
+                contexts.put_nowait(slot)
+
+        results = await asyncio.gather(*(scrape(url) for url in urls))
+        while not contexts.empty():
+            context = contexts.get_nowait()[0]
+            if context is not None:
+                await context.close()
+        await browser.close()
+        return results
+
+def scrape_goodreads_pages(urls, concurrency=4, **kwargs):
+    """
+    Scrapes many Goodreads pages with a single browser launch. See scrape_goodreads_pages_async.
+    In a notebook, where an event loop is already running, use
+    `await scrape_goodreads_pages_async(urls)` instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scrape_goodreads_pages_async(urls, concurrency=concurrency, **kwargs))
+    raise RuntimeError("scrape_goodreads_pages() cannot run inside a running event loop (e.g. a Jupyter "
+                       "notebook); use `await scrape_goodreads_pages_async(urls)` there instead")
+
+
+if __name__ == "__main__":
+    url = "https://www.goodreads.com/book/show/61273823-take-command?ref=rae_1"
+    try:
+        data = scrape_goodreads_page(url)
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+    # Batch mode: one browser, a pool of contexts, non-essential resources blocked
+    urls = [
+        url,
+        "https://www.goodreads.com/book/show/17912916-data-science-for-business",
+    ]
+    for result in scrape_goodreads_pages(urls, concurrency=2):
+        status = result['error'] or result['book_info']['title']
+        print(f"{result['elapsed']:.1f}s  {result['url']}  {status}")
@@ -0,0 +1,87 @@
+import json
+import os
+from types import SimpleNamespace
+import goodreads_extract
+from goodreads_extract import (
+    fill_missing_with_browser, parse_book_html, scrape_goodreads_page_static, scrape_goodreads_pages_static,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "page_content.html")
+
+class FakeSession:
+    def __init__(self):
+        with open(FIXTURE, encoding="utf-8") as f:
+            self.text = f.read()
+
+    def get(self, url, **kwargs):
+        return SimpleNamespace(text=self.text, raise_for_status=lambda: None)
+
+def test_no_browser_unless_fields_are_requested(monkeypatch):
+    launched = []
+    monkeypatch.setattr(goodreads_extract, "fill_missing_with_browser",
+                        lambda url, book_info, missing, **kwargs: launched.append(missing))
+    book_info = scrape_goodreads_page_static("https://www.goodreads.com/book/show/1", session=FakeSession())
+    assert book_info['title'] and book_info['other_editions_links'] is None
+    assert launched == []
+    scrape_goodreads_page_static("https://www.goodreads.com/book/show/1", session=FakeSession(),
+                                 browser_fields=['suggested_books', 'title'])
+    assert launched == [['suggested_books']]
+
+def test_pages_without_browser_fields_never_launch_a_browser(monkeypatch):
+    browsers = []
+    monkeypatch.setattr(goodreads_extract, "fill_missing_with_browser",
+                        lambda url, book_info, missing, browser=None, **kwargs: browsers.append(browser))
+    results = scrape_goodreads_pages_static(["a", "b", "c"], session=FakeSession())
+    assert len(results) == 3 and browsers == []
+
+def test_parse_book_html_reads_the_fixture():
+    book_info, missing = parse_book_html(FakeSession().text)
+    assert book_info['title'].startswith("Data Science for Business")
+    assert book_info['authors'] == ["Foster Provost", "Tom Fawcett"]
+    assert book_info['isbn'] == "9781449361327"
+    assert book_info['num_pages'] == 413
+    assert book_info['genres'][:3] == ["Business", "Nonfiction", "Technology"]
+    assert book_info['reading_stats'] == {'currently_reading': 1813, 'want_to_read': 10062}
+    assert book_info['edition_details'].startswith("Format\n413 pages, Paperback\nPublished\nSeptember 17, 2013")
+    assert missing == ['other_editions_links', 'suggested_books']
+
+def test_book_is_resolved_through_root_query():
+    apollo = {
+        'ROOT_QUERY': {'getBookByLegacyId({"legacyId":"2"})': {'__ref': "Book:two"}},
+        # A recommended book listed before the page's own book
+        'Book:one': {'details': {'numPages': 100}, 'work': {'__ref': "Work:one"}},
+        'Book:two': {'details': {'numPages': 200}, 'work': {'__ref': "Work:two"}},
+        'Work:one': {'details': {'originalTitle': "One"}},
+        'Work:two': {'details': {'originalTitle': "Two"}},
+    }
+    next_data = json.dumps({'props': {'pageProps': {'apolloState': apollo}}})
+    book_info, _ = parse_book_html(f'<html><script id="__NEXT_DATA__">{next_data}</script></html>')
+    assert book_info['num_pages'] == 200
+    assert book_info['more_information'] == "Original title\nTwo"
+
+class FakePage:
+    def __init__(self):
+        self.waited = []
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def goto(self, url):
+        pass
+
+    def wait_for_selector(self, selector, timeout):
+        self.waited.append(timeout)
+
+    def close(self):
+        pass
+
+def test_browser_placeholders_become_none(monkeypatch):
+    page = FakePage()
+    monkeypatch.setitem(goodreads_extract.BROWSER_EXTRACTORS, 'suggested_books',
+                        lambda page: ['Suggested books not found'])
+    monkeypatch.setitem(goodreads_extract.BROWSER_EXTRACTORS, 'other_editions_links', lambda page: ["/book/show/1"])
+    book_info = {'suggested_books': None, 'other_editions_links': None}
+    fill_missing_with_browser("url", book_info, ['suggested_books', 'other_editions_links'], timeout=500,
+                              browser=SimpleNamespace(new_page=lambda: page))
+    assert book_info == {'suggested_books': None, 'other_editions_links': ["/book/show/1"]}
+    assert page.waited == [500]
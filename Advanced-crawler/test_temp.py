@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import temp
+from temp import scrape_goodreads_pages, scrape_goodreads_pages_async
+
+# Rendered content of a fake book page, keyed by locator path
+CONTENT = {
+    "h3:has-text('Genres') > next": ["Business", " Data Science "],
+    "p[data-testid='publicationInfo']": "First published August 19, 2013",
+    "text=/\\d+ people are currently reading/": "1,234 people are currently reading",
+    "text=/\\d+ people want to read/": "99 people want to read",
+    "h4:has-text('This edition') > next": "  Format\n414 pages, Paperback ",
+    "h4:has-text('More editions') > next": ["/book/show/1", "/book/show/2"],
+    "h3:has-text('Readers also enjoyed') > next": [],
+}
+
+class FakeLocator:
+    def __init__(self, path, is_async=False):
+        self.path = path
+        self.is_async = is_async
+        self.first = self
+
+    def locator(self, selector):
+        if selector == "xpath=..":
+            return FakeLocator(self.path + " > parent", self.is_async)
+        if selector == "following-sibling::*[1]":
+            return FakeLocator(self.path.replace(" > parent", " > next"), self.is_async)
+        return FakeLocator(self.path + " " + selector, self.is_async)
+
+    def _result(self, value):
+        if not self.is_async:
+            return value
+
+        async def result():
+            return value
+        return result()
+
+    def _content(self):
+        if self.path not in CONTENT:
+            raise TimeoutError(f"No element for {self.path}")
+        return CONTENT[self.path]
+
+    def inner_text(self):
+        if self.path.endswith(" a"):
+            return self._result(self.value)
+        return self._result(self._content())
+
+    def get_attribute(self, name):
+        return self._result(self.value)
+
+    def all(self):
+        links = []
+        for value in CONTENT.get(self.path[:-len(" a")], []):
+            link = FakeLocator(self.path, self.is_async)
+            link.value = value
+            links.append(link)
+        return self._result(links)
+
+class FakePage:
+    def __init__(self, is_async=False):
+        self.is_async = is_async
+
+    def locator(self, selector):
+        return FakeLocator(selector, self.is_async)
+
+EXPECTED = {
+    'genres': ["Business", "Data Science"],
+    'publication_date': "August 19, 2013",
+    'reading_stats': {'currently_reading': 1234, 'want_to_read': 99},
+    'edition_details': "Format\n414 pages, Paperback",
+    'other_editions_links': ["/book/show/1", "/book/show/2"],
+    'more_information': 'More information not found',
+    'suggested_books': ['No suggested books found'],
+}
+
+def test_sync_and_async_extractors_agree():
+    sync_values = {field: getattr(temp, f"extract_{field}")(FakePage()) for field in EXPECTED}
+
+    async def read_all():
+        return {field: await getattr(temp, f"extract_{field}_async")(FakePage(is_async=True)) for field in EXPECTED}
+
+    assert sync_values == asyncio.run(read_all()) == EXPECTED
+
+class FakeBrowser:
+    """new_context() fails on the calls listed in `failing`."""
+    def __init__(self, failing):
+        self.failing = failing
+        self.opened = 0
+        self.closed = 0
+
+    async def new_context(self):
+        self.opened += 1
+        if self.opened in self.failing:
+            raise RuntimeError("context crashed")
+        return SimpleNamespace(close=self._close_context)
+
+    async def _close_context(self):
+        self.closed += 1
+
+    async def close(self):
+        pass
+
+def test_slot_survives_a_failed_context(monkeypatch):
+    browser = FakeBrowser(failing={2})
+
+    @asynccontextmanager
+    async def fake_playwright():
+        async def launch():
+            return browser
+        yield SimpleNamespace(chromium=SimpleNamespace(launch=launch))
+
+    async def fake_scrape(context, url, timeout):
+        return {'title': url}
+
+    monkeypatch.setattr(temp, "async_playwright", fake_playwright)
+    monkeypatch.setattr(temp, "scrape_book_page_async", fake_scrape)
+    results = asyncio.run(asyncio.wait_for(
+        scrape_goodreads_pages_async(["a", "b", "c"], concurrency=1, block_resources=False, pages_per_context=1), 5))
+    assert [r['error'] for r in results] == [None, "context crashed", None]
+    assert [r['book_info'] and r['book_info']['title'] for r in results] == ["a", None, "c"]
+    assert browser.closed == browser.opened - 1
+
+def test_sync_wrapper_refuses_a_running_loop():
+    async def in_notebook():
+        with pytest.raises(RuntimeError, match="await scrape_goodreads_pages_async"):
+            scrape_goodreads_pages(["a"])
+
+    asyncio.run(in_notebook())
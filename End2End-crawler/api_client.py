@@ -1,41 +1,187 @@
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import logging
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Quota units per call, see https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+}
+# Conditional requests answered with 304 Not Modified are treated as free
+NOT_MODIFIED_COST = 0
+MAX_IDS_PER_CALL = 50
+
+def etag_cache_key(uri):
+    """A request URI without its API key, so cache entries neither hold the key nor depend on it."""
+    parts = urlsplit(uri)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != 'key']
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+class QuotaExceededError(Exception):
+    """Raised when a call would take the client over its quota budget."""
+
+class QuotaTracker:
+    """
+    Per-client quota accounting: units spent per method, against an optional daily budget.
+    """
+    def __init__(self, budget=10000):
+        self.budget = budget
+        self.used = 0
+        self.calls = {}
+        self.not_modified = 0
+        self.units_saved = 0
+
+    def check(self, method):
+        """Raise QuotaExceededError if a call to `method` could exceed the budget."""
+        cost = QUOTA_COSTS.get(method, 1)
+        if self.budget is not None and self.used + cost > self.budget:
+            raise QuotaExceededError(f"{method} costs {cost} units, {self.budget - self.used} of {self.budget} left")
+
+    def charge(self, method, not_modified=False):
+        cost = QUOTA_COSTS.get(method, 1)
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if not_modified:
+            self.not_modified += 1
+            self.units_saved += cost - NOT_MODIFIED_COST
+            cost = NOT_MODIFIED_COST
+        self.used += cost
+
+    def remaining(self):
+        return None if self.budget is None else self.budget - self.used
+
+    def stats(self):
+        return {
+            'used': self.used,
+            'budget': self.budget,
+            'remaining': self.remaining(),
+            'calls': dict(self.calls),
+            'not_modified': self.not_modified,
+            'units_saved': self.units_saved,
+        }
 
 class YouTubeAPIClient:
     """
     Client for interacting with the YouTube Data API.
+
+    Searches are paginated, video details are fetched in batches of 50 IDs per call, every call
+    is charged against a QuotaTracker, and responses are cached with their ETags so repeated
+    requests are sent as conditional requests (If-None-Match) and unchanged results cost no quota.
+    Pass `http` (e.g. googleapiclient.http.HttpMockSequence) to run offline against canned responses.
     """
-    def __init__(self, api_key):
+    def __init__(self, api_key, quota_budget=10000, http=None, etag_cache=None):
         self.api_key = api_key
+        self.quota = QuotaTracker(budget=quota_budget)
+        # {request uri without the key: (etag, response)}; any dict-like object works, e.g. a shelve for persistence
+        self.etag_cache = etag_cache if etag_cache is not None else {}
         try:
-            self.youtube = build('youtube', 'v3', developerKey=api_key)
+            self.youtube = build('youtube', 'v3', developerKey=api_key, http=http)
         except Exception as e:
             logging.error(f"Failed to initialize YouTube API client: {e}")
             self.youtube = None
 
-    def search_videos(self, query, max_results=10):
+    def _execute(self, method, request):
+        """Execute a request with quota accounting and ETag-based conditional caching."""
+        self.quota.check(method)
+        cache_key = etag_cache_key(request.uri)
+        cached = self.etag_cache.get(cache_key)
+        if cached:
+            request.headers['If-None-Match'] = cached[0]
+        try:
+            response = request.execute()
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                self.quota.charge(method, not_modified=True)
+                return cached[1]
+            self.quota.charge(method)
+            raise
+        self.quota.charge(method)
+        if response.get('etag'):
+            self.etag_cache[cache_key] = (response['etag'], response)
+        return response
+
+    def search_videos(self, query, max_results=10, order=None):
         """
-        Search for videos using the YouTube Data API.
-        Returns a list of dicts with 'title' and 'url'.
+        Search for videos using the YouTube Data API, following nextPageToken until
+        `max_results` videos are collected or the results run out.
+        Returns a list of dicts with 'title', 'url', 'video_id', 'channel' and 'published_at'.
         """
         if not self.youtube:
             logging.error("YouTube API client not initialized.")
             return []
+        results = []
+        page_token = None
         try:
-            request = self.youtube.search().list(
-                q=query,
-                part="snippet",
-                type="video",
-                maxResults=max_results
-            )
-            response = request.execute()
-            results = []
-            for item in response.get('items', []):
-                video_id = item['id']['videoId']
-                title = item['snippet']['title']
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                results.append({'title': title, 'url': url})
-            return results
+            while len(results) < max_results:
+                params = dict(q=query, part="snippet", type="video",
+                              maxResults=min(MAX_IDS_PER_CALL, max_results - len(results)))
+                if order:
+                    params['order'] = order
+                if page_token:
+                    params['pageToken'] = page_token
+                response = self._execute('search.list', self.youtube.search().list(**params))
+                for item in response.get('items', []):
+                    video_id = item['id']['videoId']
+                    snippet = item['snippet']
+                    results.append({
+                        'title': snippet['title'],
+                        'url': f"https://www.youtube.com/watch?v={video_id}",
+                        'video_id': video_id,
+                        'channel': snippet.get('channelTitle'),
+                        'published_at': snippet.get('publishedAt'),
+                    })
+                page_token = response.get('nextPageToken')
+                if not page_token or not response.get('items'):
+                    break
+        except QuotaExceededError as e:
+            logging.error(f"Quota budget reached while searching '{query}': {e}")
         except Exception as e:
             logging.error(f"Error searching videos: {e}")
-            return [] 
\ No newline at end of file
+        return results[:max_results]
+
+    def get_video_details(self, video_ids):
+        """
+        Fetch duration, statistics and caption availability for many videos, 50 IDs per call.
+        Returns {video_id: {'duration', 'view_count', 'like_count', 'comment_count', 'has_captions'}}.
+        """
+        if not self.youtube:
+            logging.error("YouTube API client not initialized.")
+            return {}
+        ids = list(dict.fromkeys(video_ids))
+        details = {}
+        try:
+            for start in range(0, len(ids), MAX_IDS_PER_CALL):
+                batch = ids[start:start + MAX_IDS_PER_CALL]
+                # maxResults does not apply to lookups by id; the batch size is the limit
+                request = self.youtube.videos().list(part="contentDetails,statistics", id=",".join(batch))
+                response = self._execute('videos.list', request)
+                for item in response.get('items', []):
+                    content = item.get('contentDetails', {})
+                    stats = item.get('statistics', {})
+                    details[item['id']] = {
+                        'duration': content.get('duration'),
+                        'view_count': int(stats['viewCount']) if 'viewCount' in stats else None,
+                        'like_count': int(stats['likeCount']) if 'likeCount' in stats else None,
+                        'comment_count': int(stats['commentCount']) if 'commentCount' in stats else None,
+                        'has_captions': content.get('caption') == 'true',
+                    }
+        except QuotaExceededError as e:
+            logging.error(f"Quota budget reached while fetching video details: {e}")
+        except Exception as e:
+            logging.error(f"Error fetching video details: {e}")
+        return details
+
+    def search_with_details(self, query, max_results=10, captions_only=False):
+        """
+        Search and enrich every result with get_video_details. With captions_only=True, videos
+        without captions are dropped so no transcript fetch is wasted on them.
+        """
+        videos = self.search_videos(query, max_results=max_results)
+        details = self.get_video_details([v['video_id'] for v in videos])
+        enriched = []
+        for video in videos:
+            video.update(details.get(video['video_id'], {}))
+            if captions_only and not video.get('has_captions'):
+                continue
+            enriched.append(video)
+        return enriched
@@ -0,0 +1,46 @@
+import pathlib
+import statistics
+import sys
+import time
+from selenium_crawler import SeleniumYouTubeCrawler
+
+FIXTURE = pathlib.Path(__file__).parent / "fixtures" / "youtube_results.html"
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted."""
+    counter = {'calls': 0}
+    original = driver.execute
+    def execute(*args, **kwargs):
+        counter['calls'] += 1
+        return original(*args, **kwargs)
+    driver.execute = execute
+    return counter
+
+def bench_mode(crawler, counter, mode, repeats):
+    crawler.extraction_mode = mode
+    timings = []
+    found = 0
+    counter['calls'] = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        found = len(list(crawler.extract_video_links()))
+        timings.append(time.perf_counter() - start)
+    return {
+        'mode': mode,
+        'videos': found,
+        'round_trips': counter['calls'] // repeats,
+        'median_ms': statistics.median(timings) * 1000,
+    }
+
+def main(repeats=20):
+    """Compare the one-call script extraction with the per-element WebDriver path on the saved results page."""
+    with SeleniumYouTubeCrawler(headless=True) as crawler:
+        crawler.driver.get(FIXTURE.resolve().as_uri())
+        counter = count_round_trips(crawler.driver)
+        results = [bench_mode(crawler, counter, mode, repeats) for mode in ('elements', 'script')]
+    for r in results:
+        print(f"{r['mode']:>8}: {r['videos']} videos, {r['round_trips']} WebDriver calls, {r['median_ms']:.1f} ms median")
+    print(f"speedup: {results[0]['median_ms'] / results[1]['median_ms']:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
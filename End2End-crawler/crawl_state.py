@@ -0,0 +1,176 @@
+import logging
+import sqlite3
+import time
+
+class SeenFilter:
+    """video_filter for crawl_search that rejects already-collected video IDs and counts the skips."""
+    def __init__(self, seen):
+        self.seen = seen
+        self.skipped = 0
+
+    def __call__(self, video_id):
+        if video_id in self.seen:
+            self.skipped += 1
+            return False
+        return True
+
+class ClaimFilter:
+    """
+    video_filter for crawl_search that lets a video through only for the first query of the run
+    that claims it, so videos shared by several queries are fetched once. Counts the duplicates.
+    """
+    def __init__(self, state, run_id, query):
+        self.state = state
+        self.run_id = run_id
+        self.query = query
+        self.duplicates = 0
+
+    def __call__(self, video_id):
+        if self.state.claim_video(self.run_id, self.query, video_id):
+            return True
+        self.duplicates += 1
+        return False
+
+class CrawlState:
+    """
+    Checkpoint store for crawl runs, kept in a SQLite file shared by the worker processes.
+
+    Records every run, per-query progress within a run (status, pages and videos done, videos
+    skipped), every video ID collected per query and which query of a run claimed each video
+    first. A run that is not finished when the next
+    one starts is resumed: queries it already completed are skipped and videos it already
+    collected are not fetched again. Across runs only videos not seen before are processed.
+    """
+    def __init__(self, path="crawl_state.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS query_progress (
+                run_id INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                status TEXT NOT NULL,
+                pages_done INTEGER NOT NULL DEFAULT 0,
+                videos_done INTEGER NOT NULL DEFAULT 0,
+                videos_skipped INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, query)
+            );
+            CREATE TABLE IF NOT EXISTS seen_videos (
+                query TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                run_id INTEGER NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (query, video_id)
+            );
+            CREATE TABLE IF NOT EXISTS run_claims (
+                run_id INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                query TEXT NOT NULL,
+                claimed_at REAL NOT NULL,
+                PRIMARY KEY (run_id, video_id)
+            );
+            """
+        )
+
+    def start_run(self):
+        """Return (run_id, resumed): the latest unfinished run if there is one, else a new run."""
+        row = self._conn.execute(
+            "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1"
+        ).fetchone()
+        if row:
+            logging.info(f"Resuming interrupted crawl run {row[0]}")
+            return row[0], True
+        cursor = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+        return cursor.lastrowid, False
+
+    def finish_run(self, run_id):
+        self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def query_done(self, run_id, query):
+        row = self._conn.execute(
+            "SELECT status FROM query_progress WHERE run_id = ? AND query = ?", (run_id, query)
+        ).fetchone()
+        return bool(row) and row[0] == 'done'
+
+    def start_query(self, run_id, query):
+        self._conn.execute(
+            """INSERT INTO query_progress (run_id, query, status, updated_at) VALUES (?, ?, 'running', ?)
+               ON CONFLICT (run_id, query) DO UPDATE SET status = 'running', updated_at = excluded.updated_at""",
+            (run_id, query, time.time()),
+        )
+
+    def finish_query(self, run_id, query, pages_done, videos_skipped):
+        """Mark a query done. pages_done is the furthest page reached, so a resumed query keeps the larger count."""
+        self._conn.execute(
+            """UPDATE query_progress SET status = 'done', pages_done = MAX(pages_done, ?),
+               videos_skipped = videos_skipped + ?, updated_at = ? WHERE run_id = ? AND query = ?""",
+            (pages_done, videos_skipped, time.time(), run_id, query),
+        )
+
+    def seen_video_ids(self, query=None):
+        """Every video ID already collected for this query (or, with query=None, for any query), in any run."""
+        if query is None:
+            return {row[0] for row in self._conn.execute("SELECT DISTINCT video_id FROM seen_videos")}
+        return {row[0] for row in self._conn.execute("SELECT video_id FROM seen_videos WHERE query = ?", (query,))}
+
+    def mark_video(self, run_id, query, video_id):
+        """Checkpoint one collected video; committed immediately so a crash does not lose it."""
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO seen_videos (query, video_id, run_id, seen_at) VALUES (?, ?, ?, ?)",
+            (query, video_id, run_id, time.time()),
+        )
+        if cursor.rowcount:
+            self._conn.execute(
+                """UPDATE query_progress SET videos_done = videos_done + 1, updated_at = ?
+                   WHERE run_id = ? AND query = ?""",
+                (time.time(), run_id, query),
+            )
+
+    def claim_video(self, run_id, query, video_id):
+        """
+        Claim a video for one query of a run, atomically across worker processes. True if this
+        query owns it (claimed now, or earlier by the same query, e.g. before an interruption).
+        """
+        self._conn.execute(
+            "INSERT OR IGNORE INTO run_claims (run_id, video_id, query, claimed_at) VALUES (?, ?, ?, ?)",
+            (run_id, video_id, query, time.time()),
+        )
+        row = self._conn.execute(
+            "SELECT query FROM run_claims WHERE run_id = ? AND video_id = ?", (run_id, video_id)
+        ).fetchone()
+        return row[0] == query
+
+    def run_summary(self, run_id, queries=None):
+        """Per-run totals, including how much work was skipped thanks to earlier runs."""
+        rows = self._conn.execute(
+            "SELECT query, status, pages_done, videos_done, videos_skipped FROM query_progress WHERE run_id = ?",
+            (run_id,),
+        ).fetchall()
+        progress = {row[0]: row[1:] for row in rows}
+        summary = {
+            'run_id': run_id,
+            'queries_done': sum(1 for status, *_ in progress.values() if status == 'done'),
+            'queries_incomplete': sum(1 for status, *_ in progress.values() if status != 'done'),
+            'pages_done': sum(p[1] for p in progress.values()),
+            'videos_new': sum(p[2] for p in progress.values()),
+            'videos_skipped': sum(p[3] for p in progress.values()),
+        }
+        if queries is not None:
+            summary['queries_not_started'] = sum(1 for q in queries if q not in progress)
+        return summary
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
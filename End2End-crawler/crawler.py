@@ -1,43 +1,168 @@
 import sys
 import logging
+import time
 from selenium_crawler import SeleniumYouTubeCrawler
-from parallel import parallel_crawl
+from http_crawler import HTTPYouTubeCrawler
+from driver_pool import get_worker_pool, init_worker_pool
+from transcript_cache import TranscriptCache
+from pacing import get_pacer
+from proxy_pool import get_proxy_pool
+from parallel import parallel_crawl, create_executor
+from sinks import JSONLSink, MultiSink, NearDuplicateSink, SearchIndexSink, StdoutSink
+from search_index import SearchIndex
+from crawl_state import ClaimFilter, CrawlState, SeenFilter
+from dedup import NearDuplicateIndex
+from metrics import Metrics, get_metrics, profiled
 from apscheduler.schedulers.blocking import BlockingScheduler
 
 logging.basicConfig(level=logging.INFO)
 
-def crawl_query(query, max_pages=3):
-    with SeleniumYouTubeCrawler() as crawler:
-        return crawler.crawl_search(query, max_pages=max_pages)
+MAX_WORKERS = 1  # Set to 1 for single process
+CRAWL_MODE = "http"  # "http": browserless with Selenium fallback, "selenium": always use the browser
+MAX_PAGES_PER_DRIVER = 50  # Recycle a browser after this many result pages
+TRANSCRIPT_CACHE_PATH = "transcript_cache.db"
+OUTPUT_PATH = "results.jsonl"  # One JSON record per line, appended as the crawl runs
+STATE_PATH = "crawl_state.db"  # Checkpoints for resuming interrupted runs and skipping known videos
+SEARCH_INDEX_PATH = "search_index.db"  # Full-text index of the timed transcripts (see search_index.py)
+DEDUP_PATH = "dedup.db"  # SimHash index of the transcripts and near-duplicate links (see dedup.py)
+METRICS_REPORT_PATH = "metrics_report.json"  # Per-run timing report (stage latencies, transcript outcomes, per-query totals)
+METRICS_PROM_PATH = "metrics.prom"  # Same metrics in the Prometheus text format, e.g. for node_exporter's textfile collector
+PROFILE_DIR = None  # Set to a directory to write one cProfile .prof file per query and worker
 
-def print_results(all_results, queries):
-    total = sum(len(r) for r in all_results)
-    print(f"Crawled {total} videos across {len(queries)} queries:")
-    for i, results in enumerate(all_results):
-        print(f"\nResults for '{queries[i]}':")
-        for video in results:
-            print(f"Title: {video['title']}\nURL: {video['url']}\nTranscript: {video['transcript'][:200] if video['transcript'] else 'No transcript'}\n---")
+_transcript_cache = None
+_crawl_state = None
 
-def main():
+def get_transcript_cache():
+    """Return this process's connection to the on-disk transcript cache."""
+    global _transcript_cache
+    if _transcript_cache is None:
+        _transcript_cache = TranscriptCache(TRANSCRIPT_CACHE_PATH)
+    return _transcript_cache
+
+def get_crawl_state():
+    """Return this process's connection to the crawl checkpoint store."""
+    global _crawl_state
+    if _crawl_state is None:
+        _crawl_state = CrawlState(STATE_PATH)
+    return _crawl_state
+
+def crawl_query_selenium(query, max_pages=3, video_filter=None):
+    """Crawl one query on a warm driver leased from this worker's pool. Yields records as they are ready."""
+    pool = get_worker_pool(size=1, max_pages_per_driver=MAX_PAGES_PER_DRIVER)
+    cache = get_transcript_cache()
+    with pool.lease() as entry:
+        with SeleniumYouTubeCrawler(driver=entry.driver, transcript_cache=cache) as crawler:
+            yield from crawler.crawl_search(query, max_pages=max_pages, video_filter=video_filter)
+            entry.pages += crawler.pages_crawled
+    logging.info(f"Driver pool stats: {pool.stats()}")
+    logging.info(f"Transcript cache stats: {cache.stats()}")
+
+def crawl_query_any(query, max_pages=3, video_filter=None):
+    """Crawl one query, over plain HTTP when possible and with the browser otherwise. Yields records as they are ready."""
+    if CRAWL_MODE == "selenium":
+        yield from crawl_query_selenium(query, max_pages=max_pages, video_filter=video_filter)
+        return
+    with HTTPYouTubeCrawler(fallback=crawl_query_selenium, transcript_cache=get_transcript_cache()) as crawler:
+        yield from crawler.crawl_search(query, max_pages=max_pages, video_filter=video_filter)
+    logging.info(f"Pacing: {get_pacer().rates()}")
+    if get_proxy_pool() is not None:
+        logging.info(f"Proxy pool: {get_proxy_pool().stats()}")
+
+def crawl_query(query, max_pages=3, run_id=None):
+    """
+    Crawl one query. With a run_id, progress is checkpointed in the crawl state store: videos
+    collected by any query in any earlier run (or earlier in an interrupted run) are skipped,
+    and every new video is recorded as soon as it is yielded. Videos another query of the same
+    run already claimed are skipped too, before their transcripts are fetched. The query is only
+    marked done when the crawl gets through all its pages; if it is cut short (CrawlAborted, e.g.
+    on a CAPTCHA) the error propagates and the query stays pending, so the next run resumes it.
+    """
+    metrics = get_metrics()
+    start = time.perf_counter()
+    videos = 0
+    try:
+        with profiled(f"query-{query}", PROFILE_DIR):
+            if run_id is None:
+                for record in crawl_query_any(query, max_pages=max_pages):
+                    videos += 1
+                    yield record
+            else:
+                state = get_crawl_state()
+                state.start_query(run_id, query)
+                # Checked across all queries: a video skipped here because another query claimed it is never
+                # recorded for this query, so a per-query check would fetch it again in the next run
+                seen = SeenFilter(state.seen_video_ids())
+                claims = ClaimFilter(state, run_id, query)
+                pages_done = 0
+                for record in crawl_query_any(query, max_pages=max_pages, video_filter=lambda vid: seen(vid) and claims(vid)):
+                    state.mark_video(run_id, query, record['video_id'])
+                    if record.get('page') is not None:
+                        pages_done = max(pages_done, record['page'] + 1)
+                    videos += 1
+                    yield record
+                state.finish_query(run_id, query, pages_done, seen.skipped)
+                metrics.inc('query_videos_skipped_total', seen.skipped, query=query)
+                metrics.inc('videos_duplicate_total', claims.duplicates, kind='exact')
+                logging.info(f"'{query}': skipped {seen.skipped} videos already collected by any query and "
+                             f"{claims.duplicates} already claimed by another query of this run")
+    finally:
+        metrics.inc('query_videos_total', videos, query=query)
+        metrics.observe('query_seconds', time.perf_counter() - start, query=query)
+
+def print_summary(counts, queries, summary=None, skipped_queries=()):
+    print(f"Crawled {sum(counts)} new videos across {len(queries)} queries (written to {OUTPUT_PATH}):")
+    for query, count in zip(queries, counts):
+        print(f"  '{query}': {count} videos")
+    if summary:
+        print(f"Run {summary['run_id']}: {summary['videos_new']} new videos, "
+              f"{summary['videos_skipped']} already-collected videos skipped, "
+              f"{len(skipped_queries)} queries skipped (already done before the run was interrupted)")
+
+def main(executor=None):
     queries = ["python tutorials"] # , "machine learning", "data science"]
     max_pages = 3
     try:
-        # Parallel crawling for multiple queries
-        args_list = [(q, max_pages) for q in queries]
-        # Set max_workers=1 for single process
-        all_results = parallel_crawl(crawl_query, args_list, max_workers=1)
-        print_results(all_results, queries)
+        with CrawlState(STATE_PATH) as state:
+            run_id, resumed = state.start_run()
+            skipped_queries = [q for q in queries if resumed and state.query_done(run_id, q)]
+            todo = [q for q in queries if q not in skipped_queries]
+            # Parallel crawling for multiple queries; each record is written as soon as it is crawled
+            args_list = [(q, max_pages, run_id) for q in todo]
+            run_metrics = Metrics()
+            # Near-duplicate transcripts are written as links to the original, not as copies
+            sinks = MultiSink(JSONLSink(OUTPUT_PATH), SearchIndexSink(SearchIndex(SEARCH_INDEX_PATH)), StdoutSink())
+            with NearDuplicateSink(sinks, NearDuplicateIndex(DEDUP_PATH)) as sink:
+                counts = parallel_crawl(crawl_query, args_list, max_workers=MAX_WORKERS, executor=executor, sink=sink,
+                                        metrics=run_metrics)
+            run_metrics.inc('videos_duplicate_total', sink.duplicates, kind='near')
+            summary = state.run_summary(run_id, queries)
+            run_metrics.write_json(METRICS_REPORT_PATH, run_id=run_id, resumed=resumed, summary=summary)
+            run_metrics.write_prometheus(METRICS_PROM_PATH)
+            logging.info(f"Metrics written to {METRICS_REPORT_PATH} and {METRICS_PROM_PATH}")
+            # Only a run in which every query completed is closed; otherwise the next run resumes it
+            if summary['queries_done'] == len(queries):
+                state.finish_run(run_id)
+            print_summary(counts, todo, summary, skipped_queries)
     except Exception as e:
         logging.error(f"Error in main: {e}")
 
 def schedule_crawling():
+    # Keep one worker pool alive across scheduled runs. Its browsers are launched up front only in selenium
+    # mode; in http mode they are a fallback, launched by the first query that needs one
+    if CRAWL_MODE == "selenium":
+        executor = create_executor(max_workers=MAX_WORKERS, initializer=init_worker_pool,
+                                   initargs=(True, MAX_PAGES_PER_DRIVER))
+    else:
+        executor = create_executor(max_workers=MAX_WORKERS)
     scheduler = BlockingScheduler()
-    scheduler.add_job(main, 'interval', hours=24)  # Run main() every 24 hours
+    scheduler.add_job(main, 'interval', hours=24, kwargs={'executor': executor})  # Run main() every 24 hours
     print("Scheduled crawling every 24 hours. Press Ctrl+C to exit.")
     try:
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         print("Scheduler stopped.")
+    finally:
+        executor.shutdown()
 
 if __name__ == "__main__":
     import sys
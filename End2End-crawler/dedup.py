@@ -0,0 +1,213 @@
+import hashlib
+import itertools
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+WORD_RE = re.compile(r"\w+")
+SHINGLE_SIZE = 3  # Words per shingle; 3-word shingles survive caption re-timing and small edits
+MAX_DISTANCE = 6  # Fingerprints at most this many bits apart (of 64) are near-duplicates; unrelated texts differ in ~32
+MIN_WORDS = 50  # Shorter transcripts ("[Music]") collide too easily to be compared
+
+# For every bit of a byte, the byte values that have it set
+_BYTES_WITH_BIT = [[value for value in range(256) if value >> bit & 1] for bit in range(8)]
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """
+    64-bit SimHash of a text over its word shingles, weighted by how often each shingle occurs.
+    Texts that share most of their shingles get fingerprints a few bits apart.
+    """
+    words = WORD_RE.findall(text.lower())
+    shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(max(len(words) - shingle_size + 1, 1)))
+    # Weights are summed per (byte position, byte value) and only split into bits at the end,
+    # which is far cheaper in Python than touching 64 counters per shingle
+    byte_weights = [[0] * 256 for _ in range(8)]
+    for shingle, weight in shingles.items():
+        for position, value in enumerate(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()):
+            byte_weights[position][value] += weight
+    weight_sum = sum(shingles.values())
+    fingerprint = 0
+    for position, weights in enumerate(byte_weights):
+        for bit, values in enumerate(_BYTES_WITH_BIT):
+            # Bit set when the shingles with this bit set outweigh those without it
+            if 2 * sum(map(weights.__getitem__, values)) > weight_sum:
+                fingerprint |= 1 << (8 * (7 - position) + bit)
+    return fingerprint
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+def _signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index that finds near-duplicate transcripts (reuploads, mirror channels).
+
+    Each fingerprint is cut into max_distance + 2 blocks. Two fingerprints at most max_distance
+    bits apart agree exactly on at least two blocks (pigeonhole), so every pair of blocks is
+    indexed as one LSH band and only the fingerprints sharing a band bucket are compared, instead
+    of every stored one. Near-duplicates are not added to the index themselves; they are recorded
+    as links to the video they duplicate.
+    """
+    def __init__(self, path="dedup.db", max_distance=MAX_DISTANCE, min_words=MIN_WORDS):
+        self.path = path
+        self.max_distance = max_distance
+        self.min_words = min_words
+        blocks = max_distance + 2
+        self._blocks = [(64 * i // blocks, 64 * (i + 1) // blocks) for i in range(blocks)]
+        self._block_pairs = list(itertools.combinations(range(blocks), 2))
+        self.bands = len(self._block_pairs)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                video_id TEXT PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                PRIMARY KEY (band, value, video_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS duplicates (
+                video_id TEXT PRIMARY KEY,
+                duplicate_of TEXT NOT NULL,
+                distance INTEGER NOT NULL,
+                found_at REAL NOT NULL
+            );
+            """
+        )
+        # Bands depend on max_distance, so the bands of an index built with another setting are rebuilt
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER)")
+        row = self._conn.execute("SELECT value FROM settings WHERE name = 'bands'").fetchone()
+        if row is None or row[0] != self.bands:
+            self._rebuild_bands()
+
+    def _band_values(self, fingerprint):
+        blocks = [(fingerprint >> low) & ((1 << (high - low)) - 1) for low, high in self._blocks]
+        return [(band, blocks[a] << 32 | blocks[b]) for band, (a, b) in enumerate(self._block_pairs)]
+
+    def _rebuild_bands(self):
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM bands")
+        for video_id, value in self._conn.execute("SELECT video_id, simhash FROM fingerprints").fetchall():
+            self._add_bands(video_id, _unsigned(value))
+        self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('bands', ?)", (self.bands,))
+        self._conn.execute("COMMIT")
+
+    def _add_bands(self, video_id, fingerprint):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO bands (band, value, video_id) VALUES (?, ?, ?)",
+            [(band, value, video_id) for band, value in self._band_values(fingerprint)],
+        )
+
+    def find(self, fingerprint, exclude=None):
+        """(video_id, distance) of the closest stored fingerprint within max_distance, or None."""
+        pairs = self._band_values(fingerprint)
+        rows = self._conn.execute(
+            f"""SELECT DISTINCT f.video_id, f.simhash FROM bands b JOIN fingerprints f ON f.video_id = b.video_id
+                WHERE {' OR '.join('(b.band = ? AND b.value = ?)' for _ in pairs)}""",
+            [x for pair in pairs for x in pair],
+        )
+        best = None
+        for video_id, value in rows:
+            if video_id == exclude:
+                continue
+            distance = hamming(fingerprint, _unsigned(value))
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (video_id, distance)
+        return best
+
+    def check(self, video_id, text):
+        """
+        Return (duplicate_of, distance) if the transcript nearly duplicates one already indexed
+        (and record the link), else index it and return None. Short texts are never duplicates.
+        """
+        if len(WORD_RE.findall(text)) < self.min_words:
+            return None
+        known = self._conn.execute("SELECT duplicate_of, distance FROM duplicates WHERE video_id = ?", (video_id,)).fetchone()
+        if known:
+            return known
+        fingerprint = simhash(text)
+        match = self.find(fingerprint, exclude=video_id)
+        self._conn.execute("BEGIN")
+        if match:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO duplicates (video_id, duplicate_of, distance, found_at) VALUES (?, ?, ?, ?)",
+                (video_id, match[0], match[1], time.time()),
+            )
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (video_id, simhash, added_at) VALUES (?, ?, ?)",
+                (video_id, _signed(fingerprint), time.time()),
+            )
+            self._add_bands(video_id, fingerprint)
+        self._conn.execute("COMMIT")
+        return match
+
+    def duplicates_of(self, video_id):
+        """Video IDs recorded as near-duplicates of video_id."""
+        return [row[0] for row in self._conn.execute("SELECT video_id FROM duplicates WHERE duplicate_of = ?", (video_id,))]
+
+    def stats(self):
+        fingerprints = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+        duplicates = self._conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0]
+        return {'fingerprints': fingerprints, 'duplicates': duplicates}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def synthetic_transcript(rng, words=600, vocabulary=20000):
+    return " ".join(f"w{rng.randrange(vocabulary)}" for _ in range(words))
+
+def mutate(rng, text, rate=0.01):
+    """Replace about `rate` of the words, like a reupload with slightly different captions."""
+    return " ".join(f"x{rng.randrange(10**6)}" if rng.random() < rate else word for word in text.split())
+
+def benchmark(n=100_000):
+    """Time near-duplicate checks as the index grows, and measure recall on lightly edited copies."""
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        with NearDuplicateIndex(os.path.join(tmp, "bench.db")) as index:
+            originals = []
+            start = time.perf_counter()
+            for i in range(n):
+                text = synthetic_transcript(rng)
+                if i % (n // 100 or 1) == 0:
+                    originals.append((f"vid{i}", text))
+                index.check(f"vid{i}", text)
+                if (i + 1) in (n // 10, n):
+                    t0 = time.perf_counter()
+                    for j in range(200):
+                        index.check(f"probe{i}-{j}", synthetic_transcript(rng))
+                    per_check = (time.perf_counter() - t0) / 200
+                    print(f"{i + 1:>8,} indexed: {per_check * 1000:.2f} ms per check (fingerprint included)")
+            print(f"indexed {n:,} transcripts in {time.perf_counter() - start:.0f}s")
+            found = sum(1 for video_id, text in originals
+                        if (match := index.check(f"copy-{video_id}", mutate(rng, text))) and match[0] == video_id)
+            print(f"near-duplicate recall with 1% of the words changed: {found}/{len(originals)}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
@@ -0,0 +1,175 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import util as mp_util
+from selenium_crawler import create_driver
+
+class PooledDriver:
+    """
+    A browser driver owned by a DriverPool, with bookkeeping for reuse and recycling.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, driver):
+        self.id = next(self._ids)
+        self.driver = driver
+        self.created_at = time.time()
+        self.uses = 0
+        self.pages = 0
+        self.failed = False
+
+class DriverPool:
+    """
+    Long-lived pool of warm Chrome drivers that are reused across queries.
+
+    Drivers are health-checked when they are handed out and recycled (quit and relaunched)
+    after `max_pages_per_driver` pages, after `max_uses_per_driver` leases, or after a crash.
+    """
+    def __init__(self, size=1, headless=True, max_pages_per_driver=50, max_uses_per_driver=None,
+                 driver_factory=None):
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_uses_per_driver = max_uses_per_driver
+        self.driver_factory = driver_factory or (lambda: create_driver(headless=self.headless))
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = {}
+        self._closed = False
+        self.launches = 0
+        self.recycled = 0
+
+    def _launch(self):
+        start = time.time()
+        entry = PooledDriver(self.driver_factory())
+        with self._lock:
+            self._all[entry.id] = entry
+            self.launches += 1
+        logging.info(f"Launched driver #{entry.id} in {time.time() - start:.1f}s")
+        return entry
+
+    def _retire(self, entry, reason):
+        with self._lock:
+            self._all.pop(entry.id, None)
+            self.recycled += 1
+        logging.info(f"Recycling driver #{entry.id} after {entry.uses} uses / {entry.pages} pages ({reason})")
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error closing driver #{entry.id}: {e}")
+
+    def is_healthy(self, entry):
+        """Cheap liveness probe: the browser must still answer a script round trip."""
+        if entry.failed:
+            return False
+        try:
+            return entry.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logging.warning(f"Health check failed for driver #{entry.id}: {e}")
+            return False
+
+    def _needs_recycle(self, entry):
+        if entry.failed:
+            return 'crash'
+        if self.max_pages_per_driver and entry.pages >= self.max_pages_per_driver:
+            return 'page limit'
+        if self.max_uses_per_driver and entry.uses >= self.max_uses_per_driver:
+            return 'use limit'
+        return None
+
+    def warm(self):
+        """Launch drivers until the pool holds `size` of them."""
+        while len(self._all) < self.size:
+            self._idle.put(self._launch())
+
+    def acquire(self, timeout=None):
+        """Take a healthy driver from the pool, launching one if the pool is not full yet."""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_launch = len(self._all) < self.size
+                if can_launch:
+                    entry = self._launch()
+                else:
+                    entry = self._idle.get(timeout=timeout)
+            if self.is_healthy(entry):
+                entry.uses += 1
+                return entry
+            self._retire(entry, 'unhealthy')
+
+    def release(self, entry, pages=0, failed=False):
+        """Return a driver to the pool, recycling it if it crashed or hit its limits."""
+        entry.pages += pages
+        entry.failed = entry.failed or failed
+        reason = self._needs_recycle(entry)
+        if reason is None and not self.is_healthy(entry):
+            reason = 'crash'
+        if reason or self._closed:
+            self._retire(entry, reason or 'pool closed')
+            return
+        self._idle.put(entry)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager around acquire/release. Exceptions mark the driver as failed."""
+        entry = self.acquire(timeout=timeout)
+        try:
+            yield entry
+        except Exception:
+            entry.failed = True
+            raise
+        finally:
+            self.release(entry)
+
+    def stats(self):
+        """Pool size, launch/recycle counts and per-driver reuse counts."""
+        with self._lock:
+            drivers = [{'id': e.id, 'uses': e.uses, 'pages': e.pages, 'age': round(time.time() - e.created_at, 1)}
+                       for e in self._all.values()]
+            return {
+                'size': self.size,
+                'live': len(self._all),
+                'idle': self._idle.qsize(),
+                'launches': self.launches,
+                'recycled': self.recycled,
+                'drivers': drivers,
+            }
+
+    def close(self):
+        """Quit every idle driver. Drivers still leased are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(entry, 'pool closed')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# One pool per worker process, created lazily and kept warm across queries.
+_worker_pool = None
+
+def get_worker_pool(**pool_kwargs):
+    """Return this process's DriverPool, creating it on first use."""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = DriverPool(**pool_kwargs)
+        # ProcessPoolExecutor workers exit through multiprocessing, which skips atexit but runs these finalizers.
+        mp_util.Finalize(_worker_pool, _worker_pool.close, exitpriority=10)
+    return _worker_pool
+
+def init_worker_pool(headless=True, max_pages_per_driver=50):
+    """ProcessPoolExecutor initializer: launch this worker's driver before the first query arrives."""
+    get_worker_pool(size=1, headless=headless, max_pages_per_driver=max_pages_per_driver).warm()
@@ -0,0 +1,276 @@
+import json
+import logging
+import random
+import re
+from urllib.parse import quote_plus
+import requests
+from selenium_crawler import PROXIES, USER_AGENTS, YOUTUBE_HOST, CrawlAborted, default_proxy_config
+from pacing import get_pacer, parse_retry_after
+from metrics import get_metrics
+from collections import deque
+from contextlib import ExitStack
+from transcript_fetcher import TranscriptFetcher, completed_in_order, make_proxied_transcript_api, make_transcript_api
+from proxy_pool import NoProxyAvailable, get_proxy_pool
+
+SEARCH_URL = "https://www.youtube.com/results?search_query={query}"
+CONTINUATION_URL = "https://www.youtube.com/youtubei/v1/search?key={key}&prettyPrint=false"
+BLOCK_MARKERS = ("www.google.com/recaptcha", "g-recaptcha", "/sorry/index", "unusual traffic from your computer")
+
+_INITIAL_DATA_RE = re.compile(r'(?:var\s+ytInitialData|window\["ytInitialData"\])\s*=\s*')
+_YTCFG_RE = re.compile(r'ytcfg\.set\(\s*(?=\{)')
+
+def _decode_json_after(pattern, html):
+    """Decode the JSON object that starts right after the first match of `pattern`, or return None."""
+    decoder = json.JSONDecoder()
+    for match in pattern.finditer(html):
+        try:
+            return decoder.raw_decode(html, match.end())[0]
+        except ValueError:
+            continue
+    return None
+
+def extract_initial_data(html):
+    """Return the ytInitialData object embedded in a YouTube page, or None."""
+    return _decode_json_after(_INITIAL_DATA_RE, html)
+
+def extract_ytcfg(html):
+    """Merge every ytcfg.set({...}) object in the page (API key, client context)."""
+    decoder = json.JSONDecoder()
+    config = {}
+    for match in _YTCFG_RE.finditer(html):
+        try:
+            config.update(decoder.raw_decode(html, match.end())[0])
+        except ValueError:
+            continue
+    return config
+
+def _walk(node):
+    """Yield every dict nested anywhere inside node."""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            yield item
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+def _text(field):
+    if not field:
+        return None
+    if 'simpleText' in field:
+        return field['simpleText']
+    return "".join(run.get('text', '') for run in field.get('runs', [])) or None
+
+def parse_search_results(data):
+    """
+    Parse a ytInitialData object or a youtubei continuation response.
+    Returns (videos, continuation_token) where videos is a list of {'title','url','video_id'} in page order.
+    """
+    videos = []
+    token = None
+    for node in _walk(data):
+        renderer = node.get('videoRenderer')
+        if renderer and renderer.get('videoId'):
+            title = _text(renderer.get('title'))
+            if title:
+                video_id = renderer['videoId']
+                videos.append({'title': title, 'url': f"https://www.youtube.com/watch?v={video_id}", 'video_id': video_id})
+        command = node.get('continuationCommand')
+        if command and command.get('token'):
+            token = command['token']
+    return videos, token
+
+def is_blocked(response):
+    """Detect rate limiting, CAPTCHA interstitials and the google.com/sorry redirect."""
+    if response.status_code in (403, 429):
+        return True
+    if "/sorry/" in response.url:
+        return True
+    text = response.text
+    return any(marker in text for marker in BLOCK_MARKERS)
+
+class HTTPYouTubeCrawler:
+    """
+    Browserless YouTube search crawler. Fetches the results page over a pooled HTTP session,
+    parses the embedded ytInitialData and follows continuation tokens for extra pages.
+    Falls back to `fallback(query, max_pages, video_filter=...)` (e.g. the Selenium crawler) when the page
+    cannot be parsed or looks blocked. With a proxy pool (by default one built from PROXIES, if
+    any), page and transcript requests go through its healthiest proxy and blocked pages count as bans;
+    when no proxy frees up within `proxy_timeout` seconds, the request is sent directly.
+    """
+    def __init__(self, fallback=None, session=None, transcript_concurrency=8, transcript_timeout=20,
+                 transcript_cache=None, max_videos_per_page=10, timeout=15, pacer=None, proxy_pool=None,
+                 proxy_timeout=30):
+        self.fallback = fallback
+        self.pacer = pacer or get_pacer()
+        self.timeout = timeout
+        self.max_videos_per_page = max_videos_per_page
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            'User-Agent': random.choice(USER_AGENTS),
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        # Skip the EU consent interstitial so the results page is served directly
+        self.session.cookies.set('CONSENT', 'YES+cb', domain='.youtube.com')
+        self.seen_video_ids = set()
+        self.pages_crawled = 0
+        self.fallbacks = 0
+        self.proxy_pool = proxy_pool or get_proxy_pool(PROXIES)
+        self.proxy_timeout = proxy_timeout
+        proxy_config = default_proxy_config()
+        self.transcripts = TranscriptFetcher(
+            api_factory=lambda: make_transcript_api(proxy_config=proxy_config, timeout=transcript_timeout),
+            max_concurrency=transcript_concurrency,
+            cache=transcript_cache,
+            proxy_pool=self.proxy_pool,
+            proxy_api_factory=lambda proxy_url: make_proxied_transcript_api(proxy_url, timeout=transcript_timeout),
+            proxy_timeout=proxy_timeout,
+        )
+
+    def _request(self, method, url, **kwargs):
+        """Send one page request, through the best proxy of the pool when there is one."""
+        if self.proxy_pool is None:
+            return self.session.request(method, url, timeout=self.timeout, **kwargs)
+        with ExitStack() as stack:
+            try:
+                lease = stack.enter_context(self.proxy_pool.lease(self.proxy_timeout))
+            except NoProxyAvailable as e:
+                logging.warning(f"Requesting {url} without a proxy: {e}")
+                get_metrics().inc('proxy_fallbacks_total', target='page')
+                return self.session.request(method, url, timeout=self.timeout, **kwargs)
+            response = self.session.request(method, url, timeout=self.timeout, proxies=lease.proxy.requests_proxies,
+                                            **kwargs)
+            if is_blocked(response):
+                lease.outcome = 'banned'
+            elif response.status_code >= 500:
+                lease.outcome = 'error'
+            return response
+
+    def fetch_first_page(self, query):
+        """Return (videos, continuation_token, ytcfg) for the first results page, or None if unusable."""
+        metrics = get_metrics()
+        with metrics.timer('stage_seconds', crawler='http', stage='pacer_wait'):
+            self.pacer.wait(YOUTUBE_HOST)
+        with metrics.timer('stage_seconds', crawler='http', stage='page_load'):
+            response = self._request('GET', SEARCH_URL.format(query=quote_plus(query)))
+        if is_blocked(response):
+            metrics.inc('blocked_total', crawler='http')
+            self.pacer.penalize(YOUTUBE_HOST, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            logging.warning(f"HTTP search for '{query}' looks blocked (status {response.status_code})")
+            return None
+        self.pacer.success(YOUTUBE_HOST)
+        with metrics.timer('stage_seconds', crawler='http', stage='extraction'):
+            data = extract_initial_data(response.text)
+            if data is None:
+                logging.warning(f"No ytInitialData in search page for '{query}'")
+                return None
+            videos, token = parse_search_results(data)
+            return videos, token, extract_ytcfg(response.text)
+
+    def fetch_continuation(self, token, ytcfg):
+        """Return (videos, next_token) for a continuation token, or None on failure."""
+        key = ytcfg.get('INNERTUBE_API_KEY')
+        context = ytcfg.get('INNERTUBE_CONTEXT')
+        if not key or not context:
+            return None
+        metrics = get_metrics()
+        with metrics.timer('stage_seconds', crawler='http', stage='pacer_wait'):
+            self.pacer.wait(YOUTUBE_HOST)
+        with metrics.timer('stage_seconds', crawler='http', stage='page_load'):
+            response = self._request(
+                'POST',
+                CONTINUATION_URL.format(key=key),
+                json={'context': context, 'continuation': token},
+            )
+        blocked = is_blocked(response)
+        if blocked:
+            metrics.inc('blocked_total', crawler='http')
+            self.pacer.penalize(YOUTUBE_HOST, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code != 200 or blocked:
+            logging.warning(f"Continuation request failed (status {response.status_code})")
+            return None
+        self.pacer.success(YOUTUBE_HOST)
+        try:
+            with metrics.timer('stage_seconds', crawler='http', stage='extraction'):
+                return parse_search_results(response.json())
+        except ValueError as e:
+            logging.warning(f"Could not decode continuation response: {e}")
+            return None
+
+    def _new_videos(self, videos, video_filter=None):
+        new = []
+        for video in videos:
+            if len(new) >= self.max_videos_per_page:
+                break
+            if video['video_id'] in self.seen_video_ids:
+                continue
+            self.seen_video_ids.add(video['video_id'])
+            if video_filter is not None and not video_filter(video['video_id']):
+                continue
+            new.append(video)
+        return new
+
+    def _fall_back(self, query, max_pages, video_filter=None):
+        if self.fallback is None:
+            raise CrawlAborted(f"HTTP crawl failed for '{query}' and no fallback is configured")
+        self.fallbacks += 1
+        get_metrics().inc('fallbacks_total')
+        logging.info(f"Falling back to browser crawl for '{query}'")
+        yield from self.fallback(query, max_pages, video_filter=video_filter)
+
+    def crawl_search(self, query, max_pages=1, video_filter=None):
+        """
+        Crawl YouTube search results for a given query over plain HTTP, including transcripts.
+        Like SeleniumYouTubeCrawler.crawl_search this is a generator of records, takes the same `video_filter`
+        and raises CrawlAborted when a continuation page cannot be fetched.
+        """
+        try:
+            first = self.fetch_first_page(query)
+        except requests.RequestException as e:
+            logging.error(f"HTTP error fetching search page: {e}")
+            first = None
+        if first is None:
+            yield from self._fall_back(query, max_pages, video_filter=video_filter)
+            return
+        videos, token, ytcfg = first
+        pending = deque()
+        aborted = None
+        for page in range(max_pages):
+            self.pages_crawled += 1
+            get_metrics().inc('pages_total', crawler='http')
+            for video in self._new_videos(videos, video_filter=video_filter):
+                future = self.transcripts.submit(video['video_id'], video_url=video['url'])
+                pending.append((dict(video, page=page), future))
+            yield from completed_in_order(pending)
+            if page + 1 >= max_pages or not token:
+                break
+            try:
+                more = self.fetch_continuation(token, ytcfg)
+            except requests.RequestException as e:
+                logging.error(f"HTTP error fetching continuation: {e}")
+                more = None
+            if more is None:
+                aborted = f"continuation for page {page + 2} failed"
+                break
+            videos, token = more
+        yield from completed_in_order(pending, wait=True)
+        if aborted:
+            raise CrawlAborted(f"Crawl of '{query}' stopped early: {aborted}")
+
+    def close(self):
+        """Stop the transcript workers and close the HTTP session."""
+        self.transcripts.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# Example usage
+if __name__ == "__main__":
+    with HTTPYouTubeCrawler() as crawler:
+        for result in crawler.crawl_search("python tutorials", max_pages=2):
+            print(f"Title: {result['title']}, URL: {result['url']}")
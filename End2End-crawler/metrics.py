@@ -0,0 +1,216 @@
+import bisect
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from a cache hit to a slow page load behind a backoff
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram of observed durations, in the Prometheus layout."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, data):
+        for i, n in enumerate(data['counts']):
+            self.counts[i] += n
+        self.sum += data['sum']
+        self.count += data['count']
+        self.max = max(self.max, data['max'])
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated linearly inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        return {'buckets': list(self.buckets), 'counts': list(self.counts), 'sum': self.sum,
+                'count': self.count, 'max': self.max}
+
+class Metrics:
+    """
+    Thread-safe registry of labelled counters and duration histograms for one process.
+
+    Worker processes ship their measurements to the parent with drain() and the parent folds
+    them into the run's registry with merge(); the result is exported as a JSON run report
+    (report / write_json) and in the Prometheus text format (to_prometheus / write_prometheus),
+    e.g. for node_exporter's textfile collector.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the with-block, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _data(self):
+        return {
+            'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+            'histograms': [[name, list(labels), h.to_dict()] for (name, labels), h in self._histograms.items()],
+        }
+
+    def snapshot(self):
+        """Picklable copy of every counter and histogram."""
+        with self._lock:
+            return self._data()
+
+    def drain(self):
+        """snapshot() and reset, so the next snapshot only holds what was measured since."""
+        with self._lock:
+            data = self._data()
+            self._counters = {}
+            self._histograms = {}
+        return data
+
+    def merge(self, data):
+        """Add a snapshot (e.g. from a worker process) into this registry."""
+        with self._lock:
+            for name, labels, value in data['counters']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, hist in data['histograms']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(hist['buckets'])
+                histogram.merge(hist)
+
+    def report(self):
+        """Summary for humans: counter values and count/total/mean/p50/p95/max per histogram."""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), h in sorted(self._histograms.items()):
+                histograms.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': h.count,
+                    'total_seconds': round(h.sum, 3),
+                    'mean_seconds': round(h.sum / h.count, 4) if h.count else None,
+                    'p50_seconds': h.quantile(0.5),
+                    'p95_seconds': h.quantile(0.95),
+                    'max_seconds': round(h.max, 4),
+                })
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self, prefix="youtube_crawler_"):
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} counter")
+                    typed.add(name)
+                lines.append(f"{prefix}{name}{_format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f"{prefix}{name}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+                lines.append(f"{prefix}{name}_sum{_format_labels(labels)} {h.sum}")
+                lines.append(f"{prefix}{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path, **extra):
+        """Write the run report, plus any extra fields (e.g. run_id, summary), as JSON."""
+        _write_atomic(path, json.dumps(dict(extra, generated_at=time.time(), **self.report()), indent=2))
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+def _write_atomic(path, text):
+    # Readers such as the node_exporter textfile collector must never see a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+_metrics = None
+
+def get_metrics():
+    """Return the Metrics registry shared by everything running in this process."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+@contextmanager
+def profiled(name, directory=None):
+    """
+    cProfile the with-block (current thread only) and dump the stats to
+    `directory`/<name>-<pid>.prof. Does nothing when directory is None.
+    """
+    if directory is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        path = os.path.join(directory, f"{safe_name}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        logging.info(f"Profile written to {path} (inspect with: python -m pstats {path})")
@@ -0,0 +1,140 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+class HostState:
+    """Token bucket and backoff state for one host."""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.clean_streak = 0
+
+class Pacer:
+    """
+    Adaptive per-host pacing shared by the crawlers.
+
+    Each host gets a token bucket refilled at `rate` requests per second. When a host pushes
+    back (CAPTCHA, 429) its rate is cut by `backoff_factor` and requests pause for an
+    exponentially growing cooldown; after `recovery_after` clean responses in a row the rate
+    grows again by `recovery_factor`, up to `max_rate`. The human-like jitter delays are scaled
+    by `base_rate / rate`, so they shrink while a host is happy and stretch while it is not.
+    """
+    def __init__(self, base_rate=0.5, min_rate=0.02, max_rate=2.0, burst=2, backoff_factor=0.5,
+                 recovery_factor=1.25, recovery_after=3, initial_backoff=5.0, max_backoff=300.0):
+        self.base_rate = base_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self.recovery_after = recovery_after
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host):
+        return urlparse(url_or_host).netloc or url_or_host
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.base_rate, self.burst)
+        return state
+
+    def _reserve(self, host):
+        """Take a token for host and return how long the caller has to wait for it."""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            state.tokens -= 1
+            wait = max(0.0, -state.tokens / state.rate)
+            return max(wait, state.blocked_until - now)
+
+    def wait(self, url_or_host):
+        """Block until the host's rate limit and any backoff cooldown allow another request."""
+        delay = self._reserve(self.host_of(url_or_host))
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def delay_scale(self, url_or_host):
+        with self._lock:
+            return self.base_rate / self._state(self.host_of(url_or_host)).rate
+
+    def pause(self, url_or_host, low, high):
+        """Sleep a random human-like delay in [low, high], scaled by how hard the host is pushing back."""
+        delay = random.uniform(low, high) * self.delay_scale(url_or_host)
+        time.sleep(delay)
+        return delay
+
+    def success(self, url_or_host):
+        """Record a clean response; speeds the host back up after a streak of them."""
+        host = self.host_of(url_or_host)
+        with self._lock:
+            state = self._state(host)
+            state.strikes = 0
+            state.clean_streak += 1
+            if state.clean_streak >= self.recovery_after:
+                state.clean_streak = 0
+                state.rate = min(self.max_rate, state.rate * self.recovery_factor)
+
+    def penalize(self, url_or_host, retry_after=None):
+        """Record push-back (CAPTCHA, 429): slow the host down and back off exponentially."""
+        host = self.host_of(url_or_host)
+        with self._lock:
+            state = self._state(host)
+            state.clean_streak = 0
+            state.strikes += 1
+            state.rate = max(self.min_rate, state.rate * self.backoff_factor)
+            backoff = min(self.max_backoff, self.initial_backoff * 2 ** (state.strikes - 1))
+            if retry_after is not None:
+                backoff = max(backoff, retry_after)
+            state.blocked_until = time.monotonic() + backoff
+            state.tokens = min(state.tokens, 0)
+        logging.warning(f"Backing off {host} for {backoff:.0f}s, rate now {state.rate:.3f} req/s")
+        return backoff
+
+    def rate(self, url_or_host):
+        """Current requests-per-second allowance for a host."""
+        with self._lock:
+            return self._state(self.host_of(url_or_host)).rate
+
+    def rates(self):
+        """Current rate and backoff state of every host seen so far."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(state.rate, 4),
+                    'delay_scale': round(self.base_rate / state.rate, 2),
+                    'strikes': state.strikes,
+                    'backoff_remaining': round(max(0.0, state.blocked_until - now), 1),
+                }
+                for host, state in self._hosts.items()
+            }
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (only the delta-seconds form), or None."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+_pacer = None
+
+def get_pacer():
+    """Return the Pacer shared by every crawler in this process."""
+    global _pacer
+    if _pacer is None:
+        _pacer = Pacer()
+    return _pacer
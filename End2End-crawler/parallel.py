@@ -1,19 +1,79 @@
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import multiprocessing
+import queue as queue_module
+from metrics import get_metrics
 
-def parallel_crawl(crawl_func, args_list, max_workers=4):
+def create_executor(max_workers=4, initializer=None, initargs=()):
     """
-    Run crawl_func in parallel with different arguments. Logs errors and returns empty results for failed processes.
+    Create a process pool that can be kept alive and reused across parallel_crawl runs,
+    so per-worker state (e.g. warm browser drivers) survives between runs.
     """
-    results = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_to_args = {executor.submit(crawl_func, *args): args for args in args_list}
-        for future in as_completed(future_to_args):
-            args = future_to_args[future]
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+def _stream_records(crawl_func, args, index, out_queue):
+    """Worker side: iterate crawl_func(*args) and push each record to the parent as soon as it exists."""
+    error = None
+    try:
+        for record in crawl_func(*args):
+            out_queue.put(('record', index, record))
+    except Exception as e:
+        error = str(e)
+    # Ship what this job measured in the worker, so the parent can report on the whole run
+    out_queue.put(('metrics', index, get_metrics().drain()))
+    out_queue.put(('done', index, error))
+
+def parallel_crawl(crawl_func, args_list, max_workers=4, executor=None, sink=None, metrics=None):
+    """
+    Run crawl_func in parallel with different arguments. crawl_func may return a list or be a generator.
+
+    Records are streamed back from the workers while they crawl. Each record is tagged with
+    'query' (the first argument of its job) and 'rank' (its position within that job) and, if a
+    `sink` is given, written to it immediately, so memory stays flat however large the run is.
+    Without a sink the records are collected and returned as one list per job, in args_list order.
+    With a sink the number of records per job is returned instead. Errors are logged and a failed
+    job simply ends early. Pass a long-lived `executor` (see create_executor) to reuse its worker
+    processes instead of starting a new pool for this run. Each job's worker-side measurements
+    are merged into `metrics` (a metrics.Metrics) when one is given.
+    """
+    results = [[] for _ in args_list]
+    counts = [0] * len(args_list)
+    own_executor = executor is None
+    if own_executor:
+        executor = create_executor(max_workers=max_workers)
+    manager = multiprocessing.Manager()
+    try:
+        out_queue = manager.Queue()
+        futures = {executor.submit(_stream_records, crawl_func, args, i, out_queue): i
+                   for i, args in enumerate(args_list)}
+        remaining = set(range(len(args_list)))
+        while remaining:
             try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                logging.error(f"Error in process for args {args}: {e}")
-                results.append([])
-    return results 
\ No newline at end of file
+                kind, i, payload = out_queue.get(timeout=1)
+            except queue_module.Empty:
+                # A worker that died hard (e.g. BrokenProcessPool) never sends its 'done' message
+                for future, i in futures.items():
+                    if i in remaining and future.done() and future.exception() is not None:
+                        logging.error(f"Error in process for args {args_list[i]}: {future.exception()}")
+                        remaining.discard(i)
+                continue
+            if kind == 'metrics':
+                if metrics is not None:
+                    metrics.merge(payload)
+                continue
+            if kind == 'done':
+                if payload:
+                    logging.error(f"Error in process for args {args_list[i]}: {payload}")
+                remaining.discard(i)
+                continue
+            record = {'query': args_list[i][0], 'rank': counts[i], **payload}
+            counts[i] += 1
+            if sink is not None:
+                sink.write(record)
+            else:
+                results[i].append(record)
+    finally:
+        manager.shutdown()
+        if own_executor:
+            executor.shutdown()
+    return counts if sink is not None else results
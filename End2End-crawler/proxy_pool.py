@@ -0,0 +1,330 @@
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import requests
+from metrics import get_metrics
+
+# Lightweight URL that answers 204 when the proxy can reach YouTube at all
+PROBE_URL = "https://www.youtube.com/generate_204"
+
+class NoProxyAvailable(Exception):
+    """Raised by ProxyPool.acquire when no proxy frees up before the timeout."""
+
+def normalize_proxy_url(proxy):
+    """'host:port' or 'user:pass@host:port' entries (as in PROXIES) become http:// URLs."""
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+def proxy_name(url):
+    """host:port of a proxy URL, without credentials, for logs and metric labels."""
+    parsed = urlparse(url)
+    return f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname or url
+
+class ProxyState:
+    """Health of one proxy: EWMA latency and success rate, ban and failure counts, quarantine."""
+    def __init__(self, url, max_concurrency):
+        self.url = url
+        self.name = proxy_name(url)
+        self.max_concurrency = max_concurrency
+        self.latency = None  # EWMA of request seconds, None until the first answer
+        self.success_rate = 1.0  # EWMA of 1 (usable answer) / 0 (error or ban)
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.bans = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0  # quarantines in a row; each one lasts twice as long as the last
+        self.quarantined_until = None
+        self.probing = False
+
+    @property
+    def requests_proxies(self):
+        """The `proxies` argument for requests."""
+        return {'http': self.url, 'https': self.url}
+
+class ProxyLease:
+    """A proxy checked out of a ProxyPool. Set `outcome` to 'ok', 'error' or 'banned' to override the default."""
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.outcome = None
+
+class ProxyPool:
+    """
+    Routes requests to the healthiest proxy that has a free slot.
+
+    Every proxy keeps an EWMA of its latency and success rate. acquire() picks the proxy with the
+    best expected throughput, success_rate / (latency * (in_flight + 1)), so fast, reliable proxies
+    take most of the load and in-flight requests are spread out; no proxy ever runs more than
+    `max_concurrency` requests at once. A ban (e.g. YouTube's RequestBlocked, a 429 or a CAPTCHA)
+    or `failure_threshold` errors in a row put the proxy in quarantine, which doubles in length
+    with every relapse up to `max_quarantine_seconds`. When a quarantine ends, the proxy is checked
+    with `probe(url) -> bool` in the background before it takes traffic again. Without a probe it
+    gets a single trial request instead.
+    """
+    def __init__(self, proxies, max_concurrency=4, alpha=0.2, failure_threshold=3, quarantine_seconds=300.0,
+                 max_quarantine_seconds=3600.0, probe=None, default_latency=1.0, clock=time.monotonic):
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max_quarantine_seconds
+        self.probe = probe
+        self.default_latency = default_latency
+        self.clock = clock
+        self._proxies = [ProxyState(normalize_proxy_url(p), max_concurrency) for p in dict.fromkeys(proxies)]
+        self._cond = threading.Condition()
+
+    def _score(self, proxy):
+        latency = proxy.latency if proxy.latency is not None else self.default_latency
+        return proxy.success_rate / (max(latency, 1e-3) * (proxy.in_flight + 1))
+
+    def _usable(self, proxy, now):
+        if proxy.probing or proxy.in_flight >= proxy.max_concurrency:
+            return False
+        if proxy.quarantined_until is None:
+            return True
+        # Quarantine over and no probe: allow one trial request at a time
+        return self.probe is None and proxy.quarantined_until <= now and proxy.in_flight == 0
+
+    def _start_probes(self, now):
+        for proxy in self._proxies:
+            if (self.probe is not None and not proxy.probing and proxy.quarantined_until is not None
+                    and proxy.quarantined_until <= now):
+                proxy.probing = True
+                threading.Thread(target=self._run_probe, args=(proxy,), daemon=True, name=f"probe-{proxy.name}").start()
+
+    def _run_probe(self, proxy):
+        try:
+            ok = bool(self.probe(proxy.url))
+        except Exception as e:
+            logging.info(f"Probe of proxy {proxy.name} failed: {e}")
+            ok = False
+        with self._cond:
+            proxy.probing = False
+            if ok:
+                self._reinstate(proxy)
+            else:
+                self._quarantine(proxy, "probe failed")
+            self._cond.notify_all()
+
+    def _reinstate(self, proxy):
+        logging.info(f"Proxy {proxy.name} is back in rotation")
+        proxy.quarantined_until = None
+        proxy.consecutive_failures = 0
+        proxy.success_rate = max(proxy.success_rate, 0.5)
+
+    def _quarantine(self, proxy, reason):
+        proxy.quarantines += 1
+        duration = min(self.max_quarantine_seconds, self.quarantine_seconds * 2 ** (proxy.quarantines - 1))
+        proxy.quarantined_until = self.clock() + duration
+        get_metrics().inc('proxy_quarantines_total', proxy=proxy.name)
+        logging.warning(f"Proxy {proxy.name} quarantined for {duration:.0f}s ({reason})")
+
+    def _next_change(self, now):
+        """Seconds until a quarantine ends, or None if none is pending."""
+        ends = [p.quarantined_until for p in self._proxies if p.quarantined_until is not None and not p.probing]
+        return max(0.0, min(ends) - now) if ends else None
+
+    def acquire(self, timeout=None):
+        """Check out the best available proxy, waiting up to `timeout` seconds for one to free up."""
+        # The deadline is real time; self.clock only drives quarantines
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = self.clock()
+                self._start_probes(now)
+                candidates = [p for p in self._proxies if self._usable(p, now)]
+                if candidates:
+                    proxy = max(candidates, key=lambda p: (self._score(p), -p.requests))
+                    proxy.in_flight += 1
+                    proxy.requests += 1
+                    return proxy
+                wait = self._next_change(now)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise NoProxyAvailable(f"No proxy available within {timeout}s: {self.stats()}")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(None if wait is None else max(wait, 0.01))
+
+    def release(self, proxy, outcome, latency=None):
+        """Return a proxy with the outcome of its request: 'ok', 'error' or 'banned'."""
+        metrics = get_metrics()
+        metrics.inc('proxy_requests_total', proxy=proxy.name, outcome=outcome)
+        if latency is not None:
+            metrics.observe('proxy_request_seconds', latency, proxy=proxy.name)
+        with self._cond:
+            proxy.in_flight -= 1
+            ok = outcome == 'ok'
+            proxy.success_rate += self.alpha * ((1.0 if ok else 0.0) - proxy.success_rate)
+            if latency is not None and outcome != 'banned':
+                proxy.latency = latency if proxy.latency is None else proxy.latency + self.alpha * (latency - proxy.latency)
+            if ok:
+                proxy.consecutive_failures = 0
+                if proxy.quarantined_until is not None:
+                    self._reinstate(proxy)
+                else:
+                    proxy.quarantines = 0
+            else:
+                proxy.failures += 1
+                proxy.consecutive_failures += 1
+                if outcome == 'banned':
+                    proxy.bans += 1
+                if proxy.quarantined_until is not None and proxy.quarantined_until <= self.clock():
+                    self._quarantine(proxy, f"trial request: {outcome}")
+                elif proxy.quarantined_until is None and (
+                        outcome == 'banned' or proxy.consecutive_failures >= self.failure_threshold):
+                    self._quarantine(proxy, "banned" if outcome == 'banned' else
+                                     f"{proxy.consecutive_failures} failures in a row")
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        acquire() and release() around the with-block, timing it. The outcome is 'ok' unless the
+        block raises ('error') or sets lease.outcome itself, e.g. to 'banned'.
+        """
+        lease = ProxyLease(self.acquire(timeout))
+        start = time.perf_counter()
+        try:
+            yield lease
+        except BaseException:
+            self.release(lease.proxy, lease.outcome or 'error', time.perf_counter() - start)
+            raise
+        self.release(lease.proxy, lease.outcome or 'ok', time.perf_counter() - start)
+
+    def stats(self):
+        """Health of every proxy, best first."""
+        now = self.clock()
+        with self._cond:
+            rows = [{
+                'proxy': p.name,
+                'score': round(self._score(p), 3),
+                'latency': None if p.latency is None else round(p.latency, 3),
+                'success_rate': round(p.success_rate, 3),
+                'in_flight': p.in_flight,
+                'requests': p.requests,
+                'failures': p.failures,
+                'bans': p.bans,
+                'quarantine_remaining': None if p.quarantined_until is None else round(max(0.0, p.quarantined_until - now), 1),
+            } for p in self._proxies]
+        return sorted(rows, key=lambda row: -row['score'])
+
+def http_probe(url=PROBE_URL, timeout=10):
+    """probe function for ProxyPool: the proxy is healthy if `url` answers with a 2xx/3xx through it."""
+    def probe(proxy_url):
+        response = requests.get(url, proxies={'http': proxy_url, 'https': proxy_url}, timeout=timeout,
+                                allow_redirects=False)
+        return response.status_code < 400
+    return probe
+
+_pool = None
+
+def get_proxy_pool(proxies=None, **kwargs):
+    """
+    Return the ProxyPool shared by every crawler in this process, built from `proxies` on first
+    use (with http_probe unless a probe is passed). Returns None when there are no proxies.
+    """
+    global _pool
+    if _pool is None and proxies:
+        kwargs.setdefault('probe', http_probe())
+        _pool = ProxyPool(proxies, **kwargs)
+    return _pool
+
+class _StandInProxy(BaseHTTPRequestHandler):
+    """Answers proxied GETs itself, with the delay, error rate and ban behaviour of its server."""
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            banned = server.ban_after is not None and server.requests > server.ban_after
+        time.sleep(server.delay * random.uniform(0.5, 1.5))
+        if banned:
+            status = 429
+        elif random.random() < server.error_rate:
+            status = 502
+        else:
+            status = 200
+        body = b"ok" if status == 200 else b"blocked" if status == 429 else b"bad gateway"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_stand_in_proxy(delay=0.05, error_rate=0.0, ban_after=None):
+    """Local stand-in proxy server on a free port, served from a daemon thread. Returns (server, url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInProxy)
+    server.daemon_threads = True
+    server.delay, server.error_rate, server.ban_after = delay, error_rate, ban_after
+    server.requests, server.lock = 0, threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def simulate(requests_total=600, threads=16):
+    """
+    Send the same workload through random.choice over the proxy list and through a ProxyPool, using
+    local stand-in proxies (two fast, one slow, one flaky, one that gets banned), and compare
+    throughput and how many paid proxy requests each successful answer costs.
+    """
+    profiles = [dict(delay=0.05), dict(delay=0.05), dict(delay=0.5), dict(delay=0.05, error_rate=0.4),
+                dict(delay=0.05, ban_after=20)]
+    target = "http://video.invalid/api/timedtext"
+
+    def run(label, fetch):
+        servers = [start_stand_in_proxy(**profile) for profile in profiles]
+        urls = [url for _, url in servers]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            ok = sum(executor.map(lambda _: fetch(urls), range(requests_total)))
+        elapsed = time.perf_counter() - start
+        paid = sum(server.requests for server, _ in servers)
+        for server, _ in servers:
+            server.shutdown()
+        print(f"{label:12} {ok}/{requests_total} ok in {elapsed:5.1f}s = {ok / elapsed:6.1f} ok/s, "
+              f"{paid} proxy requests, {paid / max(ok, 1):.2f} per success")
+
+    def via_random(urls):
+        # Like the old random.choice(PROXIES) with a retry on another random proxy
+        for _ in range(3):
+            url = random.choice(urls)
+            try:
+                if requests.get(target, proxies={'http': url}, timeout=5).status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+        return False
+
+    pools = {}
+
+    def via_pool(urls):
+        pool = pools.setdefault(tuple(urls), ProxyPool(urls, max_concurrency=4, quarantine_seconds=30))
+        for _ in range(3):
+            with pool.lease() as lease:
+                try:
+                    status = requests.get(target, proxies=lease.proxy.requests_proxies, timeout=5).status_code
+                except requests.RequestException:
+                    lease.outcome = 'error'
+                    continue
+                lease.outcome = 'ok' if status == 200 else 'banned' if status == 429 else 'error'
+                if status == 200:
+                    return True
+        return False
+
+    run("random", via_random)
+    run("proxy pool", via_pool)
+    for row in next(iter(pools.values())).stats():
+        print(f"  {row}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    if sys.argv[1:2] == ["--simulate"]:
+        simulate(int(sys.argv[2]) if len(sys.argv) > 2 else 600)
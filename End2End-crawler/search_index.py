@@ -0,0 +1,264 @@
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Marks the first match in highlight() output; the characters never occur in transcript text
+MATCH_START, MATCH_END = "\x02", "\x03"
+# Consecutive transcript segments are indexed together in windows of about this many seconds,
+# so phrases that straddle two short caption segments still match
+WINDOW_SECONDS = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    title TEXT,
+    text TEXT NOT NULL,
+    start REAL,
+    duration REAL,
+    offsets TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_source ON documents (kind, source_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    text, content='documents', content_rowid='doc_id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, text) VALUES (new.doc_id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, text) VALUES ('delete', old.doc_id, old.text);
+END;
+"""
+
+def segment_windows(segments, window_seconds=WINDOW_SECONDS):
+    """
+    Group consecutive {'text','start','duration'} segments into windows of about window_seconds.
+    Yields (text, start, duration, offsets) where offsets lists [char offset, start] for every
+    segment in the window, so a match position can be mapped back to its own timestamp.
+    """
+    window, offsets, length = [], [], 0
+    for seg in segments:
+        text = seg['text'].replace("\n", " ").strip()
+        if not text:
+            continue
+        if window and seg['start'] - window[0]['start'] >= window_seconds:
+            yield _window(window, offsets)
+            window, offsets, length = [], [], 0
+        offsets.append([length, seg['start']])
+        window.append(dict(seg, text=text))
+        length += len(text) + 1
+    if window:
+        yield _window(window, offsets)
+
+def _window(window, offsets):
+    start = window[0]['start']
+    end = window[-1]['start'] + (window[-1].get('duration') or 0)
+    return " ".join(seg['text'] for seg in window), start, end - start, offsets
+
+def literal_query(text):
+    """FTS5 query for the words of `text` taken literally: every word quoted, so operators and symbols lose their meaning."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+def quote_id(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+class SearchIndex:
+    """
+    Persistent full-text index over crawled transcripts and quotes, built on SQLite FTS5.
+
+    Transcripts are indexed per window of timed segments, so hits come back with the video ID and
+    the offset (in seconds) of the matching segment. Queries use FTS5 syntax: words (implicit AND),
+    "exact phrases", OR, NOT, NEAR(a b, 5) and prefix*. Results are ranked by bm25 and answered from
+    the inverted index, never by scanning the documents.
+    """
+    def __init__(self, path="search_index.db", mmap_size=2**30):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Postings are read straight from the mapped file instead of being copied through the page cache
+        self._conn.execute(f"PRAGMA mmap_size={mmap_size}")
+        self._conn.execute("PRAGMA cache_size=-262144")
+        self._conn.executescript(SCHEMA)
+
+    def _replace(self, kind, source_id, rows):
+        """Replace every document of one source with `rows` of (title, text, start, duration, offsets)."""
+        self._conn.execute("DELETE FROM documents WHERE kind = ? AND source_id = ?", (kind, source_id))
+        self._conn.executemany(
+            "INSERT INTO documents (kind, source_id, title, text, start, duration, offsets) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(kind, source_id) + row for row in rows],
+        )
+
+    def _transaction(self, func, items):
+        count = 0
+        self._conn.execute("BEGIN")
+        try:
+            for item in items:
+                count += func(item)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def _index_record(self, record):
+        segments = record.get('segments')
+        if segments is None and record.get('transcript'):
+            # Records written before segments were kept: one untimed document
+            segments = [{'text': record['transcript'], 'start': 0.0, 'duration': None}]
+        if not segments:
+            return 0
+        rows = [(record.get('title'), text, start, duration, json.dumps(offsets))
+                for text, start, duration, offsets in segment_windows(segments)]
+        self._replace('transcript', record['video_id'], rows)
+        return 1
+
+    def index_records(self, records):
+        """Index crawl records ({'video_id','title','segments'} or legacy 'transcript'). Returns videos indexed."""
+        return self._transaction(self._index_record, records)
+
+    def index_transcript(self, video_id, segments, title=None):
+        return self.index_records([{'video_id': video_id, 'title': title, 'segments': segments}])
+
+    def _index_quote(self, quote):
+        self._replace('quote', quote_id(quote['text']), [(quote.get('author'), quote['text'], None, None, None)])
+        return 1
+
+    def index_quotes(self, quotes):
+        """Index {'text','author'} quote dicts. Returns quotes indexed."""
+        return self._transaction(self._index_quote, quotes)
+
+    def index_jsonl(self, path, batch_size=1000):
+        """Index every record of a JSONL crawl output (e.g. results.jsonl), batch_size records per transaction."""
+        total, batch = 0, []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    total += self.index_records(batch)
+                    batch = []
+        return total + self.index_records(batch)
+
+    def search(self, query, limit=20, kind=None):
+        """
+        Ranked hits for an FTS5 query. Each hit is a dict with 'kind', 'source_id' (the video ID for
+        transcripts), 'title', 'offset' (seconds into the video of the first matching segment, None for
+        quotes), 'snippet' and 'score' (bm25, lower is better). A query that is not valid FTS5 syntax
+        (e.g. "c++" or an unbalanced quote) is searched for literally instead.
+        """
+        sql = f"""SELECT d.kind, d.source_id, d.title, d.start, d.offsets,
+                         highlight(documents_fts, 0, '{MATCH_START}', '{MATCH_END}'),
+                         snippet(documents_fts, 0, '[', ']', '...', 12), documents_fts.rank
+                  FROM documents_fts JOIN documents d ON d.doc_id = documents_fts.rowid
+                  WHERE documents_fts MATCH ?{' AND d.kind = ?' if kind else ''}
+                  ORDER BY documents_fts.rank LIMIT ?"""
+        params = (kind, limit) if kind else (limit,)
+        try:
+            rows = self._conn.execute(sql, (query,) + params).fetchall()
+        except sqlite3.OperationalError as e:
+            literal = literal_query(query)
+            if not literal:
+                return []
+            logging.info(f"Not a valid FTS5 query ({e}), searching for {literal} instead")
+            rows = self._conn.execute(sql, (literal,) + params).fetchall()
+        hits = []
+        for kind_, source_id, title, start, offsets, highlighted, snippet, score in rows:
+            hits.append({
+                'kind': kind_,
+                'source_id': source_id,
+                'title': title,
+                'offset': self._match_offset(start, offsets, highlighted),
+                'snippet': snippet,
+                'score': score,
+            })
+        return hits
+
+    @staticmethod
+    def _match_offset(start, offsets, highlighted):
+        if not offsets:
+            return start
+        position = highlighted.find(MATCH_START)
+        if position < 0:
+            return start
+        offsets = json.loads(offsets)
+        index = bisect.bisect_right([char for char, _ in offsets], position) - 1
+        return offsets[max(index, 0)][1]
+
+    def stats(self):
+        rows = self._conn.execute("SELECT kind, COUNT(*), COUNT(DISTINCT source_id) FROM documents GROUP BY kind")
+        return {kind: {'documents': docs, 'sources': sources} for kind, docs, sources in rows}
+
+    def optimize(self):
+        """Merge the FTS5 b-tree segments; worth running after a large bulk load."""
+        self._conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def synthetic_transcripts(n, segments_per_video=40, vocabulary=20000, seed=0):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    # Zipf-like word frequencies, as in real speech
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    for i in range(n):
+        segments = []
+        for s in range(segments_per_video):
+            text = " ".join(rng.choices(words, cum_weights=cum_weights, k=8))
+            segments.append({'text': text, 'start': s * 4.0, 'duration': 4.0})
+        yield {'video_id': f"vid{i:07d}", 'title': f"Synthetic video {i}", 'segments': segments}
+
+def benchmark(n=200_000):
+    """Build an index over n synthetic transcripts and time ranked word, phrase and boolean queries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with SearchIndex(os.path.join(tmp, "bench.db")) as index:
+            start = time.perf_counter()
+            batch = []
+            for record in synthetic_transcripts(n):
+                batch.append(record)
+                if len(batch) >= 5000:
+                    index.index_records(batch)
+                    batch = []
+            index.index_records(batch)
+            index.optimize()
+            print(f"indexed {n:,} transcripts in {time.perf_counter() - start:.0f}s: {index.stats()}")
+            for query in ['w1500', '"w3 w7"', 'w1200 AND w1300', 'w900 OR w901 NOT w5', 'NEAR(w800 w801, 3)']:
+                timings = []
+                for _ in range(5):
+                    t0 = time.perf_counter()
+                    hits = index.search(query, limit=10)
+                    timings.append(time.perf_counter() - t0)
+                print(f"{query!r}: best of 5 {min(timings) * 1000:.1f} ms, top hit {hits[0]['source_id'] if hits else None}"
+                      f" @ {hits[0]['offset'] if hits else None}s")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
+    elif sys.argv[1:2] == ["build"]:
+        with SearchIndex() as index:
+            for path in sys.argv[2:] or ["results.jsonl"]:
+                logging.info(f"Indexed {index.index_jsonl(path)} videos from {path}")
+            logging.info(f"Index: {index.stats()}")
+    else:
+        with SearchIndex() as index:
+            for hit in index.search(" ".join(sys.argv[1:])):
+                if hit['kind'] == 'transcript':
+                    print(f"https://www.youtube.com/watch?v={hit['source_id']}&t={int(hit['offset'] or 0)}s  {hit['snippet']}")
+                else:
+                    print(f"[{hit['kind']}] {hit['title']}: {hit['snippet']}")
@@ -9,8 +9,12 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 from youtube_transcript_api.proxies import WebshareProxyConfig
+from collections import deque
+from transcript_fetcher import TranscriptFetcher, completed_in_order, make_proxied_transcript_api, make_transcript_api
+from proxy_pool import get_proxy_pool
+from pacing import get_pacer
+from metrics import get_metrics
 from tqdm import tqdm
 logging.basicConfig(level=logging.INFO)
 
@@ -30,58 +34,109 @@ USER_AGENTS = [
 PROXIES = [
 ]
 
-def human_like_scroll(driver, total_scrolls=5):
+class CrawlAborted(Exception):
+    """Raised by crawl_search after yielding what it had, when the crawl stopped before its last page."""
+
+# Collects every visible search result link in a single WebDriver round trip
+EXTRACT_VIDEOS_JS = """
+return Array.from(document.querySelectorAll('#video-title')).map(function (el) {
+    var link = el.href ? el : el.closest('a');
+    var visible = el.getClientRects().length > 0;
+    return {
+        title: el.getAttribute('title') || (el.textContent || '').trim(),
+        href: link ? link.href : null,
+        visible: visible,
+    };
+}).filter(function (v) { return v.visible && v.title && v.href; });
+"""
+
+YOUTUBE_HOST = "www.youtube.com"
+
+def _sleep(pacer, host, low, high):
+    """Random delay in [low, high], scaled by the pacer's view of the host when one is given."""
+    with get_metrics().timer('stage_seconds', crawler='selenium', stage='jitter'):
+        if pacer is not None:
+            pacer.pause(host, low, high)
+        else:
+            time.sleep(random.uniform(low, high))
+
+def human_like_scroll(driver, total_scrolls=5, pacer=None, host=YOUTUBE_HOST):
     """Scrolls the page in a human-like way."""
     for _ in range(total_scrolls):
         scroll_amount = random.randint(200, 800)
         driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-        time.sleep(random.uniform(1.0, 3.0))
+        _sleep(pacer, host, 1.0, 3.0)
 
-def human_like_mouse_move(driver):
+def human_like_mouse_move(driver, pacer=None, host=YOUTUBE_HOST):
     """Moves the mouse to a random element to simulate human behavior."""
     actions = ActionChains(driver)
     elements = driver.find_elements(By.CSS_SELECTOR, "a, button, input")
     if elements:
         element = random.choice(elements)
         actions.move_to_element(element).perform()
-        time.sleep(random.uniform(0.5, 1.5))
+        _sleep(pacer, host, 0.5, 1.5)
 
-class SeleniumYouTubeCrawler:
-    """
-    Crawler for YouTube using Selenium. Handles pagination, cookies, authentication, CAPTCHA detection, and human-mimicry.
-    """
-    def __init__(self, headless=True, cookies=None):
-        user_agent = random.choice(USER_AGENTS)
-        chrome_binary = "/opt/google/chrome/chrome"
-        
-        # Set up Chrome options
-        options = uc.ChromeOptions()
-        options.add_argument(f'user-agent={user_agent}')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--headless' if headless else '')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')  # Added for stability in headless mode
-        
-        # Enable ChromeDriver logging for debugging
-        service = Service(log_path="chromedriver.log")
-        
-        # Initialize the driver
-        self.driver = uc.Chrome(
+def default_proxy_config():
+    """Proxy for YouTubeTranscriptApi."""
+    # proxy_addr = random.choice(PROXIES)
+    # proxy_url = f"http://{proxy_addr}"
+    # proxy_config = WebshareProxyConfig(http_url=proxy_url, https_url=proxy_url)
+    return WebshareProxyConfig(
+        proxy_username="",
+        proxy_password="",
+    )
+
+def create_driver(headless=True):
+    """Launch a stealth Chrome driver with a random user agent."""
+    user_agent = random.choice(USER_AGENTS)
+    chrome_binary = "/opt/google/chrome/chrome"
+    
+    # Set up Chrome options
+    options = uc.ChromeOptions()
+    options.add_argument(f'user-agent={user_agent}')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--headless' if headless else '')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')  # Added for stability in headless mode
+    
+    # Enable ChromeDriver logging for debugging
+    service = Service(log_path="chromedriver.log")
+    
+    # Initialize the driver
+    with get_metrics().timer('stage_seconds', crawler='selenium', stage='driver_startup'):
+        return uc.Chrome(
             service=service,
             options=options,
             browser_executable_path=chrome_binary
         )
+
+class SeleniumYouTubeCrawler:
+    """
+    Crawler for YouTube using Selenium. Handles pagination, cookies, authentication, CAPTCHA detection, and human-mimicry.
+    """
+    def __init__(self, headless=True, cookies=None, driver=None, transcript_concurrency=8, transcript_timeout=20,
+                 transcript_cache=None, extraction_mode='script', max_videos_per_page=10, pacer=None, proxy_pool=None):
+        # A driver passed in (e.g. leased from a DriverPool) is borrowed, not owned: close() leaves it running.
+        self._owns_driver = driver is None
+        self.driver = driver if driver is not None else create_driver(headless=headless)
+        self.pages_crawled = 0
+        # 'script' pulls all result links in one execute_script call; 'elements' is the per-element WebDriver path
+        self.extraction_mode = extraction_mode
+        self.max_videos_per_page = max_videos_per_page
+        self.seen_video_ids = set()
+        self.pacer = pacer or get_pacer()
         self.cookies = cookies or []
         self._load_cookies()
-        # --- Proxy for YouTubeTranscriptApi ---
-        # proxy_addr = random.choice(PROXIES)
-        # proxy_url = f"http://{proxy_addr}"
-        # proxy_config = WebshareProxyConfig(http_url=proxy_url, https_url=proxy_url)
-        proxy_config=WebshareProxyConfig(
-            proxy_username="",
-            proxy_password="",
+        proxy_config = default_proxy_config()
+        # Transcripts are fetched on a bounded thread pool while the browser keeps crawling,
+        # through the health-scored PROXIES pool when PROXIES is filled in
+        self.transcripts = TranscriptFetcher(
+            api_factory=lambda: make_transcript_api(proxy_config=proxy_config, timeout=transcript_timeout),
+            max_concurrency=transcript_concurrency,
+            cache=transcript_cache,
+            proxy_pool=proxy_pool or get_proxy_pool(PROXIES),
+            proxy_api_factory=lambda proxy_url: make_proxied_transcript_api(proxy_url, timeout=transcript_timeout),
         )
-        self.youtube_api = YouTubeTranscriptApi(proxy_config=proxy_config)
 
     def _load_cookies(self):
         """Load cookies into the browser for session management."""
@@ -106,50 +161,106 @@ class SeleniumYouTubeCrawler:
     def get_transcript(self, video_url, languages=['en']):
         """Fetch transcript for a given YouTube video URL. Returns transcript as text or None if not available."""
         video_id = self.extract_youtube_id(video_url)
-        
-        try:
-            transcript = self.youtube_api.fetch(video_id=video_id, languages=languages)
-            return " ".join([seg.text for seg in transcript])
-        except (TranscriptsDisabled, NoTranscriptFound):
-            return None
-        except Exception as e:
-            logging.warning(f"Transcript fetch error for {video_url}: {e}, video id: {video_id}")
-            return None
+        return self.transcripts.fetch(video_id, languages=languages, video_url=video_url)
+
+    def _extract_video_links_script(self):
+        for video in self.driver.execute_script(EXTRACT_VIDEOS_JS) or []:
+            yield {'title': video['title'], 'url': video['href'], 'video_id': self.extract_youtube_id(video['href'])}
+
+    def _extract_video_links_elements(self):
+        for video in self.driver.find_elements(By.ID, 'video-title'):
+            try:
+                if video.is_displayed() and video.is_enabled():
+                    title = video.get_attribute('title')
+                    href = video.get_attribute('href')
+                    if title and href:
+                        yield {'title': title, 'url': href, 'video_id': self.extract_youtube_id(href)}
+            except Exception as e:
+                logging.error(f"Error accessing video element: {e}")
+
+    def extract_video_links(self):
+        """Yield {'title','url','video_id'} for each visible search result on the current page."""
+        if self.extraction_mode == 'elements':
+            return self._extract_video_links_elements()
+        return self._extract_video_links_script()
+
+    def new_video_links(self, limit=None, video_filter=None):
+        """
+        Yield up to `limit` result links whose video IDs have not been seen earlier in this session.
+        Videos rejected by `video_filter(video_id)` are skipped without counting towards the limit.
+        """
+        count = 0
+        for link in self.extract_video_links():
+            if limit is not None and count >= limit:
+                break
+            if not link['video_id'] or link['video_id'] in self.seen_video_ids:
+                continue
+            self.seen_video_ids.add(link['video_id'])
+            if video_filter is not None and not video_filter(link['video_id']):
+                continue
+            count += 1
+            yield link
 
-    def crawl_search(self, query, max_pages=1):
-        """Crawl YouTube search results for a given query, including transcripts."""
-        results = []
+    def crawl_search(self, query, max_pages=1, video_filter=None):
+        """
+        Crawl YouTube search results for a given query, including transcripts.
+        If given, `video_filter(video_id)` decides which videos to process (e.g. only ones not crawled before).
+        This is a generator: transcript fetches are submitted as soon as a page's videos are known
+        and run concurrently while the browser moves on, and each {'title','url','transcript'}
+        record is yielded, in page order, as soon as its transcript is ready. If a CAPTCHA or an
+        error stops the crawl early, CrawlAborted is raised once the records already found are out.
+        """
+        pending = deque()
+        aborted = None
+        metrics = get_metrics()
         url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
         try:
-            self.driver.get(url)
-            time.sleep(random.uniform(2.0, 4.0))  # Initial random delay
+            with metrics.timer('stage_seconds', crawler='selenium', stage='pacer_wait'):
+                self.pacer.wait(YOUTUBE_HOST)
+            with metrics.timer('stage_seconds', crawler='selenium', stage='page_load'):
+                self.driver.get(url)
+            _sleep(self.pacer, YOUTUBE_HOST, 2.0, 4.0)  # Initial random delay
             for page in range(max_pages):
-                human_like_scroll(self.driver, total_scrolls=random.randint(2, 5))
-                human_like_mouse_move(self.driver)
-                time.sleep(random.uniform(2.0, 5.0))
+                self.pages_crawled += 1
+                metrics.inc('pages_total', crawler='selenium')
+                with metrics.timer('stage_seconds', crawler='selenium', stage='scroll'):
+                    human_like_scroll(self.driver, total_scrolls=random.randint(2, 5), pacer=self.pacer)
+                    human_like_mouse_move(self.driver, pacer=self.pacer)
+                _sleep(self.pacer, YOUTUBE_HOST, 2.0, 5.0)
+                with metrics.timer('stage_seconds', crawler='selenium', stage='captcha_check'):
+                    captcha = self.detect_captcha()
+                if captcha:
+                    metrics.inc('captchas_total', crawler='selenium')
+                    self.pacer.penalize(YOUTUBE_HOST)
+                    logging.error(f"CAPTCHA detected while crawling '{query}', stopping")
+                    aborted = "CAPTCHA"
+                    break
                 try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.visibility_of_any_elements_located((By.ID, 'video-title'))
-                    )
+                    with metrics.timer('stage_seconds', crawler='selenium', stage='results_wait'):
+                        WebDriverWait(self.driver, 10).until(
+                            EC.visibility_of_any_elements_located((By.ID, 'video-title'))
+                        )
                 except Exception as e:
+                    metrics.inc('results_wait_timeouts_total', crawler='selenium')
                     logging.error(f"Timeout waiting for video elements: {e}")
                     continue
-                videos = self.driver.find_elements(By.ID, 'video-title')
-                for video in tqdm(videos[:10], desc="analyzing videos ..."):
-                    try:
-                        if video.is_displayed() and video.is_enabled():
-                            title = video.get_attribute('title')
-                            href = video.get_attribute('href')
-                            if title and href:
-                                transcript = self.get_transcript(href)
-                                results.append({'title': title, 'url': href, 'transcript': transcript})
-                    except Exception as e:
-                        logging.error(f"Error accessing video element: {e}")
+                self.pacer.success(YOUTUBE_HOST)
+                # Results stay in the DOM as we scroll, so only videos not seen on earlier pages are new
+                with metrics.timer('stage_seconds', crawler='selenium', stage='extraction'):
+                    links = list(self.new_video_links(limit=self.max_videos_per_page, video_filter=video_filter))
+                for link in links:
+                    future = self.transcripts.submit(link['video_id'], video_url=link['url'])
+                    pending.append((dict(link, page=page), future))
+                yield from completed_in_order(pending)
         except WebDriverException as e:
             logging.error(f"WebDriver error: {e}")
+            aborted = f"WebDriver error: {e}"
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
-        return results
+            aborted = f"unexpected error: {e}"
+        yield from tqdm(completed_in_order(pending, wait=True), total=len(pending), desc="fetching transcripts ...")
+        if aborted:
+            raise CrawlAborted(f"Crawl of '{query}' stopped early: {aborted}")
 
     def detect_captcha(self):
         """Detect if a CAPTCHA is present."""
@@ -165,7 +276,10 @@ class SeleniumYouTubeCrawler:
             return False
 
     def close(self):
-        """Close the driver."""
+        """Stop the transcript workers and close the driver, unless it is borrowed from a pool."""
+        self.transcripts.close()
+        if not self._owns_driver:
+            return
         try:
             self.driver.quit()
         except Exception as e:
@@ -180,7 +294,6 @@ class SeleniumYouTubeCrawler:
 # Example usage
 if __name__ == "__main__":
     crawler = SeleniumYouTubeCrawler(headless=True)
-    results = crawler.crawl_search("python tutorials", max_pages=1)
-    for result in results:
+    for result in crawler.crawl_search("python tutorials", max_pages=1):
         print(f"Title: {result['title']}, URL: {result['url']}")
     crawler.close()
\ No newline at end of file
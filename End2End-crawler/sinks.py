@@ -0,0 +1,125 @@
+import json
+import sqlite3
+import sys
+
+class Sink:
+    """
+    Destination for crawl records. Records are written one at a time as soon as they exist,
+    so partial runs still leave usable output.
+    """
+    def write(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class JSONLSink(Sink):
+    """Appends one JSON object per line and flushes after every record."""
+    def __init__(self, path, mode="a"):
+        self.path = path
+        self._file = open(path, mode, encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class SQLiteSink(Sink):
+    """Inserts records into a SQLite table, committing every `commit_every` records."""
+    def __init__(self, path, table="videos", commit_every=20):
+        self.table = table
+        self.commit_every = commit_every
+        self._pending = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                query TEXT,
+                rank INTEGER,
+                video_id TEXT,
+                title TEXT,
+                url TEXT,
+                transcript TEXT,
+                extra TEXT
+            )"""
+        )
+
+    def write(self, record):
+        known = ('query', 'rank', 'video_id', 'title', 'url', 'transcript')
+        extra = {k: v for k, v in record.items() if k not in known}
+        self._conn.execute(
+            f"INSERT INTO {self.table} (query, rank, video_id, title, url, transcript, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            tuple(record.get(k) for k in known) + (json.dumps(extra, ensure_ascii=False) if extra else None,),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+class StdoutSink(Sink):
+    """Prints each record's query, rank, title, URL and the first 200 characters of its transcript."""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, record):
+        transcript = record.get('transcript')
+        print(f"[{record.get('query')} #{record.get('rank')}] Title: {record['title']}\nURL: {record['url']}\n"
+              f"Transcript: {transcript[:200] if transcript else 'No transcript'}\n---", file=self.stream)
+
+class SearchIndexSink(Sink):
+    """Adds each record's timed transcript to a search_index.SearchIndex as it arrives."""
+    def __init__(self, index):
+        self.index = index
+
+    def write(self, record):
+        self.index.index_records([record])
+
+    def close(self):
+        self.index.close()
+
+class NearDuplicateSink(Sink):
+    """
+    Checks each record's transcript against a dedup.NearDuplicateIndex before passing it on to
+    `sink`. A near-duplicate (reupload, mirror channel) is passed on as a link: 'duplicate_of' and
+    'duplicate_distance' are set and the copied transcript and segments are dropped.
+    """
+    def __init__(self, sink, index):
+        self.sink = sink
+        self.index = index
+        self.duplicates = 0
+
+    def write(self, record):
+        if record.get('transcript'):
+            match = self.index.check(record['video_id'], record['transcript'])
+            if match:
+                self.duplicates += 1
+                record = dict(record, transcript=None, segments=None, duplicate_of=match[0], duplicate_distance=match[1])
+        self.sink.write(record)
+
+    def close(self):
+        self.sink.close()
+        self.index.close()
+
+class MultiSink(Sink):
+    """Fans each record out to several sinks."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
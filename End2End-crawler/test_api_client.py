@@ -0,0 +1,67 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+from googleapiclient.http import HttpMockSequence
+from api_client import YouTubeAPIClient, etag_cache_key
+
+def ok(body):
+    return ({'status': '200'}, json.dumps(body))
+
+def search_page(ids, next_page=None, etag=None):
+    page = {'items': [{'id': {'videoId': vid}, 'snippet': {'title': f"Video {vid}", 'channelTitle': "Channel"}}
+                      for vid in ids]}
+    if next_page:
+        page['nextPageToken'] = next_page
+    if etag:
+        page['etag'] = etag
+    return ok(page)
+
+def params(uri):
+    return parse_qs(urlsplit(uri).query)
+
+def make_client(responses, **kwargs):
+    http = HttpMockSequence(responses)
+    return YouTubeAPIClient("secret-key", http=http, **kwargs), http
+
+def test_search_follows_page_tokens():
+    client, http = make_client([search_page(["a", "b"], next_page="p2"), search_page(["c", "d"])])
+    videos = client.search_videos("python", max_results=3)
+    assert [v['video_id'] for v in videos] == ["a", "b", "c"]
+    first, second = (params(request[0]) for request in http.request_sequence)
+    assert first['maxResults'] == ["3"] and 'pageToken' not in first
+    assert second['pageToken'] == ["p2"] and second['maxResults'] == ["1"]
+    assert client.quota.stats()['calls'] == {'search.list': 2}
+    assert client.quota.used == 200
+
+def test_video_details_are_batched_50_ids_per_call():
+    ids = [f"v{i}" for i in range(120)]
+    pages = [ok({'items': [{'id': vid, 'contentDetails': {'duration': "PT1M", 'caption': "true"},
+                            'statistics': {'viewCount': "7"}} for vid in ids[start:start + 50]]})
+             for start in range(0, 120, 50)]
+    client, http = make_client(pages)
+    details = client.get_video_details(ids + ids[:10])
+    assert len(details) == 120 and details["v0"] == {'duration': "PT1M", 'view_count': 7, 'like_count': None,
+                                                     'comment_count': None, 'has_captions': True}
+    batches = [params(request[0]) for request in http.request_sequence]
+    assert [len(batch['id'][0].split(",")) for batch in batches] == [50, 50, 20]
+    assert all('maxResults' not in batch for batch in batches)
+    assert client.quota.used == 3
+
+def test_not_modified_is_served_from_cache_for_free():
+    client, http = make_client([search_page(["a"], etag='"v1"'), ({'status': '304'}, "")])
+    first = client.search_videos("python", max_results=1)
+    assert client.search_videos("python", max_results=1) == first
+    assert http.request_sequence[1][3]['If-None-Match'] == '"v1"'
+    assert client.quota.stats()['not_modified'] == 1
+    assert client.quota.used == 100 and client.quota.units_saved == 100
+
+def test_etag_cache_key_drops_the_api_key():
+    client, _ = make_client([search_page(["a"], etag='"v1"')])
+    client.search_videos("python", max_results=1)
+    (key,) = client.etag_cache
+    assert "secret-key" not in key and "q=python" in key
+    assert etag_cache_key("https://x/search?q=a&key=k1") == etag_cache_key("https://x/search?q=a&key=k2")
+
+def test_quota_budget_stops_search():
+    client, http = make_client([search_page(["a"], next_page="p2")], quota_budget=150)
+    assert [v['video_id'] for v in client.search_videos("python", max_results=5)] == ["a"]
+    assert len(http.request_sequence) == 1
@@ -0,0 +1,90 @@
+import pytest
+import crawler
+from crawl_state import CrawlState
+from selenium_crawler import CrawlAborted
+
+RESULTS = {'q1': ['A', 'B'], 'q2': ['B', 'C']}
+
+@pytest.fixture
+def state_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "crawl_state.db")
+    monkeypatch.setattr(crawler, "STATE_PATH", path)
+    monkeypatch.setattr(crawler, "_crawl_state", None)
+    return path
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Stand-in for crawl_query_any that records which videos got past the video_filter."""
+    fetched = []
+
+    def fake_crawl(query, max_pages=3, video_filter=None):
+        for video_id in RESULTS[query]:
+            if video_filter is None or video_filter(video_id):
+                fetched.append((query, video_id))
+                yield {'title': video_id, 'url': video_id, 'video_id': video_id, 'page': 0, 'transcript': None}
+
+    monkeypatch.setattr(crawler, "crawl_query_any", fake_crawl)
+    return fetched
+
+def run(state_path):
+    with CrawlState(state_path) as state:
+        run_id, _ = state.start_run()
+    records = [record for query in RESULTS for record in crawler.crawl_query(query, 1, run_id)]
+    with CrawlState(state_path) as state:
+        state.finish_run(run_id)
+    return [record['video_id'] for record in records]
+
+def test_shared_video_is_fetched_once_per_run(state_path, fetched):
+    assert run(state_path) == ['A', 'B', 'C']
+    assert fetched == [('q1', 'A'), ('q1', 'B'), ('q2', 'C')]
+
+def test_shared_video_is_not_refetched_in_next_run(state_path, fetched):
+    run(state_path)
+    fetched.clear()
+    # Regression: q2 skipped B in run 1 because q1 claimed it, so B was never recorded for q2
+    assert run(state_path) == []
+    assert fetched == []
+
+def test_aborted_query_stays_pending(state_path, monkeypatch):
+    def aborted_crawl(query, max_pages=3, video_filter=None):
+        yield {'title': 'A', 'url': 'A', 'video_id': 'A', 'page': 0, 'transcript': None}
+        raise CrawlAborted(f"Crawl of '{query}' stopped early: CAPTCHA")
+
+    monkeypatch.setattr(crawler, "crawl_query_any", aborted_crawl)
+    with CrawlState(state_path) as state:
+        run_id, _ = state.start_run()
+    records = []
+    with pytest.raises(CrawlAborted):
+        for record in crawler.crawl_query('q1', 2, run_id):
+            records.append(record)
+    assert [record['video_id'] for record in records] == ['A']
+    with CrawlState(state_path) as state:
+        assert not state.query_done(run_id, 'q1')
+        assert state.run_summary(run_id)['queries_incomplete'] == 1
+
+def test_resumed_query_counts_pages_once(state_path, monkeypatch):
+    attempts = []
+
+    def crawl_two_pages(query, max_pages=3, video_filter=None):
+        attempts.append(query)
+        for page, video_id in enumerate(['A', 'B']):
+            if video_filter(video_id):
+                yield {'title': video_id, 'url': video_id, 'video_id': video_id, 'page': page, 'transcript': None}
+            if len(attempts) == 1:
+                raise CrawlAborted("CAPTCHA")
+
+    monkeypatch.setattr(crawler, "crawl_query_any", crawl_two_pages)
+    with CrawlState(state_path) as state:
+        run_id, _ = state.start_run()
+    with pytest.raises(CrawlAborted):
+        list(crawler.crawl_query('q1', 2, run_id))
+    # The next run resumes the interrupted one and finishes the query
+    with CrawlState(state_path) as state:
+        assert state.start_run() == (run_id, True)
+    assert [record['video_id'] for record in crawler.crawl_query('q1', 2, run_id)] == ['B']
+    with CrawlState(state_path) as state:
+        state.finish_query(run_id, 'q1', 1, 0)  # a late, shorter report does not lower the count
+        summary = state.run_summary(run_id)
+    assert summary['queries_done'] == 1 and summary['queries_incomplete'] == 0
+    assert summary['pages_done'] == 2
+    assert summary['videos_new'] == 2 and summary['videos_skipped'] == 1
@@ -0,0 +1,74 @@
+import queue
+import pytest
+from driver_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+        self.alive = False
+
+class Factory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        self.drivers.append(FakeDriver())
+        return self.drivers[-1]
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+def test_released_driver_is_reused(factory):
+    pool = DriverPool(size=1, driver_factory=factory)
+    entry = pool.acquire()
+    pool.release(entry, pages=3)
+    assert pool.acquire() is entry
+    assert entry.uses == 2 and entry.pages == 3
+    assert len(factory.drivers) == 1
+
+def test_full_pool_waits_for_a_release(factory):
+    pool = DriverPool(size=1, driver_factory=factory)
+    pool.acquire()
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.05)
+
+def test_driver_recycled_after_max_pages(factory):
+    pool = DriverPool(size=1, max_pages_per_driver=5, driver_factory=factory)
+    first = pool.acquire()
+    pool.release(first, pages=4)
+    assert pool.acquire() is first
+    pool.release(first, pages=1)
+    assert factory.drivers[0].quit_calls == 1
+    second = pool.acquire()
+    assert second is not first and second.driver is factory.drivers[1]
+    assert pool.stats()['launches'] == 2 and pool.stats()['recycled'] == 1
+
+def test_crashed_driver_is_replaced(factory):
+    pool = DriverPool(size=1, driver_factory=factory)
+    with pytest.raises(ValueError):
+        with pool.lease():
+            raise ValueError("page crashed")
+    assert factory.drivers[0].quit_calls == 1
+    assert pool.acquire().driver is factory.drivers[1]
+
+def test_close_quits_idle_drivers_and_later_releases(factory):
+    pool = DriverPool(size=2, driver_factory=factory)
+    pool.warm()
+    leased = pool.acquire()
+    pool.close()
+    assert sum(d.quit_calls for d in factory.drivers) == 1
+    pool.release(leased)
+    assert all(d.quit_calls == 1 for d in factory.drivers)
+    assert pool.stats()['live'] == 0
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,75 @@
+import os
+from types import SimpleNamespace
+import pytest
+import requests
+from http_crawler import (HTTPYouTubeCrawler, extract_initial_data, extract_ytcfg, is_blocked,
+                          parse_search_results)
+from pacing import Pacer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "youtube_results.html")
+
+@pytest.fixture(scope="module")
+def html():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+def response(status_code=200, text="", url="https://www.youtube.com/results?search_query=python"):
+    return SimpleNamespace(status_code=status_code, text=text, url=url, headers={})
+
+def test_extract_initial_data(html):
+    data = extract_initial_data(html)
+    assert 'contents' in data
+    assert extract_initial_data("<html>no data here</html>") is None
+
+def test_parse_search_results(html):
+    videos, token = parse_search_results(extract_initial_data(html))
+    assert len(videos) == 20 and len({v['video_id'] for v in videos}) == 20
+    assert videos[0] == {'title': "Python Full Course for Beginners (2020)",
+                         'url': "https://www.youtube.com/watch?v=rfscVS0vtbw", 'video_id': "rfscVS0vtbw"}
+    assert videos[-1]['video_id'] == "1F_OgqRuSdI"
+    assert token == "EpADEhBweXRob24gdHV0b3JpYWxzGoAD"
+
+def test_parse_continuation_response():
+    data = {'onResponseReceivedCommands': [{'appendContinuationItemsAction': {'continuationItems': [
+        {'itemSectionRenderer': {'contents': [
+            {'videoRenderer': {'videoId': "abc", 'title': {'runs': [{'text': "Part "}, {'text': "two"}]}}},
+            {'videoRenderer': {'videoId': "untitled"}},
+        ]}},
+        {'continuationItemRenderer': {'continuationEndpoint': {'continuationCommand': {'token': "next"}}}},
+    ]}}]}
+    videos, token = parse_search_results(data)
+    assert [(v['video_id'], v['title']) for v in videos] == [("abc", "Part two")]
+    assert token == "next"
+    assert parse_search_results({}) == ([], None)
+
+def test_extract_ytcfg(html):
+    config = extract_ytcfg(html)
+    assert config['INNERTUBE_API_KEY'] == "AIzaSyDUMMYKEYFORFIXTUREONLY0000000000"
+    assert config['INNERTUBE_CONTEXT']['client']['clientName'] == "WEB"
+    assert extract_ytcfg("<html></html>") == {}
+
+def test_is_blocked(html):
+    assert not is_blocked(response(text=html))
+    assert is_blocked(response(status_code=429))
+    assert is_blocked(response(status_code=403))
+    assert is_blocked(response(url="https://www.google.com/sorry/index?continue=x"))
+    assert is_blocked(response(text='<div class="g-recaptcha"></div>'))
+
+class FixtureSession(requests.Session):
+    """Answers every request with the saved results page."""
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return response(text=self.text, url=url)
+
+def test_fetch_first_page_offline(html):
+    session = FixtureSession(html)
+    with HTTPYouTubeCrawler(session=session, pacer=Pacer(base_rate=1000, burst=10)) as crawler:
+        videos, token, ytcfg = crawler.fetch_first_page("python tutorials")
+    assert session.urls == ["https://www.youtube.com/results?search_query=python+tutorials"]
+    assert len(videos) == 20 and token == "EpADEhBweXRob24gdHV0b3JpYWxzGoAD"
+    assert ytcfg['INNERTUBE_API_KEY'].startswith("AIza")
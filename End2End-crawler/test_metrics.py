@@ -0,0 +1,52 @@
+import pytest
+from metrics import Histogram, Metrics
+
+def test_histogram_buckets_are_upper_bounds():
+    h = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 7.0):
+        h.observe(value)
+    # A value equal to a bound falls in that bucket; anything past the last bound goes to +Inf
+    assert h.counts == [2, 2, 1]
+    assert h.count == 5 and h.sum == pytest.approx(8.65) and h.max == 7.0
+
+def test_histogram_quantiles_interpolate_within_a_bucket():
+    h = Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.5, 1.5, 1.5):
+        h.observe(value)
+    assert h.quantile(0.25) == 1.0
+    assert h.quantile(0.5) == pytest.approx(1 + 1 / 3)
+    # Never above the largest value seen
+    assert h.quantile(1.0) == 1.5
+    assert Histogram().quantile(0.5) is None
+
+def test_merge_adds_up_worker_snapshots():
+    run = Metrics(buckets=(1.0,))
+    for worker_values in ((0.5, 2.0), (0.25,)):
+        worker = Metrics(buckets=(1.0,))
+        worker.inc('transcripts_total', outcome='ok')
+        worker.inc('transcripts_total', 2, outcome='error')
+        for value in worker_values:
+            worker.observe('page_seconds', value, stage='load')
+        run.merge(worker.drain())
+        assert worker.snapshot() == {'counters': [], 'histograms': []}
+    report = run.report()
+    assert {(c['labels']['outcome'], c['value']) for c in report['counters']} == {('ok', 2), ('error', 4)}
+    [page] = report['histograms']
+    assert (page['labels'], page['count'], page['total_seconds'], page['max_seconds']) == \
+        ({'stage': 'load'}, 3, 2.75, 2.0)
+
+def test_to_prometheus_text_format():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc('videos_total', 3, query='say "hi"')
+    metrics.observe('page_seconds', 0.5)
+    metrics.observe('page_seconds', 5)
+    assert metrics.to_prometheus(prefix="crawler_") == (
+        '# TYPE crawler_videos_total counter\n'
+        'crawler_videos_total{query="say \\"hi\\""} 3\n'
+        '# TYPE crawler_page_seconds histogram\n'
+        'crawler_page_seconds_bucket{le="0.1"} 0\n'
+        'crawler_page_seconds_bucket{le="1.0"} 1\n'
+        'crawler_page_seconds_bucket{le="+Inf"} 2\n'
+        'crawler_page_seconds_sum 5.5\n'
+        'crawler_page_seconds_count 2\n'
+    )
@@ -0,0 +1,95 @@
+import pytest
+import pacing
+from pacing import Pacer, parse_retry_after
+
+HOST = "www.youtube.com"
+
+class FakeTime:
+    """Stand-in for the time module in pacing: sleep() just moves the clock."""
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(pacing, "time", clock)
+    return clock
+
+def test_burst_then_rate(clock):
+    pacer = Pacer(base_rate=0.5, burst=2)
+    assert pacer.wait(HOST) == 0
+    assert pacer.wait(HOST) == 0
+    assert pacer.wait(HOST) == pytest.approx(2.0)
+    assert pacer.wait(HOST) == pytest.approx(2.0)
+    assert clock.slept == [pytest.approx(2.0)] * 2
+
+def test_bucket_refills_while_idle(clock):
+    pacer = Pacer(base_rate=0.5, burst=2)
+    for _ in range(2):
+        pacer.wait(HOST)
+    clock.now += 10
+    # Refilled to the burst size, not beyond it
+    assert [pacer.wait(HOST) for _ in range(3)] == [0, 0, pytest.approx(2.0)]
+
+def test_hosts_are_paced_independently(clock):
+    pacer = Pacer(base_rate=0.5, burst=1)
+    assert pacer.wait("https://www.youtube.com/results") == 0
+    assert pacer.wait("https://news.ycombinator.com/") == 0
+    assert pacer.wait(HOST) == pytest.approx(2.0)
+
+def test_penalize_cuts_rate_and_backs_off_exponentially(clock):
+    pacer = Pacer(base_rate=0.5, initial_backoff=5.0, max_backoff=12.0)
+    assert pacer.penalize(HOST) == 5.0
+    assert pacer.rate(HOST) == 0.25
+    assert pacer.delay_scale(HOST) == 2.0
+    assert pacer.penalize(HOST) == 10.0
+    assert pacer.penalize(HOST) == 12.0
+    assert pacer.rates()[HOST]['strikes'] == 3
+
+def test_wait_honours_backoff_and_retry_after(clock):
+    pacer = Pacer(base_rate=0.5, initial_backoff=5.0)
+    assert pacer.penalize(HOST, retry_after=60) == 60
+    assert pacer.wait(HOST) == pytest.approx(60)
+    assert pacer.rates()[HOST]['backoff_remaining'] == 0
+
+def test_rate_never_drops_below_min_rate(clock):
+    pacer = Pacer(base_rate=0.5, min_rate=0.1)
+    for _ in range(5):
+        pacer.penalize(HOST)
+    assert pacer.rate(HOST) == 0.1
+
+def test_clean_streak_recovers_rate_up_to_max(clock):
+    pacer = Pacer(base_rate=1.0, max_rate=1.5, recovery_factor=1.25, recovery_after=3)
+    pacer.penalize(HOST)
+    assert pacer.rate(HOST) == 0.5
+    for _ in range(2):
+        pacer.success(HOST)
+    assert pacer.rate(HOST) == 0.5
+    pacer.success(HOST)
+    assert pacer.rate(HOST) == 0.625
+    for _ in range(30):
+        pacer.success(HOST)
+    assert pacer.rate(HOST) == 1.5
+
+def test_penalty_resets_clean_streak(clock):
+    pacer = Pacer(base_rate=1.0, recovery_after=3)
+    pacer.success(HOST)
+    pacer.success(HOST)
+    pacer.penalize(HOST)
+    pacer.success(HOST)
+    assert pacer.rate(HOST) == 0.5
+    # A success after push-back restarts the backoff ladder
+    assert pacer.penalize(HOST) == pacer.initial_backoff
+
+@pytest.mark.parametrize("value, expected", [("120", 120.0), ("1.5", 1.5), (None, None),
+                                             ("Wed, 21 Oct 2015 07:28:00 GMT", None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
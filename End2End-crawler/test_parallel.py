@@ -0,0 +1,46 @@
+from metrics import Metrics, get_metrics
+from parallel import parallel_crawl
+from sinks import Sink
+
+def fake_crawl(query, n):
+    for k in range(n):
+        get_metrics().inc('fake_videos_total', query=query)
+        yield {'video_id': f"{query}-{k}"}
+
+def failing_crawl(query, n):
+    yield {'video_id': f"{query}-0"}
+    raise RuntimeError("CAPTCHA")
+
+class ListSink(Sink):
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+def test_records_are_tagged_and_returned_per_job_without_a_sink():
+    results = parallel_crawl(fake_crawl, [("a", 2), ("b", 3)], max_workers=2)
+    assert results == [
+        [{'query': "a", 'rank': 0, 'video_id': "a-0"}, {'query': "a", 'rank': 1, 'video_id': "a-1"}],
+        [{'query': "b", 'rank': r, 'video_id': f"b-{r}"} for r in range(3)],
+    ]
+
+def test_sink_receives_every_record_and_counts_are_returned():
+    sink = ListSink()
+    counts = parallel_crawl(fake_crawl, [("a", 2), ("b", 3)], max_workers=2, sink=sink)
+    assert counts == [2, 3]
+    # Records of different jobs may interleave, but each job's ranks arrive in order
+    for query, n in (("a", 2), ("b", 3)):
+        assert [(r['rank'], r['video_id']) for r in sink.records if r['query'] == query] == \
+            [(k, f"{query}-{k}") for k in range(n)]
+
+def test_failed_job_ends_early_and_worker_metrics_are_merged():
+    # Forked workers start with a copy of this process's registry; leave nothing from earlier tests in it
+    get_metrics().drain()
+    metrics = Metrics()
+    results = parallel_crawl(failing_crawl, [("a", 1)], max_workers=1, metrics=metrics)
+    assert results == [[{'query': "a", 'rank': 0, 'video_id': "a-0"}]]
+    sink = ListSink()
+    parallel_crawl(fake_crawl, [("a", 2), ("b", 1)], max_workers=2, sink=sink, metrics=metrics)
+    counters = {(name, tuple(map(tuple, labels))): value for name, labels, value in metrics.snapshot()['counters']}
+    assert counters == {('fake_videos_total', (('query', "a"),)): 2, ('fake_videos_total', (('query', "b"),)): 1}
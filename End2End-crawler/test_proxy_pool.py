@@ -0,0 +1,186 @@
+from types import SimpleNamespace
+import pytest
+import requests
+from youtube_transcript_api import RequestBlocked
+from proxy_pool import NoProxyAvailable, ProxyPool, http_probe, start_stand_in_proxy
+from transcript_fetcher import TranscriptFetcher
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def make_pool(clock, proxies=("p1:1", "p2:2"), **kwargs):
+    return ProxyPool(list(proxies), clock=clock, **kwargs)
+
+def quarantine_remaining(pool, name):
+    return next(row['quarantine_remaining'] for row in pool.stats() if row['proxy'] == name)
+
+def test_faster_proxy_gets_the_next_request(clock):
+    pool = make_pool(clock)
+    fast, slow = pool.acquire(), pool.acquire()
+    pool.release(fast, 'ok', 0.1)
+    pool.release(slow, 'ok', 2.0)
+    assert pool.acquire() is fast
+
+def test_failing_proxy_scores_lower(clock):
+    pool = make_pool(clock)
+    good, bad = pool.acquire(), pool.acquire()
+    pool.release(good, 'ok', 1.0)
+    pool.release(bad, 'error', 1.0)
+    assert pool.stats()[0]['proxy'] == good.name
+    assert pool.acquire() is good
+
+def test_concurrency_cap(clock):
+    pool = make_pool(clock, max_concurrency=1)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.05)
+    pool.release(first, 'ok', 0.5)
+    assert pool.acquire(timeout=0.05) is first
+
+def test_ban_quarantines_and_relapses_double(clock):
+    pool = make_pool(clock, proxies=["p1:1"], quarantine_seconds=300)
+    proxy = pool.acquire()
+    pool.release(proxy, 'banned')
+    assert quarantine_remaining(pool, "p1:1") == 300
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.05)
+    # Without a probe the proxy gets one trial request once the quarantine is over
+    clock.now = 301
+    trial = pool.acquire(timeout=0.05)
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.05)
+    pool.release(trial, 'banned')
+    assert quarantine_remaining(pool, "p1:1") == 600
+
+def test_quarantine_is_capped(clock):
+    pool = make_pool(clock, proxies=["p1:1"], quarantine_seconds=300, max_quarantine_seconds=500)
+    pool.release(pool.acquire(), 'banned')
+    clock.now = 301
+    pool.release(pool.acquire(timeout=0.05), 'banned')
+    assert quarantine_remaining(pool, "p1:1") == 500
+
+def test_failure_threshold(clock):
+    pool = make_pool(clock, proxies=["p1:1"], failure_threshold=3)
+    for _ in range(2):
+        pool.release(pool.acquire(), 'error')
+    assert quarantine_remaining(pool, "p1:1") is None
+    pool.release(pool.acquire(), 'error')
+    assert quarantine_remaining(pool, "p1:1") == 300
+
+def test_successful_trial_reinstates(clock):
+    pool = make_pool(clock, proxies=["p1:1"])
+    pool.release(pool.acquire(), 'banned')
+    clock.now = 301
+    pool.release(pool.acquire(timeout=0.05), 'ok', 0.5)
+    assert quarantine_remaining(pool, "p1:1") is None
+    # Back to full concurrency, not one trial at a time
+    assert pool.acquire(timeout=0.05) is pool.acquire(timeout=0.05)
+
+def test_probe_reinstates_after_quarantine(clock):
+    probed = []
+    pool = make_pool(clock, proxies=["p1:1"], probe=lambda url: probed.append(url) or True)
+    pool.release(pool.acquire(), 'banned')
+    clock.now = 301
+    proxy = pool.acquire(timeout=2)
+    assert probed == ["http://p1:1"]
+    assert proxy.quarantined_until is None
+
+def test_failed_probe_extends_quarantine(clock):
+    pool = make_pool(clock, proxies=["p1:1"], probe=lambda url: False)
+    pool.release(pool.acquire(), 'banned')
+    clock.now = 301
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.2)
+    assert quarantine_remaining(pool, "p1:1") == 600
+
+class FakeTranscriptApi:
+    def __init__(self, text):
+        self.text = text
+
+    def fetch(self, video_id, languages):
+        return [SimpleNamespace(text=self.text, start=0.0, duration=1.0)]
+
+def test_transcript_fetched_directly_when_every_proxy_is_quarantined(clock):
+    pool = make_pool(clock, proxies=["p1:1"])
+    pool.release(pool.acquire(), 'banned')
+    fetcher = TranscriptFetcher(api_factory=lambda: FakeTranscriptApi("direct"), proxy_pool=pool,
+                                proxy_api_factory=lambda url: FakeTranscriptApi("proxied"), proxy_timeout=0.05)
+    try:
+        assert fetcher.fetch_segments("vid") == [{'text': "direct", 'start': 0.0, 'duration': 1.0}]
+        clock.now = 301
+        assert fetcher.fetch_segments("vid2") == [{'text': "proxied", 'start': 0.0, 'duration': 1.0}]
+    finally:
+        fetcher.close()
+
+# Through local stand-in proxies (see proxy_pool.start_stand_in_proxy): real sockets, real proxied requests
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(**kwargs):
+        server, url = start_stand_in_proxy(delay=0.01, **kwargs)
+        servers.append(server)
+        return server, url
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_http_probe_through_stand_in_proxies(stand_in):
+    probe = http_probe(url="http://probe.stand-in/generate_204", timeout=5)
+    healthy, healthy_url = stand_in()
+    banned, banned_url = stand_in(ban_after=0)
+    assert probe(healthy_url) is True
+    assert probe(banned_url) is False
+    assert healthy.requests == banned.requests == 1
+
+def test_probe_reinstates_a_recovered_stand_in_proxy(clock, stand_in):
+    server, url = stand_in(ban_after=0)
+    pool = ProxyPool([url], clock=clock, probe=http_probe(url="http://probe.stand-in/", timeout=5))
+    pool.release(pool.acquire(), 'banned')
+    clock.now = 301
+    # Still banning: the probe fails and the quarantine doubles
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.3)
+    assert quarantine_remaining(pool, pool.stats()[0]['proxy']) == 600
+    server.ban_after = None
+    clock.now = 1000
+    assert pool.acquire(timeout=2).quarantined_until is None
+
+class ProxiedTranscriptApi:
+    """Transcript client that sends its one request through a proxy, like make_proxied_transcript_api."""
+    def __init__(self, proxy_url):
+        self.proxies = {'http': proxy_url, 'https': proxy_url}
+
+    def fetch(self, video_id, languages):
+        response = requests.get(f"http://youtube.stand-in/api/timedtext?v={video_id}", proxies=self.proxies, timeout=5)
+        if response.status_code == 429:
+            raise RequestBlocked(video_id)
+        response.raise_for_status()
+        return [SimpleNamespace(text=response.text, start=0.0, duration=1.0)]
+
+def test_blocked_transcript_request_moves_to_another_stand_in_proxy(clock, stand_in):
+    banned, banned_url = stand_in(ban_after=0)
+    healthy, healthy_url = stand_in()
+    pool = ProxyPool([banned_url, healthy_url], clock=clock)
+    fetcher = TranscriptFetcher(api_factory=lambda: FakeTranscriptApi("direct"), proxy_pool=pool,
+                                proxy_api_factory=ProxiedTranscriptApi, proxy_timeout=1)
+    try:
+        assert fetcher.fetch_segments("vid") == [{'text': "ok", 'start': 0.0, 'duration': 1.0}]
+        assert fetcher.fetch_segments("vid2") == [{'text': "ok", 'start': 0.0, 'duration': 1.0}]
+    finally:
+        fetcher.close()
+    # Equal scores go to the first proxy listed, so the banned one took the first request and was quarantined
+    assert banned.requests == 1 and healthy.requests == 2
+    assert quarantine_remaining(pool, banned_url.split("//")[1]) == 300
+    assert quarantine_remaining(pool, healthy_url.split("//")[1]) is None
@@ -0,0 +1,30 @@
+import pytest
+from search_index import SearchIndex, literal_query
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex(str(tmp_path / "index.db")) as index:
+        index.index_transcript("vid1", [{'text': "today we learn c++ templates", 'start': 0.0, 'duration': 5.0},
+                                        {'text': "and then some c# as well", 'start': 40.0, 'duration': 5.0}], title="Langs")
+        index.index_quotes([{'text': "To be or not to be", 'author': "Shakespeare"}])
+        yield index
+
+def test_fts5_syntax_still_works(index):
+    assert [hit['source_id'] for hit in index.search('"c++ templates" OR shakespeare')] == ["vid1"]
+    assert index.search("templat*")[0]['offset'] == 0.0
+
+@pytest.mark.parametrize("query", ["c++", "c#", "templates\"", "NOT", "NEAR(", "-", "c++ templates"])
+def test_invalid_syntax_is_searched_literally(index, query):
+    hits = index.search(query)
+    assert isinstance(hits, list)
+
+def test_literal_fallback_finds_the_words(index):
+    assert [hit['offset'] for hit in index.search("c# well")] == [40.0]
+    assert [hit['kind'] for hit in index.search("not to be OR")] == ["quote"]
+
+def test_empty_query(index):
+    assert index.search("") == []
+    assert index.search("   ") == []
+
+def test_literal_query():
+    assert literal_query('c++ "x') == '"c++" """x"'
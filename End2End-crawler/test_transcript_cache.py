@@ -0,0 +1,75 @@
+import pytest
+import transcript_cache
+from transcript_cache import TranscriptCache
+
+LANGS = ['en']
+SEGMENTS = [{'text': "hello", 'start': 0.0, 'duration': 1.0}]
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(transcript_cache, "time", clock)
+    return clock
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        caches.append(TranscriptCache(str(tmp_path / "cache.db"), **kwargs))
+        return caches[-1]
+    yield make
+    for cache in caches:
+        cache.close()
+
+def test_hit_until_ttl_expires(clock, make_cache):
+    cache = make_cache(ttl=100)
+    assert cache.get("v1", LANGS) is TranscriptCache.MISS
+    cache.set("v1", LANGS, SEGMENTS)
+    clock.now += 100
+    assert cache.get("v1", LANGS) == SEGMENTS
+    clock.now += 1
+    assert cache.get("v1", LANGS) is TranscriptCache.MISS
+    assert cache.stats()['expired'] == 1
+    # An expired entry is deleted, not just skipped
+    clock.now -= 50
+    assert cache.get("v1", LANGS) is TranscriptCache.MISS
+
+def test_languages_are_part_of_the_key(clock, make_cache):
+    cache = make_cache()
+    cache.set("v1", ['en'], SEGMENTS)
+    assert cache.get("v1", ['de', 'en']) is TranscriptCache.MISS
+
+def test_negative_results_are_cached_with_their_own_ttl(clock, make_cache):
+    cache = make_cache(ttl=1000, negative_ttl=10)
+    cache.set("v1", LANGS, None)
+    assert cache.get("v1", LANGS) is None
+    clock.now += 11
+    assert cache.get("v1", LANGS) is TranscriptCache.MISS
+    assert cache.stats() == {'hits': 0, 'negative_hits': 1, 'misses': 1, 'expired': 1, 'evictions': 0,
+                             'hit_rate': 0.5}
+
+def test_least_recently_used_entries_are_evicted(clock, make_cache):
+    cache = make_cache(max_entries=10)
+    for n in range(11):
+        clock.now += 1
+        cache.set(f"v{n}", LANGS, SEGMENTS)
+    # Reading v0 makes it recent; v1, v2 are now the oldest
+    clock.now += 1
+    cache.get("v0", LANGS)
+    cache.evict()
+    # Down to 90% of the bound
+    assert cache.stats()['evictions'] == 2
+    assert cache.get("v0", LANGS) == SEGMENTS
+    assert [cache.get(f"v{n}", LANGS) is TranscriptCache.MISS for n in (1, 2, 3)] == [True, True, False]
+
+def test_entries_survive_reopening(clock, make_cache):
+    make_cache().set("v1", LANGS, SEGMENTS)
+    assert make_cache().get("v1", LANGS) == SEGMENTS
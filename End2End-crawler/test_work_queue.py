@@ -0,0 +1,84 @@
+import pytest
+import work_queue
+from work_queue import WorkQueue
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return clock
+
+@pytest.fixture
+def queue(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.db"), retry_delay=30, max_retry_delay=100) as queue:
+        yield queue
+
+def test_complete_after_losing_the_lease_stores_nothing(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.db")) as queue:
+        queue.enqueue('query', 'python', {'query': 'python'})
+        stale = queue.lease('w1', visibility_timeout=-1)
+        # w1's lease has already expired, so w2 takes the job over
+        current = queue.lease('w2')
+        assert current.job_id == stale.job_id
+        assert not queue.complete(stale, {'by': 'w1'})
+        assert queue.get_result('query', 'python') is None
+        assert queue.complete(current, {'by': 'w2'})
+        assert queue.get_result('query', 'python') == {'by': 'w2'}
+        # A late completion from the old owner does not overwrite the result either
+        assert not queue.complete(stale, {'by': 'w1'})
+        assert queue.get_result('query', 'python') == {'by': 'w2'}
+        assert queue.stats() == {'query': {'done': 1}}
+
+def test_expired_lease_is_reclaimed_by_another_worker(clock, queue):
+    queue.enqueue('query', 'python', {'query': 'python'})
+    first = queue.lease('w1', visibility_timeout=10)
+    assert first.attempts == 1
+    assert queue.lease('w2') is None
+    clock.now += 5
+    assert queue.heartbeat(first, visibility_timeout=10)
+    clock.now += 9
+    assert queue.lease('w2') is None
+    clock.now += 2
+    second = queue.lease('w2')
+    assert (second.job_id, second.attempts, second.lease_owner) == (first.job_id, 2, 'w2')
+    # The first worker finds out on its next heartbeat
+    assert not queue.heartbeat(first)
+
+def test_failures_are_retried_with_exponential_backoff(clock, queue):
+    queue.enqueue('query', 'python', {}, max_attempts=5)
+    for attempt, delay in enumerate([30, 60, 100, 100], start=1):
+        job = queue.lease('w1')
+        assert job.attempts == attempt
+        assert queue.fail(job, f"error {attempt}")
+        clock.now += delay - 1
+        assert queue.lease('w1') is None
+        clock.now += 1
+    assert queue.lease('w1').attempts == 5
+    assert queue.pending() == 1 and queue.dead_letters() == []
+
+def test_job_is_dead_lettered_after_max_attempts(clock, queue):
+    queue.enqueue('query', 'python', {}, max_attempts=2)
+    queue.fail(queue.lease('w1'), "timeout")
+    clock.now += 30
+    queue.fail(queue.lease('w1'), "captcha")
+    clock.now += 3600
+    assert queue.lease('w1') is None
+    assert queue.pending() == 0
+    assert queue.dead_letters() == [{'kind': 'query', 'key': 'python', 'attempts': 2, 'last_error': 'captcha'}]
+    assert queue.stats() == {'query': {'dead': 1}}
+    assert queue.requeue_dead() == 1
+    assert queue.lease('w1').attempts == 1
+
+def test_expired_lease_on_the_last_attempt_is_dead_lettered(clock, queue):
+    queue.enqueue('query', 'python', {}, max_attempts=1)
+    queue.lease('w1', visibility_timeout=10)
+    clock.now += 11
+    assert queue.lease('w2') is None
+    assert queue.dead_letters() == [{'kind': 'query', 'key': 'python', 'attempts': 1, 'last_error': 'lease expired'}]
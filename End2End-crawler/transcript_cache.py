@@ -0,0 +1,126 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+class TranscriptCache:
+    """
+    Persistent on-disk transcript cache keyed by video ID and requested languages. Values are the
+    transcript's {'text','start','duration'} segments, as returned by TranscriptFetcher.fetch_segments.
+
+    Hits are kept for `ttl` seconds and negative results (transcripts disabled / not found)
+    for `negative_ttl` seconds. Once the cache holds more than `max_entries` rows the least
+    recently used ones are evicted. Safe to share between threads; several processes can
+    open the same file (SQLite WAL mode).
+    """
+    MISS = object()
+
+    def __init__(self, path="transcript_cache.db", ttl=30 * 24 * 3600, negative_ttl=24 * 3600, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS transcripts (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                negative INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at)")
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(video_id, languages):
+        return f"{video_id}:{','.join(languages)}"
+
+    def get(self, video_id, languages):
+        """Return the cached segments (None for a cached negative result) or TranscriptCache.MISS."""
+        key = self.make_key(video_id, languages)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, negative, stored_at FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return self.MISS
+            value, negative, stored_at = row
+            if now - stored_at > (self.negative_ttl if negative else self.ttl):
+                self._conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return self.MISS
+            self._conn.execute("UPDATE transcripts SET accessed_at = ? WHERE key = ?", (now, key))
+            if negative:
+                self.negative_hits += 1
+                return None
+            self.hits += 1
+            return json.loads(value)
+
+    def set(self, video_id, languages, value):
+        """Store a transcript's segments, or a negative result when `value` is None."""
+        key = self.make_key(video_id, languages)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, value, negative, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, None if value is None else json.dumps(value), int(value is None), now, now),
+            )
+            self._writes_since_evict += 1
+            # Counting rows is cheap but not free; only check the bound every few hundred writes
+            if self._writes_since_evict >= 256:
+                self._writes_since_evict = 0
+                self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Evict down to 90% of the bound so we don't evict again on the very next write
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM transcripts WHERE key IN (SELECT key FROM transcripts ORDER BY accessed_at LIMIT ?)",
+            (excess,),
+        )
+        self.evictions += excess
+        logging.info(f"Transcript cache evicted {excess} least recently used entries")
+
+    def evict(self):
+        """Enforce the size bound now."""
+        with self._lock:
+            self._evict()
+
+    def stats(self):
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
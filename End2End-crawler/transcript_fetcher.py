@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import requests
+from youtube_transcript_api import (YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, CouldNotRetrieveTranscript,
+                                    RequestBlocked, YouTubeRequestFailed)
+from youtube_transcript_api.proxies import GenericProxyConfig
+from metrics import get_metrics
+from proxy_pool import NoProxyAvailable
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+def make_transcript_api(proxy_config=None, timeout=20):
+    """Build a YouTubeTranscriptApi whose HTTP requests time out after `timeout` seconds."""
+    return YouTubeTranscriptApi(proxy_config=proxy_config, http_client=TimeoutSession(timeout=timeout))
+
+def make_proxied_transcript_api(proxy_url, timeout=20):
+    """make_transcript_api with every request sent through one proxy URL."""
+    return make_transcript_api(proxy_config=GenericProxyConfig(http_url=proxy_url, https_url=proxy_url), timeout=timeout)
+
+def join_segments(segments):
+    """Transcript text from a list of {'text','start','duration'} segments."""
+    return " ".join(seg['text'] for seg in segments)
+
+def completed_in_order(pending, wait=False):
+    """
+    Yield records from the front of `pending`, a deque of (video, future) pairs where video is a
+    {'title','url','video_id'} dict and the future comes from TranscriptFetcher.submit, while their
+    transcripts are ready. With wait=True, block until every entry is done. Records come out in
+    submission order with the transcript text and its timed segments filled in.
+    """
+    while pending and (wait or pending[0][1].done()):
+        video, future = pending.popleft()
+        segments = future.result()
+        yield {'title': video['title'], 'url': video['url'], 'video_id': video['video_id'], 'page': video.get('page'),
+               'transcript': None if segments is None else join_segments(segments), 'segments': segments}
+
+class TranscriptFetcher:
+    """
+    Fetches YouTube transcripts on a bounded thread pool, so transcript round trips overlap
+    with each other and with the browser work that produces the video IDs.
+
+    YouTubeTranscriptApi is not thread-safe, so each worker thread builds its own instance
+    with `api_factory` (it keeps its own session and connection pool for reuse).
+    An optional TranscriptCache is consulted before any network request.
+
+    With a proxy_pool.ProxyPool, each fetch goes through the healthiest proxy with a free slot,
+    using a per-thread, per-proxy instance from `proxy_api_factory(proxy_url)`. A blocked request
+    reports a ban to the pool and is retried on another proxy, up to `proxy_attempts` times. If no
+    proxy frees up within `proxy_timeout` seconds (e.g. all of them are quarantined), the transcript
+    is fetched directly with the `api_factory` instance instead.
+    """
+    def __init__(self, api_factory=make_transcript_api, max_concurrency=8, languages=('en',), cache=None,
+                 proxy_pool=None, proxy_api_factory=make_proxied_transcript_api, proxy_attempts=3, proxy_timeout=30):
+        self.api_factory = api_factory
+        self.cache = cache
+        self.proxy_pool = proxy_pool
+        self.proxy_api_factory = proxy_api_factory
+        self.proxy_attempts = proxy_attempts
+        self.proxy_timeout = proxy_timeout
+        self.max_concurrency = max_concurrency
+        self.languages = list(languages)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='transcripts')
+
+    @property
+    def youtube_api(self):
+        """This thread's YouTubeTranscriptApi instance."""
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = self._local.api = self.api_factory()
+        return api
+
+    def _api_for(self, proxy):
+        """This thread's YouTubeTranscriptApi instance for one proxy of the pool."""
+        apis = getattr(self._local, 'proxy_apis', None)
+        if apis is None:
+            apis = self._local.proxy_apis = {}
+        api = apis.get(proxy.url)
+        if api is None:
+            api = apis[proxy.url] = self.proxy_api_factory(proxy.url)
+        return api
+
+    def _fetch_transcript(self, video_id, languages):
+        if self.proxy_pool is None:
+            return self.youtube_api.fetch(video_id=video_id, languages=languages)
+        for attempt in range(1, self.proxy_attempts + 1):
+            with ExitStack() as stack:
+                try:
+                    lease = stack.enter_context(self.proxy_pool.lease(self.proxy_timeout))
+                except NoProxyAvailable as e:
+                    logging.warning(f"Fetching transcript of {video_id} without a proxy: {e}")
+                    get_metrics().inc('proxy_fallbacks_total', target='transcript')
+                    return self.youtube_api.fetch(video_id=video_id, languages=languages)
+                try:
+                    return self._api_for(lease.proxy).fetch(video_id=video_id, languages=languages)
+                except RequestBlocked:
+                    lease.outcome = 'banned'
+                    if attempt == self.proxy_attempts:
+                        raise
+                except (YouTubeRequestFailed, requests.RequestException):
+                    lease.outcome = 'error'
+                    if attempt == self.proxy_attempts:
+                        raise
+                except CouldNotRetrieveTranscript:
+                    # YouTube answered through the proxy; the video just has no usable transcript
+                    lease.outcome = 'ok'
+                    raise
+
+    def fetch_segments(self, video_id, languages=None, video_url=None, raise_errors=False):
+        """
+        Fetch one transcript synchronously as a list of {'text','start','duration'} segments
+        (start and duration in seconds), or None if not available. With raise_errors=True, request
+        errors (as opposed to a video without transcripts) are raised instead of returning None.
+        """
+        languages = languages or self.languages
+        metrics = get_metrics()
+        if self.cache is not None:
+            cached = self.cache.get(video_id, languages)
+            if cached is not self.cache.MISS:
+                metrics.inc('transcripts_total', outcome='cache_hit')
+                return cached
+        start = time.perf_counter()
+        try:
+            transcript = self._fetch_transcript(video_id, languages)
+            segments = [{'text': seg.text, 'start': seg.start, 'duration': seg.duration} for seg in transcript]
+            metrics.observe('transcript_fetch_seconds', time.perf_counter() - start, outcome='ok')
+            metrics.inc('transcripts_total', outcome='ok')
+            if self.cache is not None:
+                self.cache.set(video_id, languages, segments)
+            return segments
+        except (TranscriptsDisabled, NoTranscriptFound):
+            metrics.observe('transcript_fetch_seconds', time.perf_counter() - start, outcome='unavailable')
+            metrics.inc('transcripts_total', outcome='unavailable')
+            if self.cache is not None:
+                self.cache.set(video_id, languages, None)
+            return None
+        except Exception as e:
+            metrics.observe('transcript_fetch_seconds', time.perf_counter() - start, outcome='error')
+            metrics.inc('transcripts_total', outcome='error', error=type(e).__name__)
+            logging.warning(f"Transcript fetch error for {video_url or video_id}: {e}, video id: {video_id}")
+            if raise_errors:
+                raise
+            return None
+
+    def fetch(self, video_id, languages=None, video_url=None):
+        """Fetch one transcript synchronously. Returns transcript as text or None if not available."""
+        segments = self.fetch_segments(video_id, languages, video_url)
+        return None if segments is None else join_segments(segments)
+
+    def submit(self, video_id, languages=None, video_url=None):
+        """Schedule a transcript fetch and return its Future, which resolves to the segment list (or None)."""
+        return self._executor.submit(self.fetch_segments, video_id, languages, video_url)
+
+    def fetch_many(self, video_ids, languages=None):
+        """Fetch transcripts for many video IDs concurrently. Returns {video_id: transcript or None}."""
+        futures = {vid: self.submit(vid, languages) for vid in dict.fromkeys(video_ids)}
+        transcripts = {}
+        for vid, future in futures.items():
+            segments = future.result()
+            transcripts[vid] = None if segments is None else join_segments(segments)
+        return transcripts
+
+    def close(self):
+        """Wait for in-flight fetches and stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+
+class Job:
+    """A leased job. `attempts` counts this lease."""
+    def __init__(self, job_id, kind, key, payload, attempts, max_attempts, lease_owner, lease_expires):
+        self.job_id = job_id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.lease_owner = lease_owner
+        self.lease_expires = lease_expires
+
+    def __repr__(self):
+        return f"Job({self.job_id}, {self.kind}:{self.key}, attempt {self.attempts}/{self.max_attempts})"
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """
+    Durable job queue in a SQLite file that any number of worker processes (on one box, or on
+    several boxes sharing the file) can drain.
+
+    Jobs are unique per (kind, key), so enqueueing the same query twice is a no-op. A worker
+    leases a job for `visibility_timeout` seconds; if it crashes or stops heartbeating, the lease
+    expires and another worker picks the job up. Failed jobs are retried with exponential backoff
+    until `max_attempts`, then moved to the 'dead' status (dead-letter) for inspection and
+    requeue_dead(). Results are upserted per (kind, key), so a job that ends up running twice
+    still leaves exactly one result.
+
+    Several boxes need the file on shared storage that honours file locks; pass
+    journal_mode="DELETE" there, since WAL mode needs shared memory on a single host.
+    """
+    def __init__(self, path="work_queue.db", journal_mode="WAL", retry_delay=30.0, max_retry_delay=3600.0):
+        self.path = path
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority, available_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                result TEXT,
+                job_id INTEGER,
+                worker TEXT,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+            """
+        )
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never lease the same job
+        return _Transaction(self._conn)
+
+    def enqueue(self, kind, key, payload, max_attempts=3, priority=0):
+        """Add a job unless one with the same kind and key exists. Returns True if it was added."""
+        now = time.time()
+        cursor = self._conn.execute(
+            """INSERT OR IGNORE INTO jobs (kind, key, payload, priority, max_attempts, available_at, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (kind, key, json.dumps(payload), priority, max_attempts, now, now, now),
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, worker_id, kinds=None, visibility_timeout=300.0):
+        """Lease the next ready job (queued, or leased by a worker whose lease expired), or return None."""
+        now = time.time()
+        kind_filter, kind_params = "", ()
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            kind_params = tuple(kinds)
+        with self._transaction():
+            # Expired leases that used up their attempts go to the dead-letter status instead of being retried
+            self._conn.execute(
+                """UPDATE jobs SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'),
+                   lease_owner = NULL, updated_at = ?
+                   WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts""",
+                (now, now),
+            )
+            row = self._conn.execute(
+                f"""UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?,
+                    lease_expires = ?, updated_at = ?
+                    WHERE job_id = (
+                        SELECT job_id FROM jobs
+                        WHERE ((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?)){kind_filter}
+                        ORDER BY priority DESC, job_id LIMIT 1
+                    )
+                    RETURNING job_id, kind, key, payload, attempts, max_attempts, lease_owner, lease_expires""",
+                (worker_id, now + visibility_timeout, now, now, now) + kind_params,
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, kind, key, payload, attempts, max_attempts, owner, expires = row
+        return Job(job_id, kind, key, json.loads(payload), attempts, max_attempts, owner, expires)
+
+    def heartbeat(self, job, visibility_timeout=300.0):
+        """Extend the lease. Returns False if the job was meanwhile taken over by another worker."""
+        expires = time.time() + visibility_timeout
+        cursor = self._conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+            (expires, time.time(), job.job_id, job.lease_owner),
+        )
+        if cursor.rowcount:
+            job.lease_expires = expires
+        return cursor.rowcount == 1
+
+    def put_result(self, kind, key, result, job=None):
+        """Store a result; writing the same (kind, key) again replaces it rather than adding a copy."""
+        self._conn.execute(
+            """INSERT INTO results (kind, key, result, job_id, worker, stored_at) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (kind, key) DO UPDATE SET result = excluded.result, job_id = excluded.job_id,
+               worker = excluded.worker, stored_at = excluded.stored_at""",
+            (kind, key, json.dumps(result, ensure_ascii=False), job.job_id if job else None,
+             job.lease_owner if job else None, time.time()),
+        )
+
+    def complete(self, job, result=None):
+        """
+        Mark a job done, storing `result` under the job's kind and key in the same transaction.
+        Returns False, storing nothing, if this worker had lost the lease (the job was already
+        finished or taken over), so a stale worker never overwrites the new owner's result.
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, last_error = NULL,
+                   updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?""",
+                (time.time(), job.job_id, job.lease_owner),
+            )
+            owned = cursor.rowcount == 1
+            if owned and result is not None:
+                self.put_result(job.kind, job.key, result, job)
+        return owned
+
+    def fail(self, job, error):
+        """Record a failure: retry after an exponential backoff, or dead-letter after max_attempts."""
+        now = time.time()
+        if job.attempts >= job.max_attempts:
+            status, available_at = 'dead', now
+            logging.error(f"{job} failed for the last time, moved to dead letters: {error}")
+        else:
+            status = 'queued'
+            available_at = now + min(self.retry_delay * 2 ** (job.attempts - 1), self.max_retry_delay)
+            logging.warning(f"{job} failed, retrying in {available_at - now:.0f}s: {error}")
+        cursor = self._conn.execute(
+            """UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL,
+               updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?""",
+            (status, available_at, str(error), now, job.job_id, job.lease_owner),
+        )
+        return cursor.rowcount == 1
+
+    def requeue_dead(self, kind=None):
+        """Give dead-lettered jobs a fresh set of attempts. Returns how many were requeued."""
+        now = time.time()
+        sql = "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'"
+        params = (now, now)
+        if kind:
+            sql += " AND kind = ?"
+            params += (kind,)
+        return self._conn.execute(sql, params).rowcount
+
+    def dead_letters(self, kind=None):
+        sql = "SELECT kind, key, attempts, last_error FROM jobs WHERE status = 'dead'"
+        params = ()
+        if kind:
+            sql += " AND kind = ?"
+            params = (kind,)
+        return [dict(zip(('kind', 'key', 'attempts', 'last_error'), row)) for row in self._conn.execute(sql, params)]
+
+    def results(self, kind):
+        """Yield (key, result) for every stored result of this kind."""
+        for key, result in self._conn.execute("SELECT key, result FROM results WHERE kind = ? ORDER BY rowid", (kind,)):
+            yield key, json.loads(result)
+
+    def get_result(self, kind, key):
+        row = self._conn.execute("SELECT result FROM results WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def pending(self, kinds=None):
+        """Number of jobs still queued or leased."""
+        sql = "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')"
+        params = ()
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params = tuple(kinds)
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def stats(self):
+        """{kind: {status: count}}"""
+        stats = {}
+        for kind, status, count in self._conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status"):
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
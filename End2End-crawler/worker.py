@@ -0,0 +1,153 @@
+import argparse
+import logging
+import time
+import crawler
+from metrics import get_metrics
+from selenium_crawler import default_proxy_config
+from sinks import JSONLSink
+from transcript_fetcher import TranscriptFetcher, join_segments, make_transcript_api
+from work_queue import WorkQueue, default_worker_id
+
+QUEUE_PATH = "work_queue.db"  # Shared job queue; put it on storage every worker box can reach
+QUERY_LEASE_SECONDS = 600  # A query job is taken over if its worker sends no heartbeat for this long
+TRANSCRIPT_LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3  # Attempts per job before it is moved to the dead letters
+POLL_INTERVAL = 5.0  # Seconds between polls of an empty queue
+
+_fetcher = None
+
+def get_transcript_fetcher():
+    """Return this process's TranscriptFetcher for transcript jobs."""
+    global _fetcher
+    if _fetcher is None:
+        proxy_config = default_proxy_config()
+        _fetcher = TranscriptFetcher(api_factory=lambda: make_transcript_api(proxy_config=proxy_config),
+                                     max_concurrency=1, cache=crawler.get_transcript_cache())
+    return _fetcher
+
+def video_key(query, video_id):
+    return f"{query}\t{video_id}"
+
+def enqueue_queries(queue, queries, max_pages=3, max_attempts=MAX_ATTEMPTS):
+    """Add one job per query; queries already in the queue are left alone. Returns how many were added."""
+    return sum(queue.enqueue('query', query, {'query': query, 'max_pages': max_pages}, max_attempts=max_attempts)
+               for query in queries)
+
+def run_query_job(queue, job):
+    """
+    Crawl one query, storing every video as a result as soon as it arrives. Videos stored by an
+    earlier attempt of the same job are skipped, and every video that came back without a
+    transcript gets its own transcript job, so a failed fetch is retried on its own.
+    """
+    query, max_pages = job.payload['query'], job.payload.get('max_pages', 3)
+    metrics = get_metrics()
+    videos = 0
+    for record in crawler.crawl_query_any(query, max_pages=max_pages,
+                                          video_filter=lambda vid: queue.get_result('video', video_key(query, vid)) is None):
+        record = dict(record, query=query)
+        queue.put_result('video', video_key(query, record['video_id']), record, job)
+        if record.get('transcript') is None:
+            queue.enqueue('transcript', record['video_id'], {'video_id': record['video_id'], 'url': record.get('url')},
+                          max_attempts=job.max_attempts)
+        videos += 1
+        if not queue.heartbeat(job, QUERY_LEASE_SECONDS):
+            logging.warning(f"{job}: lease lost to another worker, stopping")
+            break
+    metrics.inc('query_videos_total', videos, query=query)
+    return {'query': query, 'videos': videos}
+
+def run_transcript_job(queue, job):
+    """Fetch one transcript. Request errors raise, so the job is retried; a video without transcripts is a result."""
+    segments = get_transcript_fetcher().fetch_segments(job.payload['video_id'], video_url=job.payload.get('url'),
+                                                       raise_errors=True)
+    return {'video_id': job.payload['video_id'], 'segments': segments}
+
+HANDLERS = {'query': (run_query_job, QUERY_LEASE_SECONDS), 'transcript': (run_transcript_job, TRANSCRIPT_LEASE_SECONDS)}
+
+def run_worker(queue, worker_id=None, kinds=('query', 'transcript'), exit_when_idle=False):
+    """
+    Lease and run jobs until interrupted (or, with exit_when_idle, until no job of `kinds` is
+    left). Any number of workers on any number of boxes can drain the same queue.
+    """
+    worker_id = worker_id or default_worker_id()
+    metrics = get_metrics()
+    logging.info(f"Worker {worker_id} started on {queue.path}")
+    while True:
+        job = None
+        for kind in kinds:
+            job = queue.lease(worker_id, kinds=[kind], visibility_timeout=HANDLERS[kind][1])
+            if job is not None:
+                break
+        if job is None:
+            if exit_when_idle and not queue.pending(kinds):
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+        handler = HANDLERS[job.kind][0]
+        start = time.perf_counter()
+        try:
+            result = handler(queue, job)
+        except Exception as e:
+            queue.fail(job, f"{type(e).__name__}: {e}")
+            metrics.inc('queue_jobs_total', kind=job.kind, outcome='failed')
+        else:
+            if queue.complete(job, result):
+                metrics.inc('queue_jobs_total', kind=job.kind, outcome='done')
+            else:
+                metrics.inc('queue_jobs_total', kind=job.kind, outcome='lease_lost')
+        metrics.observe('queue_job_seconds', time.perf_counter() - start, kind=job.kind)
+    logging.info(f"Worker {worker_id} found no more work: {queue.stats()}")
+
+def export_results(queue, path):
+    """Write every stored video as a JSONL record, with transcripts from later transcript jobs filled in."""
+    count = 0
+    with JSONLSink(path, mode="w") as sink:
+        for _, record in queue.results('video'):
+            if record.get('transcript') is None:
+                fetched = queue.get_result('transcript', record['video_id'])
+                if fetched and fetched['segments'] is not None:
+                    record = dict(record, segments=fetched['segments'], transcript=join_segments(fetched['segments']))
+            sink.write(record)
+            count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed crawl worker backed by a shared SQLite job queue.")
+    parser.add_argument("--queue", default=QUEUE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="add query jobs")
+    enqueue.add_argument("queries", nargs="+")
+    enqueue.add_argument("--max-pages", type=int, default=3)
+    work = commands.add_parser("work", help="lease and run jobs")
+    work.add_argument("--worker-id")
+    work.add_argument("--kind", action="append", choices=sorted(HANDLERS), help="only run jobs of this kind")
+    work.add_argument("--exit-when-idle", action="store_true")
+    commands.add_parser("stats", help="job counts and dead letters")
+    requeue = commands.add_parser("requeue-dead", help="retry dead-lettered jobs")
+    requeue.add_argument("--kind", choices=sorted(HANDLERS))
+    export = commands.add_parser("export", help="write the collected videos as JSONL")
+    export.add_argument("path", nargs="?", default=crawler.OUTPUT_PATH)
+    args = parser.parse_args()
+
+    with WorkQueue(args.queue) as queue:
+        if args.command == "enqueue":
+            print(f"Enqueued {enqueue_queries(queue, args.queries, args.max_pages)} new query jobs")
+        elif args.command == "work":
+            worker_id = args.worker_id or default_worker_id()
+            try:
+                run_worker(queue, worker_id, kinds=tuple(args.kind or HANDLERS), exit_when_idle=args.exit_when_idle)
+            except KeyboardInterrupt:
+                logging.info("Worker stopped; its leased job is picked up again once the lease expires")
+            finally:
+                get_metrics().write_json(f"metrics_report-{worker_id}.json", worker_id=worker_id)
+        elif args.command == "stats":
+            print(queue.stats())
+            for dead in queue.dead_letters():
+                print(f"dead: {dead['kind']} {dead['key']!r} after {dead['attempts']} attempts: {dead['last_error']}")
+        elif args.command == "requeue-dead":
+            print(f"Requeued {queue.requeue_dead(args.kind)} jobs")
+        elif args.command == "export":
+            print(f"Wrote {export_results(queue, args.path)} videos to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+class StandInServer:
+    """
+    Local HTTP server for tests. `routes` maps a path to (status, headers, body), `delay` holds every
+    response for that many seconds, and each request is logged as (path, headers, arrival time).
+    A route with an ETag or Last-Modified header answers a matching conditional GET with 304.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.delay = 0.0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def paths(self):
+        return [path for path, _, _ in self.requests]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers), time.monotonic()))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.delay)
+                    status, headers, body = server.routes.get(self.path, (404, {}, "not found"))
+                    etag, modified = headers.get("ETag"), headers.get("Last-Modified")
+                    if (etag and self.headers.get("If-None-Match") == etag) or \
+                            (modified and self.headers.get("If-Modified-Since") == modified):
+                        status, body = 304, ""
+                    data = body.encode("utf-8")
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    yield server
+    server.close()
@@ -0,0 +1,259 @@
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+from http_cache import CachingAdapter, ResponseCache
+from frontier import RobotsCache
+
+class HostPacer:
+    """
+    Spaces requests to each host at least its delay apart, across threads: `delay` seconds by default,
+    or what set_delay() gave that host. Concurrent callers for one host queue up for consecutive slots.
+    """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self._delays = {}
+        self._next_time = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host):
+        return urlparse(url_or_host).netloc or url_or_host
+
+    def set_delay(self, url_or_host, seconds):
+        with self._lock:
+            self._delays[self.host_of(url_or_host)] = seconds
+
+    def wait(self, url):
+        """Sleep until this host's next slot and return how long that took."""
+        host = self.host_of(url)
+        with self._lock:
+            delay = self._delays.get(host, self.delay)
+            if delay <= 0:
+                return 0.0
+            now = time.monotonic()
+            slot = max(now, self._next_time.get(host, 0.0))
+            self._next_time[host] = slot + delay
+        if slot > now:
+            time.sleep(slot - now)
+        return slot - now
+
+class PacedAdapter(HTTPAdapter):
+    """HTTPAdapter that waits for the host's turn on a HostPacer before each request that goes to the network."""
+    def __init__(self, pacer, **kwargs):
+        self.pacer = pacer
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.pacer.wait(request.url)
+        return super().send(request, **kwargs)
+
+class PacedCachingAdapter(CachingAdapter, PacedAdapter):
+    """CachingAdapter whose cache misses and revalidations are paced; cache hits go out at once."""
+
+class PooledFetcher:
+    """
+    HTTP fetcher that keeps one requests.Session (and so one keep-alive connection pool) per host,
+    and fetches lists of URLs concurrently under a concurrency cap, returning responses in input order.
+    Pass a http_cache.ResponseCache as `cache` to serve and revalidate GETs from disk. Network requests
+    wait for their host's turn on `pacer` (a HostPacer; by default one without delays until set_delay is called).
+    """
+    def __init__(self, max_concurrency=8, timeout=15, retries=3, headers=None, cache=None, pacer=None):
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.pacer = pacer or HostPacer()
+        self.timeout = timeout
+        self.retries = retries
+        self.headers = headers or {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _new_session(self):
+        session = requests.Session()
+        session.headers.update(self.headers)
+        retry = Retry(total=self.retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET", "HEAD"])
+        adapter_kwargs = dict(pacer=self.pacer, pool_connections=1, pool_maxsize=self.max_concurrency, max_retries=retry)
+        if self.cache is not None:
+            adapter = PacedCachingAdapter(self.cache, **adapter_kwargs)
+        else:
+            adapter = PacedAdapter(**adapter_kwargs)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def session_for(self, url):
+        """The shared session for this URL's scheme and host."""
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session()
+            return session
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session_for(url).get(url, **kwargs)
+
+    def fetch_all(self, urls):
+        """Fetch every URL concurrently (at most max_concurrency in flight). Responses come back in input order."""
+        return list(self._executor.map(self.get, urls))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def find_last_page(exists, first=1, limit=None):
+    """
+    Find the last page number n for which exists(n) is true, assuming pages first..n all exist.
+    Probes first, first+1, first+3, first+7, ... until a page is missing (or `limit` is reached), then
+    binary-searches the gap, so it costs O(log n) probes instead of one probe per page.
+    Returns first - 1 if even the first page is missing.
+    """
+    if not exists(first):
+        return first - 1
+    good, step = first, 1
+    while True:
+        probe = first + step
+        if limit is not None and probe >= limit:
+            if exists(limit):
+                return limit
+            bad = limit
+            break
+        if not exists(probe):
+            bad = probe
+            break
+        good, step = probe, step * 2
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if exists(mid):
+            good = mid
+        else:
+            bad = mid
+    return good
+
+class PageProber:
+    """exists(n) callable for find_last_page that keeps each probed page's parsed items for reuse."""
+    def __init__(self, fetcher, page_url, parse):
+        self.fetcher = fetcher
+        self.page_url = page_url
+        self.parse = parse
+        self.pages = {}
+
+    def __call__(self, n):
+        if n not in self.pages:
+            response = self.fetcher.get(self.page_url(n))
+            self.pages[n] = self.parse(response.text) if response.status_code == 200 else []
+        return bool(self.pages[n])
+
+    def crawl(self, first=1, limit=None, concurrency=None):
+        """
+        Find the last page, then fetch every page not already probed, `concurrency` at a time (by default
+        as many as the fetcher allows). Items come back in page order.
+        """
+        last = find_last_page(self, first=first, limit=limit)
+        todo = [n for n in range(first, last + 1) if n not in self.pages]
+        batch = concurrency or len(todo) or 1
+        for start in range(0, len(todo), batch):
+            chunk = todo[start:start + batch]
+            for n, response in zip(chunk, self.fetcher.fetch_all([self.page_url(n) for n in chunk])):
+                self.pages[n] = self.parse(response.text) if response.status_code == 200 else []
+        items = []
+        for n in range(first, last + 1):
+            items.extend(self.pages[n])
+        return items
+
+def parse_quotes(page_html):
+    """Quotes on one quotes.toscrape.com page, as {'text','author','tags'} dicts."""
+    soup = BeautifulSoup(page_html, "lxml")
+    quotes = []
+    for quote in soup.find_all("div", class_="quote"):
+        text = quote.find("span", class_="text").get_text(strip=True)
+        author = quote.find("small", class_="author").get_text(strip=True)
+        tags = [tag.get_text(strip=True) for tag in quote.find_all("a", class_="tag")]
+        quotes.append({
+            "text": text,
+            "author": author,
+            "tags": tags
+        })
+    return quotes
+
+def parse_hn_stories(page_html):
+    """Stories on one Hacker News listing page, as {'title','url','id'} dicts."""
+    soup = BeautifulSoup(page_html, "lxml")
+    stories = []
+    for row in soup.find_all("tr", class_="athing"):
+        title = row.find("a", class_="storylink")
+        if not title:
+            title = row.find("span", class_="titleline")
+            if title:
+                title = title.find("a")
+        stories.append({
+            "title": title.get_text(strip=True) if title else "",
+            "url": title["href"] if title and title.has_attr("href") else "",
+            "id": row.get("id")
+        })
+    return stories
+
+def crawl_quotes(base_url="https://quotes.toscrape.com", fetcher=None, concurrency=8):
+    """Crawl every quotes.toscrape.com page concurrently. Same quotes, same order as following the 'Next' links."""
+    own = fetcher is None
+    fetcher = fetcher or PooledFetcher(max_concurrency=concurrency)
+    try:
+        prober = PageProber(fetcher, lambda n: urljoin(base_url, f"/page/{n}/"), parse_quotes)
+        return prober.crawl()
+    finally:
+        if own:
+            fetcher.close()
+
+def crawl_hackernews(base_url="https://news.ycombinator.com/", max_pages=30, fetcher=None, concurrency=None, delay=1.0,
+                     user_agent="*"):
+    """
+    Crawl Hacker News listing pages (news?p=N), up to max_pages. Stories keep page order.
+    Requests to HN are spaced at least `delay` seconds apart, or its robots.txt Crawl-delay if that is
+    longer, and when a Crawl-delay is set the pages are fetched one at a time unless `concurrency` says otherwise.
+    """
+    own = fetcher is None
+    fetcher = fetcher or PooledFetcher(max_concurrency=concurrency or 4)
+    try:
+        crawl_delay = RobotsCache(fetcher, user_agent=user_agent).crawl_delay(base_url)
+        if crawl_delay and concurrency is None:
+            concurrency = 1
+        fetcher.pacer.set_delay(base_url, max(delay, float(crawl_delay or 0)))
+        prober = PageProber(fetcher, lambda n: urljoin(base_url, f"news?p={n}"), parse_hn_stories)
+        return prober.crawl(limit=max_pages, concurrency=concurrency)
+    finally:
+        if own:
+            fetcher.close()
+
+if __name__ == "__main__":
+    # --replay reruns entirely from the on-disk cache, without touching the network
+    cache = ResponseCache(".http_cache", mode="replay" if "--replay" in sys.argv else "revalidate")
+    with PooledFetcher(max_concurrency=8, cache=cache) as fetcher:
+        all_quotes = crawl_quotes(fetcher=fetcher)
+        with open("all_quotes.json", "w", encoding="utf-8") as f:
+            json.dump(all_quotes, f, ensure_ascii=False, indent=2)
+        print(f"Crawled {len(all_quotes)} quotes.")
+
+        all_stories = crawl_hackernews(fetcher=fetcher)
+        with open("hackernews_stories.json", "w", encoding="utf-8") as f:
+            json.dump(all_stories, f, ensure_ascii=False, indent=2)
+        print(f"Crawled {len(all_stories)} stories from Hacker News.")
+    print(f"HTTP cache: {cache.stats()}")
@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Statuses worth keeping; redirects are included so replayed runs follow the same chain
+CACHEABLE_STATUSES = {200, 203, 300, 301, 302, 307, 308, 404, 410}
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+MODES = ("revalidate", "replay", "refresh")
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Raised in replay mode when a request has no cached response."""
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache: one gzip-compressed body file plus one JSON metadata file
+    (status, headers, validators) per GET URL.
+
+    Modes:
+      revalidate  serve fresh entries (younger than max_age) directly, otherwise send a conditional
+                  request with If-None-Match / If-Modified-Since; a 304 is answered from disk
+      replay      serve only from disk and raise CacheMiss for anything not cached (offline,
+                  deterministic reruns of extraction code and benchmarks)
+      refresh     always refetch and overwrite
+    """
+    def __init__(self, directory=".http_cache", mode="revalidate", max_age=0):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.bytes_saved = 0
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body.gz"
+
+    def load(self, url):
+        """(meta, body) for a cached URL, or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def store(self, url, response):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            "stored_at": time.time(),
+        }
+        # Write to temp files and rename, so concurrent readers never see a half-written entry
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(body_path + suffix, "wb", compresslevel=6) as f:
+            f.write(response.content)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+        self._count("stores")
+
+    def touch(self, url, meta, response):
+        """Refresh a revalidated entry's timestamp and any headers the 304 updated."""
+        meta_path, _ = self._paths(url)
+        meta["headers"].update({k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS})
+        meta["stored_at"] = time.time()
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _count(self, name, saved=0):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self.bytes_saved += saved
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "stores": self.stores,
+                "bytes_saved": self.bytes_saved,
+            }
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers GET requests from a ResponseCache and revalidates stale entries."""
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def _cached_response(self, request, meta, body):
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.reason = meta.get("reason")
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+        cache = self.cache
+        cached = None if cache.mode == "refresh" else cache.load(request.url)
+        if cache.mode == "replay":
+            if cached is None:
+                cache._count("misses")
+                raise CacheMiss(f"Not in cache (replay mode): {request.url}", request=request)
+            cache._count("hits", len(cached[1]))
+            return self._cached_response(request, *cached)
+        if cached is not None:
+            meta, body = cached
+            if cache.max_age and time.time() - meta["stored_at"] < cache.max_age:
+                cache._count("hits", len(body))
+                return self._cached_response(request, meta, body)
+            headers = CaseInsensitiveDict(meta["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+        response = super().send(request, **kwargs)
+        if cached is not None and response.status_code == 304:
+            response.close()
+            cache.touch(request.url, cached[0], response)
+            cache._count("revalidated", len(cached[1]))
+            return self._cached_response(request, *cached)
+        cache._count("misses")
+        if response.status_code in CACHEABLE_STATUSES and "no-store" not in response.headers.get("Cache-Control", ""):
+            cache.store(request.url, response)
+        response.from_cache = False
+        return response
+
+def cached_session(cache, **adapter_kwargs):
+    """A requests.Session whose GETs go through the cache, e.g. for goodreads_extract's `session`."""
+    session = requests.Session()
+    adapter = CachingAdapter(cache, **adapter_kwargs)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
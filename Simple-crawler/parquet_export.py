@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for the Parquet export
+    pa = pq = None
+
+ROW_GROUP_SIZE = 50_000
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Parquet export needs pyarrow: pip install pyarrow")
+
+def _dict_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+def quotes_schema():
+    # Authors and tags repeat across many quotes, so they are stored dictionary-encoded
+    return pa.schema([
+        ("text", pa.string()),
+        ("author", _dict_string()),
+        ("tags", pa.list_(_dict_string())),
+    ])
+
+def stories_schema():
+    return pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+    ])
+
+def videos_schema():
+    segment = pa.struct([("text", pa.string()), ("start", pa.float64()), ("duration", pa.float64())])
+    return pa.schema([
+        ("query", _dict_string()),
+        ("rank", pa.int32()),
+        ("page", pa.int32()),
+        ("video_id", pa.string()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("transcript", pa.string()),
+        ("segments", pa.list_(segment)),
+        # Set only on near-duplicate links (see NearDuplicateSink), whose transcript is left out
+        ("duplicate_of", pa.string()),
+        ("duplicate_distance", pa.int32()),
+    ])
+
+SCHEMAS = {"quotes": quotes_schema, "stories": stories_schema, "videos": videos_schema}
+
+def iter_records(path):
+    """Records from a crawl output: streamed line by line for .jsonl, loaded whole for a .json array."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def write_parquet(records, path, kind, row_group_size=ROW_GROUP_SIZE, compression="zstd"):
+    """
+    Stream records (any iterable of dicts, e.g. a crawl generator or iter_records) into a Parquet
+    file of the given kind ('quotes', 'stories' or 'videos'). At most row_group_size records are in
+    memory at a time; each batch becomes one row group. Returns the number of rows written.
+    """
+    _require_pyarrow()
+    schema = SCHEMAS[kind]()
+    names = schema.names
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression=compression, write_statistics=True) as writer:
+        batch = []
+        for record in records:
+            batch.append({name: record.get(name) for name in names})
+            if len(batch) >= row_group_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema), row_group_size=row_group_size)
+                rows += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema), row_group_size=row_group_size)
+            rows += len(batch)
+    return rows
+
+def read_parquet(path, columns=None, filters=None, to_pandas=True):
+    """
+    Load a Parquet export, reading only `columns` and only the row groups whose statistics can
+    match `filters` (pyarrow DNF filters, e.g. [("author", "=", "Albert Einstein")] or
+    [("rank", "<=", 3), ("query", "in", ["python tutorials"])]). Returns a DataFrame (dictionary
+    columns become categoricals) or a pyarrow Table with to_pandas=False.
+    """
+    _require_pyarrow()
+    table = pq.read_table(path, columns=columns, filters=filters)
+    return table.to_pandas() if to_pandas else table
+
+def export(path, kind, out_path=None, row_group_size=ROW_GROUP_SIZE):
+    """Convert a JSON/JSONL crawl output to Parquet next to it. Returns the output path."""
+    out_path = out_path or os.path.splitext(path)[0] + ".parquet"
+    rows = write_parquet(iter_records(path), out_path, kind, row_group_size=row_group_size)
+    print(f"{path} -> {out_path}: {rows} rows, {os.path.getsize(path) / 1024:.0f} KiB -> "
+          f"{os.path.getsize(out_path) / 1024:.0f} KiB")
+    return out_path
+
+def synthetic_quotes(n, authors=5000, tags=1000, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "text": f"Synthetic quote number {i}: " + " ".join(f"word{rng.randrange(5000)}" for _ in range(20)),
+            "author": f"Author {rng.randrange(authors)}",
+            "tags": [f"tag-{t}" for t in rng.sample(range(tags), 3)],
+        }
+
+def _best_of(func, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark(n=1_000_000):
+    """File size and pandas load time of the JSON (indent=2), CSV and Parquet outputs for n quotes."""
+    import pandas as pd
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, csv_path, parquet_path = (os.path.join(tmp, f"quotes.{ext}") for ext in ("json", "csv", "parquet"))
+        quotes = list(synthetic_quotes(n))
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(quotes, f, ensure_ascii=False, indent=2)
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["text", "author", "tags"])
+            writer.writerows((q["text"], q["author"], ", ".join(q["tags"])) for q in quotes)
+        del quotes
+        start = time.perf_counter()
+        write_parquet(synthetic_quotes(n), parquet_path, "quotes")
+        print(f"{n:,} quotes, Parquet written in {time.perf_counter() - start:.1f}s")
+
+        def load_json():
+            with open(json_path, encoding="utf-8") as f:
+                pd.DataFrame(json.load(f))
+
+        results = [
+            ("JSON (indent=2)", json_path, load_json),
+            ("CSV", csv_path, lambda: pd.read_csv(csv_path)),
+            ("Parquet", parquet_path, lambda: read_parquet(parquet_path)),
+            ("Parquet, author column only", parquet_path, lambda: read_parquet(parquet_path, columns=["author"])),
+            ("Parquet, author = 'Author 42'", parquet_path,
+             lambda: read_parquet(parquet_path, filters=[("author", "=", "Author 42")])),
+        ]
+        for label, path, load in results:
+            print(f"{label:32} {os.path.getsize(path) / 2**20:8.1f} MiB  load {_best_of(load):6.2f}s")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        export("all_quotes.json", "quotes")
+        export("hackernews_stories.json", "stories")
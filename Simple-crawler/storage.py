@@ -0,0 +1,296 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    author_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    quote_id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE,
+    author_id INTEGER NOT NULL REFERENCES authors (author_id),
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quote_tags (
+    quote_id INTEGER NOT NULL REFERENCES quotes (quote_id),
+    tag_id INTEGER NOT NULL REFERENCES tags (tag_id),
+    PRIMARY KEY (quote_id, tag_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_quotes_author ON quotes (author_id);
+CREATE INDEX IF NOT EXISTS idx_quote_tags_tag ON quote_tags (tag_id, quote_id);
+
+CREATE TABLE IF NOT EXISTS hn_stories (
+    story_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS youtube_videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS youtube_query_results (
+    query TEXT NOT NULL,
+    video_id TEXT NOT NULL REFERENCES youtube_videos (video_id),
+    rank INTEGER,
+    PRIMARY KEY (query, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_query_results_video ON youtube_query_results (video_id);
+CREATE TABLE IF NOT EXISTS youtube_transcripts (
+    video_id TEXT PRIMARY KEY REFERENCES youtube_videos (video_id),
+    transcript TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Natural-key upserts whose WHERE clause skips the write when nothing changed
+UPSERT_QUOTE = """
+INSERT INTO quotes (text, author_id, updated_at) VALUES (?, ?, ?)
+ON CONFLICT (text) DO UPDATE SET author_id = excluded.author_id, updated_at = excluded.updated_at
+WHERE quotes.author_id IS NOT excluded.author_id
+"""
+UPSERT_STORY = """
+INSERT INTO hn_stories (story_id, title, url, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (story_id) DO UPDATE SET title = excluded.title, url = excluded.url, updated_at = excluded.updated_at
+WHERE hn_stories.title IS NOT excluded.title OR hn_stories.url IS NOT excluded.url
+"""
+UPSERT_VIDEO = """
+INSERT INTO youtube_videos (video_id, title, url, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (video_id) DO UPDATE SET title = excluded.title, url = excluded.url, updated_at = excluded.updated_at
+WHERE youtube_videos.title IS NOT excluded.title OR youtube_videos.url IS NOT excluded.url
+"""
+UPSERT_QUERY_RESULT = """
+INSERT INTO youtube_query_results (query, video_id, rank) VALUES (?, ?, ?)
+ON CONFLICT (query, video_id) DO UPDATE SET rank = excluded.rank
+WHERE youtube_query_results.rank IS NOT excluded.rank
+"""
+UPSERT_TRANSCRIPT = """
+INSERT INTO youtube_transcripts (video_id, transcript, updated_at) VALUES (?, ?, ?)
+ON CONFLICT (video_id) DO UPDATE SET transcript = excluded.transcript, updated_at = excluded.updated_at
+WHERE youtube_transcripts.transcript IS NOT excluded.transcript
+"""
+
+# Keep IN (...) lists under SQLite's default host-parameter limit
+MAX_PARAMS = 900
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class CrawlStore:
+    """
+    Normalized SQLite store for the crawled data: quotes with their authors and tags (join table),
+    Hacker News stories and YouTube videos, query results and transcripts.
+
+    Records are written in batched executemany transactions (WAL mode) and upserted on their
+    natural keys (quote text, tag/author name, story ID, video ID), so re-running a crawl only
+    writes the rows that actually changed. Indexes cover lookups by tag and by author.
+    A flat `quotes(text, author, tags)` table left by the old pandas to_sql dump is migrated on open.
+    """
+    def __init__(self, path="quotes.db", batch_size=5000):
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        legacy = self._flat_quotes_table()
+        self._conn.executescript(SCHEMA)
+        self._author_ids = {}
+        self._tag_ids = {}
+        if legacy:
+            self._migrate_flat_quotes(legacy)
+
+    def _flat_quotes_table(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(quotes)")}
+        if columns and "quote_id" not in columns:
+            self._conn.execute("ALTER TABLE quotes RENAME TO quotes_flat")
+            return "quotes_flat"
+        return None
+
+    def _migrate_flat_quotes(self, table):
+        rows = self._conn.execute(f"SELECT text, author, tags FROM {table}").fetchall()
+        self.upsert_quotes({
+            "text": text,
+            "author": author,
+            "tags": [tag.strip() for tag in (tags or "").split(",") if tag.strip()],
+        } for text, author, tags in rows)
+        self._conn.execute(f"DROP TABLE {table}")
+
+    def _batches(self, records):
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _name_ids(self, table, key, cache, names):
+        """Insert any new names into authors/tags and return {name: id} for all of them."""
+        missing = [name for name in set(names) if name not in cache]
+        if missing:
+            self._conn.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", ((n,) for n in missing))
+            for chunk in _chunks(missing, MAX_PARAMS):
+                placeholders = ",".join("?" * len(chunk))
+                cache.update(self._conn.execute(
+                    f"SELECT name, {key} FROM {table} WHERE name IN ({placeholders})", chunk))
+        return cache
+
+    def _write(self, statements):
+        """Run a batch of (sql, rows) in one transaction; returns the number of rows changed."""
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN")
+        try:
+            for sql, rows in statements:
+                self._conn.executemany(sql, rows)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return self._conn.total_changes - before
+
+    def upsert_quotes(self, quotes):
+        """Upsert {'text','author','tags'} dicts. Returns the number of rows changed."""
+        changed = 0
+        for batch in self._batches(quotes):
+            now = time.time()
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.total_changes
+                author_ids = self._name_ids("authors", "author_id", self._author_ids, (q["author"] for q in batch))
+                tag_ids = self._name_ids("tags", "tag_id", self._tag_ids, (t for q in batch for t in q["tags"]))
+                self._conn.executemany(UPSERT_QUOTE, ((q["text"], author_ids[q["author"]], now) for q in batch))
+                quote_ids = {}
+                for chunk in _chunks([q["text"] for q in batch], MAX_PARAMS):
+                    placeholders = ",".join("?" * len(chunk))
+                    quote_ids.update(self._conn.execute(
+                        f"SELECT text, quote_id FROM quotes WHERE text IN ({placeholders})", chunk))
+                wanted = {(quote_ids[q["text"]], tag_ids[t]) for q in batch for t in q["tags"]}
+                existing = set()
+                for chunk in _chunks(list(set(quote_ids.values())), MAX_PARAMS):
+                    placeholders = ",".join("?" * len(chunk))
+                    existing.update(self._conn.execute(
+                        f"SELECT quote_id, tag_id FROM quote_tags WHERE quote_id IN ({placeholders})", chunk))
+                self._conn.executemany("DELETE FROM quote_tags WHERE quote_id = ? AND tag_id = ?", existing - wanted)
+                self._conn.executemany("INSERT INTO quote_tags (quote_id, tag_id) VALUES (?, ?)", wanted - existing)
+                changed += self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # Ids cached during the rolled-back transaction may no longer exist
+                self._author_ids.clear()
+                self._tag_ids.clear()
+                raise
+        return changed
+
+    def upsert_hn_stories(self, stories):
+        """Upsert {'id','title','url'} dicts as produced by the HN crawl. Returns the number of rows changed."""
+        changed = 0
+        for batch in self._batches(stories):
+            now = time.time()
+            changed += self._write([
+                (UPSERT_STORY, [(s["id"], s["title"], s.get("url"), now) for s in batch if s.get("id")]),
+            ])
+        return changed
+
+    def upsert_videos(self, records):
+        """
+        Upsert YouTube crawl records ({'query','rank','video_id','title','url','transcript'}, as written
+        by the End2End crawler's sinks). Returns the number of rows changed.
+        """
+        changed = 0
+        for batch in self._batches(records):
+            now = time.time()
+            changed += self._write([
+                (UPSERT_VIDEO, [(r["video_id"], r.get("title"), r.get("url"), now) for r in batch]),
+                (UPSERT_QUERY_RESULT, [(r["query"], r["video_id"], r.get("rank")) for r in batch if r.get("query")]),
+                (UPSERT_TRANSCRIPT, [(r["video_id"], r["transcript"], now) for r in batch if r.get("transcript")]),
+            ])
+        return changed
+
+    def quotes_by_tag(self, tag):
+        return [{"text": text, "author": author} for text, author in self._conn.execute(
+            """SELECT q.text, a.name FROM tags t
+               JOIN quote_tags qt ON qt.tag_id = t.tag_id
+               JOIN quotes q ON q.quote_id = qt.quote_id
+               JOIN authors a ON a.author_id = q.author_id
+               WHERE t.name = ? ORDER BY q.quote_id""", (tag,))]
+
+    def quotes_by_author(self, author):
+        return [row[0] for row in self._conn.execute(
+            """SELECT q.text FROM authors a JOIN quotes q ON q.author_id = a.author_id
+               WHERE a.name = ? ORDER BY q.quote_id""", (author,))]
+
+    def tag_counts(self, limit=10):
+        """Most used tags as (name, count) pairs."""
+        return self._conn.execute(
+            """SELECT t.name, COUNT(*) AS n FROM quote_tags qt JOIN tags t ON t.tag_id = qt.tag_id
+               GROUP BY qt.tag_id ORDER BY n DESC, t.name LIMIT ?""", (limit,)).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def synthetic_quotes(n, authors=5000, tags=1000, tags_per_quote=3, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "text": f"Synthetic quote number {i} {rng.random():.12f}",
+            "author": f"Author {rng.randrange(authors)}",
+            "tags": [f"tag-{t}" for t in rng.sample(range(tags), tags_per_quote)],
+        }
+
+def benchmark(n=1_000_000):
+    """Initial bulk load, unchanged re-run and indexed lookups over n synthetic quotes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        with CrawlStore(path) as store:
+            start = time.perf_counter()
+            changed = store.upsert_quotes(synthetic_quotes(n))
+            elapsed = time.perf_counter() - start
+            print(f"initial load: {n:,} quotes in {elapsed:.1f}s ({n / elapsed:,.0f} quotes/s, {changed:,} rows written)")
+
+            start = time.perf_counter()
+            changed = store.upsert_quotes(synthetic_quotes(n))
+            elapsed = time.perf_counter() - start
+            print(f"unchanged re-run: {elapsed:.1f}s ({n / elapsed:,.0f} quotes/s, {changed:,} rows written)")
+
+            start = time.perf_counter()
+            found = len(store.quotes_by_tag("tag-42"))
+            print(f"quotes_by_tag: {found:,} quotes in {(time.perf_counter() - start) * 1000:.1f} ms")
+            start = time.perf_counter()
+            found = len(store.quotes_by_author("Author 42"))
+            print(f"quotes_by_author: {found:,} quotes in {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"database size: {os.path.getsize(path) / 2**20:.0f} MiB")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        with CrawlStore("quotes.db") as store:
+            with open("all_quotes.json", encoding="utf-8") as f:
+                print(f"quotes: {store.upsert_quotes(json.load(f))} rows changed")
+            if os.path.exists("hackernews_stories.json"):
+                with open("hackernews_stories.json", encoding="utf-8") as f:
+                    print(f"hn stories: {store.upsert_hn_stories(json.load(f))} rows changed")
+            print(store.tag_counts())
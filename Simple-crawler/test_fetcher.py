@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+import pytest
+import fetcher as fetcher_module
+from fetcher import HostPacer, PageProber, PooledFetcher, crawl_hackernews, crawl_quotes, find_last_page
+
+class FakeFetcher:
+    """Serves `pages[url]` bodies (404 for anything else) and records every URL requested."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self.batches = []
+        self.pacer = HostPacer()
+
+    def get(self, url):
+        self.requested.append(url)
+        body = self.pages.get(url)
+        return SimpleNamespace(status_code=200 if body is not None else 404, text=body or "")
+
+    def fetch_all(self, urls):
+        self.batches.append(list(urls))
+        return [self.get(url) for url in urls]
+
+def listing(last):
+    return {f"page/{n}": f"item{n}" for n in range(1, last + 1)}
+
+def make_prober(fake):
+    return PageProber(fake, lambda n: f"page/{n}", lambda text: [text] if text else [])
+
+@pytest.mark.parametrize("last", [1, 2, 3, 10, 17, 64, 100])
+def test_find_last_page(last):
+    probes = []
+    assert find_last_page(lambda n: probes.append(n) or n <= last) == last
+    # Doubling then bisecting: O(log n) probes, never one per page
+    assert len(probes) <= 2 * last.bit_length() + 2
+
+def test_find_last_page_when_first_page_is_missing():
+    assert find_last_page(lambda n: False) == 0
+    assert find_last_page(lambda n: False, first=5) == 4
+
+@pytest.mark.parametrize("last, limit, expected", [(100, 30, 30), (10, 30, 10), (30, 30, 30), (31, 30, 30)])
+def test_find_last_page_limit(last, limit, expected):
+    probes = []
+    assert find_last_page(lambda n: probes.append(n) or n <= last, limit=limit) == expected
+    assert max(probes) <= limit
+
+def test_prober_crawl_fetches_each_page_once_in_order():
+    fake = FakeFetcher(listing(13))
+    assert make_prober(fake).crawl() == [f"item{n}" for n in range(1, 14)]
+    assert len(fake.requested) == len(set(fake.requested))
+    assert {f"page/{n}" for n in range(1, 14)} <= set(fake.requested)
+
+def test_prober_crawl_concurrency_batches_requests():
+    fake = FakeFetcher(listing(13))
+    make_prober(fake).crawl(concurrency=1)
+    assert fake.batches and all(len(batch) == 1 for batch in fake.batches)
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_host_pacer_spaces_requests_per_host(monkeypatch):
+    monkeypatch.setattr(fetcher_module, "time", FakeTime())
+    pacer = HostPacer()
+    assert pacer.wait("https://news.ycombinator.com/news?p=1") == 0
+    pacer.set_delay("https://news.ycombinator.com/", 30)
+    assert [pacer.wait(f"https://news.ycombinator.com/news?p={n}") for n in range(3)] == [0, 30, 30]
+    # Other hosts are not held up
+    assert pacer.wait("https://quotes.toscrape.com/page/1/") == 0
+
+def test_crawl_hackernews_honours_crawl_delay():
+    base = "https://news.ycombinator.com/"
+    pages = {base + "robots.txt": "User-Agent: *\nDisallow: /x?\nCrawl-delay: 30\n"}
+    pages.update({f"{base}news?p={n}": f'<tr class="athing" id="{n}"><td><span class="titleline">'
+                                       f'<a href="https://example.com/{n}">Story {n}</a></span></td></tr>'
+                  for n in range(1, 4)})
+    fake = FakeFetcher(pages)
+    fake.pacer.wait = lambda url: 0.0
+    stories = crawl_hackernews(fetcher=fake)
+    assert [story["id"] for story in stories] == ["1", "2", "3"]
+    assert fake.pacer._delays == {"news.ycombinator.com": 30.0}
+    assert all(len(batch) == 1 for batch in fake.batches)
+
+# Against a local stand-in server (see conftest.py): real sockets, sessions and adapters
+
+def quote_page(n):
+    return (f'<div class="quote"><span class="text">Quote {n}</span><small class="author">Author {n}</small>'
+            f'<a class="tag">tag{n}</a></div>')
+
+def test_pooled_fetcher_fetches_concurrently_in_input_order(stand_in_server):
+    stand_in_server.routes = {f"/item/{n}": (200, {}, f"body {n}") for n in range(8)}
+    stand_in_server.delay = 0.1
+    with PooledFetcher(max_concurrency=4) as fetcher:
+        responses = fetcher.fetch_all([f"{stand_in_server.url}/item/{n}" for n in range(8)])
+    assert [r.text for r in responses] == [f"body {n}" for n in range(8)]
+    assert 1 < stand_in_server.max_in_flight <= 4
+
+def test_crawl_quotes_probes_then_fetches_each_page_once(stand_in_server):
+    stand_in_server.routes = {f"/page/{n}/": (200, {}, quote_page(n)) for n in range(1, 12)}
+    with PooledFetcher(max_concurrency=4) as fetcher:
+        quotes = crawl_quotes(base_url=stand_in_server.url, fetcher=fetcher)
+    assert [q["text"] for q in quotes] == [f"Quote {n}" for n in range(1, 12)]
+    assert quotes[0] == {"text": "Quote 1", "author": "Author 1", "tags": ["tag1"]}
+    paths = stand_in_server.paths()
+    assert len(paths) == len(set(paths))
+
+def test_paced_adapter_spaces_requests_to_one_host(stand_in_server):
+    stand_in_server.routes = {f"/item/{n}": (200, {}, "ok") for n in range(4)}
+    with PooledFetcher(max_concurrency=4, pacer=HostPacer(delay=0.05)) as fetcher:
+        fetcher.fetch_all([f"{stand_in_server.url}/item/{n}" for n in range(4)])
+    arrivals = sorted(at for _, _, at in stand_in_server.requests)
+    assert all(later - earlier >= 0.04 for earlier, later in zip(arrivals, arrivals[1:]))
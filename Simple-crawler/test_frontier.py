@@ -0,0 +1,32 @@
+import pytest
+from frontier import TRACKING_PARAMS, Frontier, canonicalize_url
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTP://Example.COM:80/a/./b/../c#top", "http://example.com/a/c"),
+    ("https://example.com/%7Euser/%41bc", "https://example.com/~user/Abc"),
+    # Escaped reserved characters are not the same as the characters themselves
+    ("https://example.com/files/a%2Fb", "https://example.com/files/a%2Fb"),
+    ("https://example.com/files/a%2fb%3f", "https://example.com/files/a%2Fb%3F"),
+    ("https://example.com/café menu", "https://example.com/caf%C3%A9%20menu"),
+    ("https://example.com/?b=2&utm_source=x&a=1&fbclid=y", "https://example.com/?a=1&b=2"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+def test_reserved_escapes_do_not_merge_distinct_pages():
+    assert canonicalize_url("https://example.com/a%2Fb") != canonicalize_url("https://example.com/a/b")
+
+def test_ref_is_kept_by_default():
+    assert canonicalize_url("https://github.com/o/r/compare?ref=main") == "https://github.com/o/r/compare?ref=main"
+
+def test_tracking_params_are_configurable():
+    params = TRACKING_PARAMS | {"ref"}
+    assert canonicalize_url("https://example.com/?ref=hn&id=1", tracking_params=params) == "https://example.com/?id=1"
+    frontier = Frontier(delay=0, tracking_params=params)
+    assert frontier.add("https://example.com/?id=1&ref=hn")
+    assert not frontier.add("https://example.com/?id=1")
+    assert frontier.pop() == ("https://example.com/?id=1", 0)
+
+def test_non_http_links_are_dropped():
+    assert canonicalize_url("mailto:someone@example.com") is None
+    assert canonicalize_url("javascript:void(0)") is None
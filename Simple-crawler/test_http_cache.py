@@ -0,0 +1,60 @@
+import pytest
+from http_cache import CacheMiss, ResponseCache, cached_session
+
+def get(cache, url):
+    with cached_session(cache) as session:
+        return session.get(url, timeout=5)
+
+def test_etag_revalidation_reuses_the_cached_body(stand_in_server, tmp_path):
+    stand_in_server.routes["/page"] = (200, {"ETag": '"v1"'}, "first body")
+    cache = ResponseCache(str(tmp_path))
+    assert get(cache, stand_in_server.url + "/page").from_cache is False
+    response = get(cache, stand_in_server.url + "/page")
+    assert response.from_cache is True and response.status_code == 200 and response.text == "first body"
+    assert stand_in_server.requests[-1][1].get("If-None-Match") == '"v1"'
+    assert cache.stats()["revalidated"] == 1
+
+def test_changed_resource_replaces_the_entry(stand_in_server, tmp_path):
+    url = stand_in_server.url + "/page"
+    stand_in_server.routes["/page"] = (200, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, "old")
+    cache = ResponseCache(str(tmp_path))
+    get(cache, url)
+    assert get(cache, url).from_cache is True
+    assert stand_in_server.requests[-1][1].get("If-Modified-Since") == "Mon, 01 Jan 2024 00:00:00 GMT"
+    stand_in_server.routes["/page"] = (200, {"Last-Modified": "Tue, 02 Jan 2024 00:00:00 GMT"}, "new")
+    assert get(cache, url).text == "new"
+    assert cache.load(url)[1] == b"new"
+
+def test_fresh_entries_skip_the_network(stand_in_server, tmp_path):
+    stand_in_server.routes["/page"] = (200, {}, "body")
+    cache = ResponseCache(str(tmp_path), max_age=60)
+    get(cache, stand_in_server.url + "/page")
+    assert get(cache, stand_in_server.url + "/page").text == "body"
+    assert len(stand_in_server.requests) == 1 and cache.stats()["hits"] == 1
+
+def test_replay_serves_from_disk_without_the_network(stand_in_server, tmp_path):
+    url = stand_in_server.url + "/page"
+    stand_in_server.routes["/page"] = (200, {"ETag": '"v1"'}, "body")
+    get(ResponseCache(str(tmp_path)), url)
+    stand_in_server.close()
+    replay = ResponseCache(str(tmp_path), mode="replay")
+    assert get(replay, url).text == "body"
+    with pytest.raises(CacheMiss):
+        get(replay, stand_in_server.url + "/elsewhere")
+    assert replay.stats()["hits"] == 1 and replay.stats()["misses"] == 1
+
+def test_refresh_always_refetches(stand_in_server, tmp_path):
+    url = stand_in_server.url + "/page"
+    stand_in_server.routes["/page"] = (200, {"ETag": '"v1"'}, "old")
+    get(ResponseCache(str(tmp_path)), url)
+    stand_in_server.routes["/page"] = (200, {"ETag": '"v1"'}, "new")
+    refresh = ResponseCache(str(tmp_path), mode="refresh")
+    assert get(refresh, url).text == "new"
+    assert "If-None-Match" not in stand_in_server.requests[-1][1]
+    assert refresh.load(url)[1] == b"new"
+
+def test_no_store_responses_are_not_cached(stand_in_server, tmp_path):
+    stand_in_server.routes["/page"] = (200, {"Cache-Control": "no-store"}, "secret")
+    cache = ResponseCache(str(tmp_path))
+    get(cache, stand_in_server.url + "/page")
+    assert cache.load(stand_in_server.url + "/page") is None
@@ -0,0 +1,28 @@
+import pytest
+from parquet_export import read_parquet, write_parquet
+
+pytest.importorskip("pyarrow")
+
+VIDEOS = [
+    {"query": "python tutorials", "rank": 1, "page": 0, "video_id": "a1", "title": "Learn Python",
+     "url": "https://www.youtube.com/watch?v=a1", "transcript": "hello world",
+     "segments": [{"text": "hello world", "start": 0.0, "duration": 1.5}]},
+    # A near-duplicate link as written by NearDuplicateSink: no transcript, pointer to the original
+    {"query": "python tutorials", "rank": 2, "page": 0, "video_id": "b2", "title": "Learn Python (reupload)",
+     "url": "https://www.youtube.com/watch?v=b2", "transcript": None, "segments": None,
+     "duplicate_of": "a1", "duplicate_distance": 3},
+]
+
+def test_videos_round_trip_keeps_duplicate_links(tmp_path):
+    path = str(tmp_path / "videos.parquet")
+    assert write_parquet(iter(VIDEOS), path, "videos", row_group_size=1) == 2
+    rows = read_parquet(path, to_pandas=False).to_pylist()
+    assert rows[0]["duplicate_of"] is None and rows[0]["duplicate_distance"] is None
+    assert rows[0]["segments"] == VIDEOS[0]["segments"]
+    assert rows[1] == dict(VIDEOS[1])
+
+def test_read_parquet_selects_originals(tmp_path):
+    path = str(tmp_path / "videos.parquet")
+    write_parquet(VIDEOS, path, "videos")
+    table = read_parquet(path, columns=["video_id"], filters=[("rank", "=", 1)], to_pandas=False)
+    assert table.column("video_id").to_pylist() == ["a1"]
@@ -0,0 +1,51 @@
+import sqlite3
+from storage import CrawlStore
+
+QUOTES = [
+    {"text": "Quote one", "author": "Albert Einstein", "tags": ["life", "science"]},
+    {"text": "Quote two", "author": "Jane Austen", "tags": ["life"]},
+    {"text": "Quote three", "author": "Albert Einstein", "tags": []},
+]
+
+def tables(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_flat_quotes_table_is_migrated_on_open(tmp_path):
+    path = str(tmp_path / "quotes.db")
+    # The layout the old pandas to_sql dump left behind: tags joined into one string
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE quotes (text TEXT, author TEXT, tags TEXT)")
+        conn.executemany("INSERT INTO quotes VALUES (?, ?, ?)",
+                         [(q["text"], q["author"], ", ".join(q["tags"])) for q in QUOTES])
+    with CrawlStore(path) as store:
+        assert store.quotes_by_author("Albert Einstein") == ["Quote one", "Quote three"]
+        assert store.quotes_by_tag("life") == [{"text": "Quote one", "author": "Albert Einstein"},
+                                               {"text": "Quote two", "author": "Jane Austen"}]
+        assert store.tag_counts() == [("life", 2), ("science", 1)]
+    assert "quotes_flat" not in tables(path)
+    # Reopening a migrated store leaves it alone
+    with CrawlStore(path) as store:
+        assert store.upsert_quotes(QUOTES) == 0
+        assert store.tag_counts() == [("life", 2), ("science", 1)]
+
+def test_re_upserting_unchanged_records_writes_nothing(tmp_path):
+    with CrawlStore(str(tmp_path / "quotes.db")) as store:
+        assert store.upsert_quotes(QUOTES) > 0
+        assert store.upsert_quotes(QUOTES) == 0
+        stories = [{"id": "1", "title": "Story", "url": "https://example.com"}]
+        assert store.upsert_hn_stories(stories) == 1
+        assert store.upsert_hn_stories(stories) == 0
+        videos = [{"query": "python", "rank": 0, "video_id": "v1", "title": "T", "url": "u", "transcript": "hi"}]
+        assert store.upsert_videos(videos) == 3
+        assert store.upsert_videos(videos) == 0
+
+def test_changed_records_update_in_place(tmp_path):
+    with CrawlStore(str(tmp_path / "quotes.db"), batch_size=2) as store:
+        store.upsert_quotes(QUOTES)
+        moved = [dict(QUOTES[0], author="Jane Austen", tags=["science", "humor"])]
+        # The new tag, the quote's author, one tag link removed and one added
+        assert store.upsert_quotes(moved) == 4
+        assert store.quotes_by_author("Jane Austen") == ["Quote one", "Quote two"]
+        assert store.quotes_by_tag("life") == [{"text": "Quote two", "author": "Jane Austen"}]
+        assert [q["text"] for q in store.quotes_by_tag("humor")] == ["Quote one"]